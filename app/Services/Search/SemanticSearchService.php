@@ -26,7 +26,7 @@ public function __construct(
      * @param string $query Natural language search query
      * @param string $index Index to search in
      * @param int $topK Number of results
-     * @param array $options Additional options (filters, min_score)
+     * @param array $options Additional options (filters, min_score, rerank, rerank_candidates, rerank_budget_ms)
      * @return Collection Search results
      */
     public function search(
@@ -39,7 +39,8 @@ public function search(
         $minScore = $options['min_score'] ?? config('usearch.search.default_min_score', 0.5);
 
         try {
-            $response = $this->client->search($query, $index, $topK, $filters, $minScore);
+            $rerank = array_intersect_key($options, array_flip(['rerank', 'rerank_candidates', 'rerank_budget_ms']));
+            $response = $this->client->search($query, $index, $topK, $filters, $minScore, $rerank);
 
             return collect($response['results'] ?? [])->map(function ($result) {
                 return $this->transformResult($result);
@@ -75,6 +76,13 @@ public function hybridSearch(
         $semanticWeight = $options['semantic_weight'] ?? config('usearch.search.semantic_weight', 0.7);
         $textWeight = $options['text_weight'] ?? config('usearch.search.text_weight', 0.3);
 
+        // Let the uSearch service fuse BM25 and vector rankings in one call
+        if ($options['server_hybrid'] ?? config('usearch.search.server_hybrid', false)) {
+            $share = $textWeight / max($semanticWeight + $textWeight, 1e-9);
+
+            return $this->serverHybridSearch($query, $index, $topK, $share, $options);
+        }
+
         // Get semantic results
         $semanticResults = $this->search($query, $index, $topK * 2, $options);
 
@@ -85,6 +93,48 @@ public function hybridSearch(
         return $this->mergeResults($semanticResults, $textResults, $semanticWeight, $textWeight, $topK);
     }
 
+    /**
+     * Hybrid search fused by the uSearch service.
+     *
+     * @param string $query Search query
+     * @param string $index Index to search in
+     * @param int $topK Number of results
+     * @param float $textWeight Weight of the lexical ranking (0-1)
+     * @param array $options Additional options (filters, min_score, fusion)
+     * @return Collection Fused results
+     */
+    protected function serverHybridSearch(
+        string $query,
+        string $index,
+        int $topK,
+        float $textWeight,
+        array $options = []
+    ): Collection {
+        try {
+            $response = $this->client->hybridSearch(
+                $query,
+                $index,
+                $topK,
+                $options['filters'] ?? null,
+                $options['min_score'] ?? 0.0,
+                $textWeight,
+                $options['fusion'] ?? config('usearch.search.fusion', 'rrf')
+            );
+
+            return collect($response['results'] ?? [])->map(function ($result) {
+                return $this->transformResult($result);
+            });
+        } catch (\Exception $e) {
+            Log::error('Hybrid search failed', [
+                'query' => $query,
+                'index' => $index,
+                'error' => $e->getMessage(),
+            ]);
+
+            return collect();
+        }
+    }
+
     /**
      * Find items similar to a given ID.
      *
@@ -100,6 +100,7 @@ public function stats(): array
      * @param int $topK Number of results to return
      * @param array|null $filters Metadata filters
      * @param float $minScore Minimum similarity score (0-1)
+     * @param array $options Extra search options (rerank, rerank_candidates, rerank_budget_ms)
      * @return array Search results
      */
     public function search(
@@ -107,19 +108,58 @@ public function search(
         string $index,
         int $topK = 10,
         ?array $filters = null,
-        float $minScore = 0.0
+        float $minScore = 0.0,
+        array $options = []
     ): array {
         $this->log('search', ['query' => $query, 'index' => $index, 'top_k' => $topK]);
 
         // Ensure empty array is converted to null (API expects dict or null)
         $filters = !empty($filters) ? $filters : null;
 
-        $response = $this->client()->post('/search', [
+        $response = $this->client()->post('/search', array_merge($options, [
             'query' => $query,
             'index' => $index,
             'top_k' => $topK,
             'filters' => $filters,
             'min_score' => $minScore,
+        ]));
+
+        $response->throw();
+        return $response->json();
+    }
+
+    /**
+     * Hybrid search: vector similarity and BM25 over indexed content, fused by the service.
+     *
+     * @param string $query Natural language or keyword query
+     * @param string $index Index to search in
+     * @param int $topK Number of results to return
+     * @param array|null $filters Metadata filters
+     * @param float $minScore Minimum fused score (0-1)
+     * @param float $textWeight Weight of the lexical ranking (0-1)
+     * @param string $fusion Fusion method (rrf, weighted)
+     * @return array Search results
+     */
+    public function hybridSearch(
+        string $query,
+        string $index,
+        int $topK = 10,
+        ?array $filters = null,
+        float $minScore = 0.0,
+        float $textWeight = 0.3,
+        string $fusion = 'rrf'
+    ): array {
+        $this->log('hybrid_search', ['query' => $query, 'index' => $index, 'top_k' => $topK]);
+
+        $response = $this->client()->post('/search', [
+            'query' => $query,
+            'index' => $index,
+            'top_k' => $topK,
+            'filters' => !empty($filters) ? $filters : null,
+            'min_score' => $minScore,
+            'hybrid' => true,
+            'fusion' => $fusion,
+            'text_weight' => $textWeight,
         ]);
 
         $response->throw();
@@ -143,12 +183,14 @@ public function searchByVector(
     ): array {
         $this->log('searchByVector', ['index' => $index, 'dimensions' => count($vector)]);
 
-        $response = $this->client()->post('/search/vector', [
+        $query = http_build_query([
             'index' => $index,
-            'vector' => $vector,
             'top_k' => $topK,
             'min_score' => $minScore,
         ]);
+        $response = $this->client()
+            ->withBody($this->packVector($vector), 'application/octet-stream')
+            ->post("/search/vector?{$query}");
 
         $response->throw();
         return $response->json();
@@ -231,12 +273,14 @@ public function indexVector(
     ): array {
         $this->log('indexVector', ['id' => $id, 'index' => $index]);
 
-        $response = $this->client()->post('/index/vector', [
-            'id' => $id,
-            'vector' => $vector,
-            'index' => $index,
-            'metadata' => $metadata,
-        ]);
+        $query = http_build_query(['index' => $index, 'id' => $id]);
+        $request = $this->client();
+        if ($metadata !== null) {
+            $request = $request->withHeaders(['X-Metadata' => json_encode($metadata)]);
+        }
+        $response = $request
+            ->withBody($this->packVector($vector), 'application/octet-stream')
+            ->post("/index/vector?{$query}");
 
         $response->throw();
         return $response->json();
@@ -264,6 +308,40 @@ public function indexBatch(array $items, string $index): array
         return $response->json();
     }
 
+    /**
+     * Queue a bulk indexing job and return without waiting for it.
+     *
+     * @param array $items Items with id, content (or vector), and optional metadata
+     * @param string $index Index name
+     * @return array Job status with its id
+     */
+    public function submitIndexJob(array $items, string $index): array
+    {
+        $this->log('submitIndexJob', ['index' => $index, 'count' => count($items)]);
+
+        $response = $this->client()->post('/jobs/index', [
+            'index' => $index,
+            'items' => $items,
+        ]);
+
+        $response->throw();
+        return $response->json();
+    }
+
+    /**
+     * Get the progress, throughput and ETA of an indexing job.
+     *
+     * @param string $jobId Job ID returned by submitIndexJob
+     * @return array Job status
+     */
+    public function jobStatus(string $jobId): array
+    {
+        $response = $this->client()->get("/jobs/{$jobId}");
+
+        $response->throw();
+        return $response->json();
+    }
+
     /**
      * Delete an item from an index.
      *
@@ -390,6 +468,15 @@ public function generateEmbeddingsBatch(array $texts): array
     // HELPERS
     // =========================================================================
 
+    /**
+     * Encode a vector as raw little-endian float32 (4 bytes per dimension
+     * instead of ~13 characters of JSON).
+     */
+    protected function packVector(array $vector): string
+    {
+        return pack('g*', ...$vector);
+    }
+
     /**
      * Log uSearch operations if enabled.
      */
@@ -151,6 +151,13 @@
 
         // Weight for text results in hybrid search (0-1)
         'text_weight' => 0.3,
+
+        // Fuse text and semantic results in the uSearch service (BM25 over
+        // indexed content, one round trip) instead of merging with Scout here
+        'server_hybrid' => env('USEARCH_SERVER_HYBRID', false),
+
+        // Server-side fusion method: rrf (rank based) or weighted (scores)
+        'fusion' => env('USEARCH_FUSION', 'rrf'),
     ],
 
     /*
@@ -0,0 +1,113 @@
+"""
+Micro-batching of concurrent embedding requests.
+Coalesces single-text calls arriving within a short window into one batch.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-item requests and serve them with one batch call.
+
+    The first request of a batch starts a timer of ``max_wait_ms``; the batch
+    is sent when the timer fires or ``max_batch_size`` items are queued,
+    whichever comes first. Identical texts waiting or in flight share one
+    slot and one result.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[str]], Awaitable[list[Any]]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            handler: Coroutine producing one result per input, in order
+            max_batch_size: Maximum number of distinct texts per batch
+            max_wait_ms: Maximum time the first queued text waits for company
+        """
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: list[str] = []
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+        self.deduplicated = 0
+
+    async def submit(self, text: str) -> Any:
+        """Queue a text and wait for its result."""
+        self.requests += 1
+        future = self._inflight.get(text)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[text] = future
+            self._pending.append(text)
+
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+
+        # Shield so one cancelled caller does not cancel the shared result
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        """Send queued texts as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if batch:
+            self.batches += 1
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        # Leftovers start a new window
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+    async def _run(self, batch: list[str]):
+        """Run the handler and resolve the futures of a batch."""
+        try:
+            results = await self.handler(batch)
+            if len(results) != len(batch):
+                raise ValueError(f"Expected {len(batch)} results, got {len(results)}")
+        except Exception as e:
+            for text in batch:
+                future = self._inflight.pop(text)
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark retrieved: waiters may all have been cancelled
+                    future.exception()
+            return
+
+        for text, result in zip(batch, results):
+            future = self._inflight.pop(text)
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """Request, batch and de-duplication counters."""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "deduplicated": self.deduplicated,
+            "pending": len(self._pending),
+        }
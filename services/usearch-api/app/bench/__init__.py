@@ -0,0 +1,9 @@
+"""
+Recall/latency benchmark suite for the search engine.
+Run with ``python -m app.bench --help``.
+"""
+
+from app.bench.datasets import synthetic_dataset, load_dataset
+from app.bench.runner import Benchmark
+
+__all__ = ["Benchmark", "synthetic_dataset", "load_dataset"]
@@ -0,0 +1,112 @@
+"""
+Command-line entry point: ``python -m app.bench``.
+
+Examples:
+    python -m app.bench --dimensions 384 --count 100000
+    python -m app.bench --dimensions 1536 --dtype i8 --output bench-i8.json
+    python -m app.bench --connectivity 32 --expansion-add 256 --ef 128
+    python -m app.bench --dataset factors.npy --queries-file queries.npy
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+from app.bench.datasets import load_dataset, synthetic_dataset
+from app.bench.runner import Benchmark
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.bench",
+        description="Measure ingest, QPS, latency, recall@k and save/load time of the search engine.",
+    )
+    data = parser.add_argument_group("dataset")
+    data.add_argument("--dimensions", type=int, default=1536, help="Synthetic vector dimensions (e.g. 384, 1024, 1536)")
+    data.add_argument("--count", type=int, default=100_000, help="Synthetic base vectors")
+    data.add_argument("--queries", type=int, default=1000, help="Query vectors")
+    data.add_argument("--clusters", type=int, default=64, help="Synthetic cluster centers")
+    data.add_argument("--seed", type=int, default=0, help="Random seed")
+    data.add_argument("--dataset", type=Path, help=".npy matrix of base vectors (instead of synthetic data)")
+    data.add_argument("--queries-file", type=Path, help=".npy matrix of query vectors (with --dataset)")
+
+    index = parser.add_argument_group("index")
+    index.add_argument("--metric", default="cos", choices=["cos", "l2", "ip"])
+    index.add_argument("--dtype", default="f32", choices=["f32", "f16", "i8", "b1"])
+    index.add_argument("--mode", default="ann", choices=["ann", "exact", "auto"], help="Search mode under test")
+    index.add_argument("--connectivity", type=int, help="HNSW edges per node (M)")
+    index.add_argument("--expansion-add", type=int, help="HNSW ef_construction")
+    index.add_argument("--ef", type=int, help="HNSW candidates explored per query (ef_search)")
+    index.add_argument("--wal", action="store_true", help="Log writes to the write-ahead log during ingest")
+    index.add_argument("--search-threads", type=int, help="Engine thread pool size (default: one per core)")
+    index.add_argument("--path", type=Path, help="Index directory (default: temporary)")
+
+    run = parser.add_argument_group("run")
+    run.add_argument("--top-k", type=int, default=10, help="Neighbors per query (recall@k)")
+    run.add_argument("--batch-size", type=int, default=1000, help="Items per insert during ingest")
+    run.add_argument("--search-batch", type=int, default=100, help="Queries per batch search")
+    run.add_argument("--concurrency", type=int, default=8, help="Concurrent single-query searches")
+    run.add_argument(
+        "--selectivities",
+        type=lambda value: [float(part) for part in value.split(",")],
+        default=[0.5, 0.1, 0.01],
+        help="Comma-separated filter selectivities",
+    )
+    run.add_argument("--output", type=Path, help="Write the JSON report here (default: stdout)")
+    run.add_argument("--quiet", action="store_true", help="Only print the report")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark and emit its JSON report."""
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format="%(asctime)s %(message)s",
+        stream=sys.stderr,
+    )
+    # Engine internals log every save and load; keep the progress readable
+    logging.getLogger("app.search").setLevel(logging.WARNING)
+
+    if args.dataset is not None:
+        vectors, queries = load_dataset(args.dataset, args.queries_file, args.queries, args.seed)
+    else:
+        vectors, queries = synthetic_dataset(
+            args.count, args.queries, args.dimensions, clusters=args.clusters, seed=args.seed
+        )
+
+    benchmark = Benchmark(
+        vectors,
+        queries,
+        top_k=args.top_k,
+        batch_size=args.batch_size,
+        search_batch=args.search_batch,
+        concurrency=args.concurrency,
+        selectivities=tuple(args.selectivities),
+        metric=args.metric,
+        dtype=args.dtype,
+        mode=args.mode,
+        connectivity=args.connectivity,
+        expansion_add=args.expansion_add,
+        ef=args.ef,
+        wal=args.wal,
+        search_threads=args.search_threads,
+        path=args.path,
+    )
+    report = asyncio.run(benchmark.run())
+    if args.dataset is not None:
+        report["config"]["dataset"] = str(args.dataset)
+
+    output = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
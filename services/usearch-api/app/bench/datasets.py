@@ -0,0 +1,81 @@
+"""
+Benchmark datasets.
+Clustered synthetic embeddings, or vectors loaded from .npy files.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+def synthetic_dataset(
+    count: int,
+    queries: int,
+    dimensions: int = 1536,
+    clusters: int = 64,
+    noise: float = 0.3,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Generate clustered float32 vectors that behave like text embeddings.
+
+    Uniform random vectors are nearly equidistant in high dimensions, which
+    makes HNSW look worse than on real data; points drawn around a set of
+    centers have the neighborhood structure search actually exploits.
+
+    Args:
+        count: Number of base vectors
+        queries: Number of query vectors, drawn from the same distribution
+        dimensions: Vector dimensions (e.g. 384, 1024, 1536)
+        clusters: Number of cluster centers
+        noise: Spread of the points around their center
+        seed: Random seed
+
+    Returns:
+        Tuple of (base vectors, query vectors)
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimensions), dtype=np.float32)
+
+    def draw(n: int) -> np.ndarray:
+        assignment = rng.integers(0, clusters, size=n)
+        points = centers[assignment] + noise * rng.standard_normal((n, dimensions), dtype=np.float32)
+        return points.astype(np.float32)
+
+    return draw(count), draw(queries)
+
+
+def load_dataset(
+    path: Path,
+    queries_path: Optional[Path] = None,
+    queries: int = 1000,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Load base (and optionally query) vectors from .npy files.
+
+    Without a query file, queries are sampled from the base vectors and
+    removed from them, so no query finds itself.
+
+    Args:
+        path: .npy file with a (count, dimensions) matrix
+        queries_path: Optional .npy file with query vectors
+        queries: Number of sampled queries when no query file is given
+        seed: Random seed for sampling
+
+    Returns:
+        Tuple of (base vectors, query vectors)
+    """
+    base = np.load(path).astype(np.float32, copy=False)
+    if base.ndim != 2:
+        raise ValueError(f"Expected a 2D matrix in '{path}', got shape {base.shape}")
+
+    if queries_path is not None:
+        return base, np.load(queries_path).astype(np.float32, copy=False)
+
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(base), size=min(queries, len(base) // 2), replace=False)
+    keep = np.ones(len(base), dtype=bool)
+    keep[picked] = False
+    return base[keep], base[picked]
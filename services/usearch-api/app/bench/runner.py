@@ -0,0 +1,365 @@
+"""
+Benchmark runner.
+Measures ingest, search latency/QPS, recall@k, filtered search and persistence.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import platform
+import resource
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import usearch
+
+from app.search import SearchEngine
+from app.models import SearchResult
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "bench"
+
+
+def latency_summary(seconds: list[float]) -> dict:
+    """Percentiles of a list of latencies, in milliseconds."""
+    samples = np.asarray(seconds) * 1000
+    return {
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+    }
+
+
+def recall_at_k(results: list[list[SearchResult]], truth: list[list[SearchResult]]) -> float:
+    """Share of the ground-truth neighbors found, over all queries."""
+    expected = sum(len(hits) for hits in truth)
+    if not expected:
+        return 1.0
+    found = sum(
+        len({r.id for r in hits} & {r.id for r in exact})
+        for hits, exact in zip(results, truth)
+    )
+    return round(found / expected, 4)
+
+
+class Benchmark:
+    """
+    End-to-end benchmark of one SearchEngine configuration.
+
+    The engine is driven through its public async API, exactly as the HTTP
+    endpoints use it, against an index built from ``vectors``. Ground truth
+    comes from the engine's exact search mode. Every item carries a
+    ``bucket`` field (0-999) so filters of a known selectivity can be built.
+    """
+
+    FILTER_BUCKETS = 1000
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        queries: np.ndarray,
+        top_k: int = 10,
+        batch_size: int = 1000,
+        search_batch: int = 100,
+        concurrency: int = 8,
+        selectivities: tuple[float, ...] = (0.5, 0.1, 0.01),
+        metric: str = "cos",
+        dtype: str = "f32",
+        mode: str = "ann",
+        connectivity: Optional[int] = None,
+        expansion_add: Optional[int] = None,
+        ef: Optional[int] = None,
+        wal: bool = False,
+        search_threads: Optional[int] = None,
+        path: Optional[Path] = None,
+    ):
+        """
+        Initialize the benchmark.
+
+        Args:
+            vectors: Base vectors to index
+            queries: Query vectors
+            top_k: Neighbors per query (recall@k)
+            batch_size: Items per index_items call during ingest
+            search_batch: Queries per search_many call
+            concurrency: Concurrent searches for the throughput run
+            selectivities: Share of items passing each filtered run
+            metric: Distance metric of the index (cos, l2, ip)
+            dtype: Storage type of the index (f32, f16, i8, b1)
+            mode: Search mode under test (ann, exact, auto)
+            connectivity: HNSW edges per node (default: engine default)
+            expansion_add: HNSW ef_construction (default: engine default)
+            ef: HNSW candidates explored per query (default: engine default)
+            wal: Log writes to the write-ahead log during ingest
+            search_threads: Engine thread pool size (default: one per core)
+            path: Index directory (default: a temporary directory)
+        """
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.queries = np.ascontiguousarray(queries, dtype=np.float32)
+        self.top_k = top_k
+        self.batch_size = batch_size
+        self.search_batch = search_batch
+        self.concurrency = concurrency
+        self.selectivities = tuple(selectivities)
+        self.metric = metric
+        self.dtype = dtype
+        self.mode = mode
+        self.connectivity = connectivity
+        self.expansion_add = expansion_add
+        self.ef = ef
+        self.wal = wal
+        self.search_threads = search_threads
+        self.path = Path(path) if path is not None else None
+
+    def config(self) -> dict:
+        """Parameters of this run, for the report."""
+        return {
+            "vectors": len(self.vectors),
+            "queries": len(self.queries),
+            "dimensions": int(self.vectors.shape[1]),
+            "top_k": self.top_k,
+            "batch_size": self.batch_size,
+            "search_batch": self.search_batch,
+            "concurrency": self.concurrency,
+            "selectivities": list(self.selectivities),
+            "metric": self.metric,
+            "dtype": self.dtype,
+            "mode": self.mode,
+            "connectivity": self.connectivity or SearchEngine.HNSW_DEFAULTS["connectivity"],
+            "expansion_add": self.expansion_add or SearchEngine.HNSW_DEFAULTS["expansion_add"],
+            "ef": self.ef or SearchEngine.HNSW_DEFAULTS["expansion_search"],
+            "wal": self.wal,
+            "search_threads": self.search_threads,
+        }
+
+    @staticmethod
+    def environment() -> dict:
+        """Hardware and library versions, so reports can be compared."""
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "usearch": usearch.__version__,
+        }
+
+    async def run(self) -> dict:
+        """
+        Run every benchmark stage.
+
+        Returns:
+            JSON-serializable report with config, environment and results
+        """
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            return await self._run(self.path)
+        with tempfile.TemporaryDirectory(prefix="usearch-bench-") as tmp:
+            return await self._run(Path(tmp))
+
+    async def _run(self, path: Path) -> dict:
+        """Run the stages against an index stored in ``path``."""
+        engine = self._engine(path)
+        results = {}
+        try:
+            logger.info(f"Indexing {len(self.vectors)} vectors")
+            results["ingest"] = await self.ingest(engine)
+
+            logger.info("Computing exact ground truth")
+            truth = await self._search_batches(engine, self.queries, mode="exact")
+
+            logger.info("Running single-query searches")
+            results["search"] = await self.search(engine, truth)
+
+            logger.info("Running batch searches")
+            results["batch_search"] = await self.batch_search(engine, truth)
+
+            logger.info("Running filtered searches")
+            results["filtered_search"] = [
+                await self.filtered_search(engine, selectivity) for selectivity in self.selectivities
+            ]
+
+            results["memory"] = self.memory(engine)
+
+            logger.info("Saving and loading the index")
+            results["persistence"] = await self.persistence(engine, path)
+        finally:
+            engine.close()
+
+        return {
+            "config": self.config(),
+            "environment": self.environment(),
+            "results": results,
+        }
+
+    def _engine(self, path: Path) -> SearchEngine:
+        """Engine used for a run; compaction and snapshots stay out of the way."""
+        return SearchEngine(
+            index_path=str(path),
+            dimensions=int(self.vectors.shape[1]),
+            dtype=self.dtype,
+            compaction_threshold=0,
+            wal=self.wal,
+            snapshot_mutations=0,
+            search_threads=self.search_threads,
+        )
+
+    async def ingest(self, engine: SearchEngine) -> dict:
+        """Index all vectors in batches and measure throughput."""
+        await engine.create_index(
+            INDEX_NAME,
+            dimensions=int(self.vectors.shape[1]),
+            metric=self.metric,
+            dtype=self.dtype,
+            connectivity=self.connectivity,
+            expansion_add=self.expansion_add,
+            expansion_search=self.ef,
+        )
+
+        latencies = []
+        started = time.perf_counter()
+        for start in range(0, len(self.vectors), self.batch_size):
+            end = min(start + self.batch_size, len(self.vectors))
+            ids = [f"v-{i}" for i in range(start, end)]
+            metadatas = [{"bucket": i % self.FILTER_BUCKETS} for i in range(start, end)]
+            batch_started = time.perf_counter()
+            await engine.index_items(INDEX_NAME, ids, self.vectors[start:end], metadatas)
+            latencies.append(time.perf_counter() - batch_started)
+        elapsed = time.perf_counter() - started
+
+        return {
+            "seconds": round(elapsed, 3),
+            "vectors_per_second": round(len(self.vectors) / elapsed, 1),
+            "batch_latency": latency_summary(latencies),
+        }
+
+    async def search(self, engine: SearchEngine, truth: list[list[SearchResult]]) -> dict:
+        """Single-query latency (one at a time) and throughput (concurrent)."""
+        results, latencies = [], []
+        started = time.perf_counter()
+        for query in self.queries:
+            query_started = time.perf_counter()
+            results.append(await engine.search(INDEX_NAME, query, top_k=self.top_k, mode=self.mode))
+            latencies.append(time.perf_counter() - query_started)
+        sequential = time.perf_counter() - started
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        concurrent_latencies = []
+
+        async def one(query: np.ndarray):
+            async with semaphore:
+                query_started = time.perf_counter()
+                await engine.search(INDEX_NAME, query, top_k=self.top_k, mode=self.mode)
+                concurrent_latencies.append(time.perf_counter() - query_started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(query) for query in self.queries))
+        concurrent = time.perf_counter() - started
+
+        return {
+            "qps": round(len(self.queries) / sequential, 1),
+            "latency": latency_summary(latencies),
+            "concurrent_qps": round(len(self.queries) / concurrent, 1),
+            "concurrent_latency": latency_summary(concurrent_latencies),
+            f"recall_at_{self.top_k}": recall_at_k(results, truth),
+        }
+
+    async def batch_search(self, engine: SearchEngine, truth: list[list[SearchResult]]) -> dict:
+        """Throughput of multi-query searches."""
+        latencies = []
+        started = time.perf_counter()
+        results = await self._search_batches(engine, self.queries, mode=self.mode, latencies=latencies)
+        elapsed = time.perf_counter() - started
+
+        return {
+            "batch_size": self.search_batch,
+            "qps": round(len(self.queries) / elapsed, 1),
+            "batch_latency": latency_summary(latencies),
+            f"recall_at_{self.top_k}": recall_at_k(results, truth),
+        }
+
+    async def filtered_search(self, engine: SearchEngine, selectivity: float) -> dict:
+        """Latency and recall of searches whose filter passes ``selectivity`` of the items."""
+        buckets = max(1, round(self.FILTER_BUCKETS * selectivity))
+        filters = {"bucket": list(range(buckets))}
+
+        truth = await self._search_batches(engine, self.queries, mode="exact", filters=filters)
+
+        results, latencies = [], []
+        started = time.perf_counter()
+        for query in self.queries:
+            query_started = time.perf_counter()
+            results.append(await engine.search(
+                INDEX_NAME, query, top_k=self.top_k, filters=filters, mode=self.mode
+            ))
+            latencies.append(time.perf_counter() - query_started)
+        elapsed = time.perf_counter() - started
+
+        return {
+            "selectivity": buckets / self.FILTER_BUCKETS,
+            "qps": round(len(self.queries) / elapsed, 1),
+            "latency": latency_summary(latencies),
+            f"recall_at_{self.top_k}": recall_at_k(results, truth),
+        }
+
+    async def persistence(self, engine: SearchEngine, path: Path) -> dict:
+        """Time to snapshot the index and to load it into a fresh engine."""
+        started = time.perf_counter()
+        await engine.save_indexes()
+        save_seconds = time.perf_counter() - started
+
+        size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+        reloaded = self._engine(path)
+        started = time.perf_counter()
+        await reloaded.load_indexes()
+        load_seconds = time.perf_counter() - started
+        loaded = len(reloaded.indexes.get(INDEX_NAME, []))
+        reloaded.close()
+
+        return {
+            "save_seconds": round(save_seconds, 3),
+            "load_seconds": round(load_seconds, 3),
+            "disk_bytes": size,
+            "loaded_vectors": loaded,
+        }
+
+    @staticmethod
+    def memory(engine: SearchEngine) -> dict:
+        """Index memory as reported by uSearch, and peak process RSS."""
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":
+            peak *= 1024  # kilobytes on Linux, bytes on macOS
+        return {
+            "index_bytes": int(engine.indexes[INDEX_NAME].memory_usage),
+            "peak_rss_bytes": int(peak),
+        }
+
+    async def _search_batches(
+        self,
+        engine: SearchEngine,
+        queries: np.ndarray,
+        mode: str,
+        filters: Optional[dict] = None,
+        latencies: Optional[list[float]] = None,
+    ) -> list[list[SearchResult]]:
+        """Search all queries ``search_batch`` at a time."""
+        results = []
+        for start in range(0, len(queries), self.search_batch):
+            batch_started = time.perf_counter()
+            results.extend(await engine.search_many(
+                INDEX_NAME,
+                queries[start:start + self.search_batch],
+                top_k=self.top_k,
+                filters=filters,
+                mode=mode,
+            ))
+            if latencies is not None:
+                latencies.append(time.perf_counter() - batch_started)
+        return results
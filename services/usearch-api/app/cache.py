@@ -0,0 +1,251 @@
+"""
+Two-tier embedding cache.
+Bounded in-memory LRU in front of an append-only, memory-mapped disk tier.
+"""
+
+import os
+import re
+import fcntl
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 32  # sha256
+
+
+class _DiskTier:
+    """
+    Append-only embedding file for one (provider, model) pair.
+
+    ``{name}.cache`` holds fixed-size records: the sha256 digest of a cached
+    text followed by its float32 vector. Several worker processes may share
+    the file: appends hold an exclusive ``flock`` and take their row numbers
+    from the file size, and rows appended by other workers are indexed when
+    a lookup misses. A torn record is trimmed on open.
+    """
+
+    def __init__(self, path: Path, name: str, dimensions: int):
+        """Open or create the tier file and index its digests."""
+        self.dimensions = dimensions
+        self.record = np.dtype([("digest", f"V{DIGEST_SIZE}"), ("vector", np.float32, (dimensions,))])
+        self.file = path / f"{name}.cache"
+        path.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.file, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self.rows: dict[bytes, int] = {}
+        self._indexed = 0  # records read into ``rows``
+        self._mapped = 0
+        self._data = np.empty(0, dtype=self.record)
+
+        with self._locked(fcntl.LOCK_EX):
+            # Trim a record that was only half-written before a crash
+            size = os.fstat(self._fd).st_size
+            os.ftruncate(self._fd, size - size % self.record.itemsize)
+            self._read_new()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @contextmanager
+    def _locked(self, operation: int):
+        """Hold a shared or exclusive lock on the tier file."""
+        fcntl.flock(self._fd, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _read_new(self):
+        """Index records appended since the last read; the caller holds the lock."""
+        size = self.record.itemsize
+        count = os.fstat(self._fd).st_size // size
+        if count <= self._indexed:
+            return
+        data = os.pread(self._fd, (count - self._indexed) * size, self._indexed * size)
+        for row, offset in enumerate(range(0, len(data), size), start=self._indexed):
+            self.rows.setdefault(data[offset:offset + DIGEST_SIZE], row)
+        self._indexed = count
+
+    def get(self, digest: bytes) -> Optional[np.ndarray]:
+        """Read one cached vector, or None if absent."""
+        row = self.rows.get(digest)
+        if row is None:
+            # Another worker may have cached it since
+            if os.fstat(self._fd).st_size < (self._indexed + 1) * self.record.itemsize:
+                return None
+            with self._locked(fcntl.LOCK_SH):
+                self._read_new()
+            row = self.rows.get(digest)
+            if row is None:
+                return None
+        if row >= self._mapped:
+            self._map()
+        return np.array(self._data[row]["vector"])
+
+    def append(self, digests: list[bytes], vectors: np.ndarray):
+        """Append new vectors; digests already on disk are skipped."""
+        with self._locked(fcntl.LOCK_EX):
+            # Rows are numbered by file position, so catch up with other writers first
+            self._read_new()
+            fresh = list({digest: i for i, digest in enumerate(digests) if digest not in self.rows}.items())
+            if not fresh:
+                return
+            records = np.empty(len(fresh), dtype=self.record)
+            records["digest"] = [digest for digest, _ in fresh]
+            records["vector"] = vectors[[i for _, i in fresh]]
+            data = memoryview(records.tobytes())
+            while data:
+                data = data[os.write(self._fd, data):]
+            self._read_new()
+
+    def _map(self):
+        """Map all indexed records."""
+        self._mapped = self._indexed
+        self._data = np.memmap(self.file, dtype=self.record, mode="r", shape=(self._mapped,))
+
+    def close(self):
+        """Close the tier file."""
+        os.close(self._fd)
+
+
+class EmbeddingCache:
+    """
+    Cache of embeddings keyed by (provider, model, sha256(text)).
+
+    Lookups hit a bounded LRU first, then the disk tier of the matching
+    provider/model, which survives restarts. Disk hits are promoted to the
+    LRU. Hit and miss counters are exposed via ``stats``.
+
+    Methods block on disk I/O and are safe to call from worker threads;
+    async callers should run them with ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Directory for the disk tier (None keeps the cache in memory)
+            max_entries: Maximum number of vectors held in the LRU tier
+        """
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self._lru: OrderedDict[tuple[str, str, bytes], np.ndarray] = OrderedDict()
+        self._tiers: dict[tuple[str, str], Optional[_DiskTier]] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        """sha256 digest of a text."""
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def _tier(self, provider: str, model: str, dimensions: Optional[int] = None) -> Optional[_DiskTier]:
+        """Open the disk tier of a provider/model, if it exists or can be created."""
+        if self.path is None:
+            return None
+        tier = self._tiers.get((provider, model))
+        if tier is not None:
+            return tier
+
+        # Dimensions are recorded in a sidecar when the tier is created
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{provider}-{model}")
+        dims_file = self.path / f"{name}.dims"
+        if dims_file.exists() and (self.path / f"{name}.cache").exists():
+            dimensions = int(dims_file.read_text())
+        elif dimensions is None:
+            return None
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+            dims_file.write_text(str(dimensions))
+
+        tier = _DiskTier(self.path, name, dimensions)
+        self._tiers[(provider, model)] = tier
+        return tier
+
+    def get(self, provider: str, model: str, text: str) -> Optional[np.ndarray]:
+        """Look up one embedding."""
+        with self._lock:
+            return self._get(provider, model, text)
+
+    def _get(self, provider: str, model: str, text: str) -> Optional[np.ndarray]:
+        """Look up one embedding; the caller holds the lock."""
+        key = (provider, model, self.digest(text))
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+
+        tier = self._tier(provider, model)
+        vector = tier.get(key[2]) if tier is not None else None
+        if vector is not None:
+            self.disk_hits += 1
+            self._remember(key, vector)
+            return vector
+
+        self.misses += 1
+        return None
+
+    def get_many(self, provider: str, model: str, texts: list[str]) -> list[Optional[np.ndarray]]:
+        """Look up several embeddings; missing entries are None."""
+        with self._lock:
+            return [self._get(provider, model, text) for text in texts]
+
+    def put_many(self, provider: str, model: str, texts: list[str], vectors: np.ndarray):
+        """Store embeddings in both tiers."""
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        digests = [self.digest(text) for text in texts]
+
+        with self._lock:
+            for digest, vector in zip(digests, vectors):
+                self._remember((provider, model, digest), vector.copy())
+
+            try:
+                tier = self._tier(provider, model, vectors.shape[1])
+                if tier is not None and tier.dimensions == vectors.shape[1]:
+                    tier.append(digests, vectors)
+            except OSError as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+    def put(self, provider: str, model: str, text: str, vector):
+        """Store one embedding."""
+        self.put_many(provider, model, [text], np.asarray([vector], dtype=np.float32))
+
+    def _remember(self, key: tuple[str, str, bytes], vector: np.ndarray):
+        """Insert into the LRU tier, evicting the least recently used entry."""
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._lru),
+            "disk_entries": sum(len(tier) for tier in self._tiers.values() if tier is not None),
+        }
+
+    def close(self):
+        """Close the disk tier files."""
+        with self._lock:
+            for tier in self._tiers.values():
+                if tier is not None:
+                    tier.close()
+            self._tiers = {}
@@ -0,0 +1,86 @@
+"""
+Binary vector encoding.
+Raw little-endian float32 and .npy payloads for the vector endpoints.
+"""
+
+import io
+from typing import Optional
+
+import numpy as np
+
+RAW_FLOAT32 = "application/octet-stream"
+NPY = "application/x-npy"
+BINARY_TYPES = (RAW_FLOAT32, NPY)
+
+
+def media_type(header: Optional[str]) -> str:
+    """Media type of a Content-Type header, without parameters."""
+    return (header or "").split(";", 1)[0].strip().lower()
+
+
+def binary_accept(header: Optional[str]) -> Optional[str]:
+    """Binary media type requested by an Accept header, if any."""
+    for part in (header or "").split(","):
+        media = media_type(part)
+        if media in BINARY_TYPES:
+            return media
+    return None
+
+
+def decode_vectors(body: bytes, media: str) -> np.ndarray:
+    """
+    View a binary payload as float32 vectors.
+
+    Little-endian float32 data is wrapped without copying, so the request
+    body goes straight into the index insert or query.
+
+    Args:
+        body: Request body
+        media: RAW_FLOAT32 (a flat vector) or NPY (any shape)
+
+    Returns:
+        Read-only float32 array backed by ``body`` where possible
+    """
+    if media == RAW_FLOAT32:
+        if len(body) % 4:
+            raise ValueError(f"Raw float32 payload of {len(body)} bytes is not a multiple of 4")
+        return np.frombuffer(body, dtype="<f4").astype(np.float32, copy=False)
+
+    if media == NPY:
+        stream = io.BytesIO(body)
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+        if dtype.hasobject:
+            raise ValueError("Object arrays are not supported")
+        count = int(np.prod(shape))
+        if len(body) - stream.tell() < count * dtype.itemsize:
+            raise ValueError(f"Truncated .npy payload for shape {shape}")
+        array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+        array = array.reshape(shape, order="F" if fortran_order else "C")
+        return array.astype(np.float32, copy=False)
+
+    raise ValueError(f"Unsupported vector media type: {media}")
+
+
+def encode_vectors(vectors: np.ndarray, media: str) -> memoryview:
+    """
+    Encode float32 vectors for a binary response.
+
+    Args:
+        vectors: Vector or matrix
+        media: RAW_FLOAT32 (row-major data only) or NPY (with shape header)
+
+    Returns:
+        Response body
+    """
+    array = np.ascontiguousarray(vectors, dtype="<f4")
+    if media == RAW_FLOAT32:
+        return memoryview(array).cast("B")
+    if media == NPY:
+        stream = io.BytesIO()
+        np.save(stream, array, allow_pickle=False)
+        return stream.getbuffer()
+    raise ValueError(f"Unsupported vector media type: {media}")
@@ -4,13 +4,33 @@ Supports OpenAI, Anthropic Claude, and local models.
 """
 
 import os
+import time
+import asyncio
 import logging
-from typing import Optional
+from typing import Awaitable, Optional
 import httpx
+import numpy as np
+
+from app.batching import MicroBatcher
+from app.cache import EmbeddingCache
+from app.local import LocalEncoder
+from app.metrics import EMBEDDING_ERRORS, EMBEDDING_LATENCY, EMBEDDING_RESPONSES, EMBEDDING_TEXTS
+from app.pipeline import BatchPipeline
 
 logger = logging.getLogger(__name__)
 
 
+def error_kind(error: Exception) -> str:
+    """Short label of a provider failure for the error counter."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "transport"
+    return type(error).__name__
+
+
 class EmbeddingService:
     """
     Generate text embeddings using various providers.
@@ -26,6 +46,8 @@ class EmbeddingService:
             "url": "https://api.openai.com/v1/embeddings",
             "default_model": "text-embedding-3-small",
             "dimensions": 1536,
+            "max_batch_items": 2048,
+            "max_batch_tokens": 300000,
         },
         "anthropic": {
             "url": "https://api.anthropic.com/v1/embeddings",
@@ -36,6 +58,8 @@ class EmbeddingService:
             "url": "https://api.voyageai.com/v1/embeddings",
             "default_model": "voyage-large-2",
             "dimensions": 1536,
+            "max_batch_items": 128,
+            "max_batch_tokens": 120000,
         },
     }
 
@@ -44,6 +68,13 @@ class EmbeddingService:
         provider: str = "openai",
         api_key: Optional[str] = None,
         model: Optional[str] = None,
+        cache: Optional[EmbeddingCache] = None,
+        batch_max_size: int = 64,
+        batch_wait_ms: float = 5.0,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        local_workers: Optional[int] = None,
+        local_batch_size: int = 32,
     ):
         """
         Initialize embedding service.
@@ -52,10 +83,23 @@ class EmbeddingService:
             provider: Embedding provider (openai, anthropic, voyage, local)
             api_key: API key for the provider
             model: Specific model to use
+            cache: Optional embedding cache consulted before the provider
+            batch_max_size: Maximum texts coalesced into one provider call
+            batch_wait_ms: Window for coalescing concurrent single-text
+                requests (0 disables micro-batching)
+            max_concurrency: Maximum provider requests in flight per batch job
+            max_retries: Retries per failed sub-batch (rate limits, 5xx)
+            local_workers: Inference threads for the local provider
+                (default: min(4, cores))
+            local_batch_size: Maximum texts per local inference batch
         """
         self.provider = provider.lower()
+        self.cache = cache
         self.api_key = api_key or os.getenv(f"{provider.upper()}_API_KEY")
         self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._pipelines: dict[str, BatchPipeline] = {}
 
         # Get provider config
         if self.provider in self.PROVIDER_CONFIGS:
@@ -64,23 +108,32 @@ class EmbeddingService:
             self.model = model or config["default_model"]
             self.dimensions = config["dimensions"]
         elif self.provider == "local":
-            self._init_local_model(model)
+            self._init_local_model(model, local_workers, local_batch_size)
         else:
             raise ValueError(f"Unknown provider: {provider}")
 
         # HTTP client for API calls
         self.client = httpx.AsyncClient(timeout=60.0)
 
+        # Coalesce concurrent single-text requests into batched provider calls
+        self.batcher = None
+        if batch_wait_ms > 0:
+            self.batcher = MicroBatcher(
+                self._generate_embeddings_batch_uncached,
+                max_batch_size=batch_max_size,
+                max_wait_ms=batch_wait_ms,
+            )
+
         logger.info(f"Initialized EmbeddingService with provider={self.provider}, model={self.model}")
 
-    def _init_local_model(self, model: Optional[str]):
+    def _init_local_model(self, model: Optional[str], workers: Optional[int], batch_size: int):
         """Initialize local sentence-transformers model."""
         try:
             from sentence_transformers import SentenceTransformer
             model_name = model or "all-MiniLM-L6-v2"
-            self._local_model = SentenceTransformer(model_name)
+            self._local = LocalEncoder(SentenceTransformer(model_name), workers, batch_size)
             self.model = model_name
-            self.dimensions = self._local_model.get_sentence_embedding_dimension()
+            self.dimensions = self._local.dimensions
             logger.info(f"Loaded local model: {model_name}")
         except ImportError:
             raise ImportError("sentence-transformers required for local embeddings")
@@ -95,16 +148,33 @@ class EmbeddingService:
         Returns:
             List of floats representing the embedding vector
         """
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, self.provider, self.model, text)
+            if cached is not None:
+                return cached.tolist()
+
+        if self.batcher is not None:
+            embedding = await self.batcher.submit(text)
+        else:
+            embedding = await self._generate_embedding_uncached(text)
+
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, self.provider, self.model, text, embedding)
+        return embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
+
+    async def _generate_embedding_uncached(self, text: str) -> list[float]:
+        """Generate embedding for a single text with the provider."""
         if self.provider == "local":
-            return self._generate_local_embedding(text)
+            call = self._generate_local_embedding(text)
         elif self.provider == "openai":
-            return await self._generate_openai_embedding(text)
+            call = self._generate_openai_embedding(text)
         elif self.provider == "anthropic":
-            return await self._generate_anthropic_embedding(text)
+            call = self._generate_anthropic_embedding(text)
         elif self.provider == "voyage":
-            return await self._generate_voyage_embedding(text)
+            call = self._generate_voyage_embedding(text)
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
+        return await self._observe(call, 1)
 
     async def generate_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
         """
@@ -118,16 +188,70 @@ class EmbeddingService:
         Returns:
             List of embedding vectors
         """
+        return (await self.generate_embeddings_array(texts)).tolist()
+
+    async def generate_embeddings_array(self, texts: list[str]) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts as a float32 matrix.
+
+        Preferred over generate_embeddings_batch when the vectors go straight
+        into an index or a search, as it avoids per-row Python lists.
+
+        Args:
+            texts: List of input texts
+
+        Returns:
+            float32 matrix with one row per input text
+        """
+        if self.cache is None:
+            return await self._generate_embeddings_batch_uncached(texts)
+
+        cached = await asyncio.to_thread(self.cache.get_many, self.provider, self.model, texts)
+
+        # Only embed distinct texts that missed the cache
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        fresh = {}
+        if missing:
+            embeddings = await self._generate_embeddings_batch_uncached(missing)
+            await asyncio.to_thread(self.cache.put_many, self.provider, self.model, missing, embeddings)
+            fresh = dict(zip(missing, embeddings))
+
+        if not texts:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+        return np.stack([
+            vector if vector is not None else fresh[text]
+            for text, vector in zip(texts, cached)
+        ])
+
+    async def _generate_embeddings_batch_uncached(self, texts: list[str]) -> np.ndarray:
+        """Generate embeddings for multiple texts with the provider."""
+        if not texts:
+            return np.empty((0, self.dimensions), dtype=np.float32)
         if self.provider == "local":
-            return self._generate_local_embeddings_batch(texts)
+            return await self._observe(self._generate_local_embeddings_batch(texts), len(texts))
         elif self.provider == "openai":
-            return await self._generate_openai_embeddings_batch(texts)
+            call = self._generate_openai_embeddings_batch(texts)
         elif self.provider == "anthropic":
-            return await self._generate_anthropic_embeddings_batch(texts)
+            call = self._generate_anthropic_embeddings_batch(texts)
         elif self.provider == "voyage":
-            return await self._generate_voyage_embeddings_batch(texts)
+            call = self._generate_voyage_embeddings_batch(texts)
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
+        embeddings = await self._observe(call, len(texts))
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+
+    async def _observe(self, call: Awaitable, texts: int):
+        """Await a provider call, recording its latency, text count or failure."""
+        provider = self.provider
+        start = time.perf_counter()
+        try:
+            result = await call
+        except Exception as e:
+            EMBEDDING_ERRORS.labels(provider, error_kind(e)).inc()
+            raise
+        EMBEDDING_LATENCY.labels(provider).observe(time.perf_counter() - start)
+        EMBEDDING_TEXTS.labels(provider).inc(texts)
+        return result
 
     # OpenAI Implementation
     async def _generate_openai_embedding(self, text: str) -> list[float]:
@@ -150,33 +274,13 @@ class EmbeddingService:
 
     async def _generate_openai_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
         """Generate embeddings batch using OpenAI API."""
-        # OpenAI supports up to 2048 inputs per request
-        batch_size = 2048
-        all_embeddings = []
-
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        return await self._pipeline("openai").run(texts)
 
-            response = await self.client.post(
-                self.url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self.model,
-                    "input": batch,
-                    "encoding_format": "float",
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # Sort by index to maintain order
-            embeddings = sorted(data["data"], key=lambda x: x["index"])
-            all_embeddings.extend([e["embedding"] for e in embeddings])
-
-        return all_embeddings
+    def _parse_openai_batch(self, data: dict) -> list[list[float]]:
+        """Extract embeddings from an OpenAI batch response."""
+        # Sort by index to maintain order
+        embeddings = sorted(data["data"], key=lambda x: x["index"])
+        return [e["embedding"] for e in embeddings]
 
     # Anthropic Implementation
     async def _generate_anthropic_embedding(self, text: str) -> list[float]:
@@ -220,43 +324,73 @@ class EmbeddingService:
 
     async def _generate_voyage_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
         """Generate embeddings batch using Voyage AI API."""
-        batch_size = 128  # Voyage AI limit
+        return await self._pipeline("voyage").run(texts)
 
-        all_embeddings = []
+    def _parse_voyage_batch(self, data: dict) -> list[list[float]]:
+        """Extract embeddings from a Voyage AI batch response."""
+        return [e["embedding"] for e in data["data"]]
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+    # Batch pipeline
+    def _pipeline(self, provider: str) -> BatchPipeline:
+        """
+        Get the concurrent batch pipeline of a provider.
 
+        Request limits come from PROVIDER_CONFIGS and can be overridden
+        with {PROVIDER}_MAX_BATCH_ITEMS / {PROVIDER}_MAX_BATCH_TOKENS.
+        """
+        pipeline = self._pipelines.get(provider)
+        if pipeline is None:
+            config = self.PROVIDER_CONFIGS[provider]
+            prefix = provider.upper()
+            pipeline = BatchPipeline(
+                send=self._post_batch,
+                parse=self._parse_openai_batch if provider == "openai" else self._parse_voyage_batch,
+                max_items=int(os.getenv(f"{prefix}_MAX_BATCH_ITEMS", config["max_batch_items"])),
+                max_tokens=int(os.getenv(f"{prefix}_MAX_BATCH_TOKENS", config["max_batch_tokens"])),
+                max_concurrency=self.max_concurrency,
+                max_retries=self.max_retries,
+            )
+            self._pipelines[provider] = pipeline
+        return pipeline
+
+    async def _post_batch(self, batch: list[str]) -> httpx.Response:
+        """Post one sub-batch to the current provider without raising."""
+        payload = {"model": self.model, "input": batch}
+        if self.provider == "openai":
+            payload["encoding_format"] = "float"
+        try:
             response = await self.client.post(
                 self.url,
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json",
                 },
-                json={
-                    "model": self.model,
-                    "input": batch,
-                },
+                json=payload,
             )
-            response.raise_for_status()
-            data = response.json()
+        except httpx.TransportError as e:
+            # Retried by the pipeline; count each attempt
+            EMBEDDING_RESPONSES.labels(self.provider, error_kind(e)).inc()
+            raise
+        EMBEDDING_RESPONSES.labels(self.provider, str(response.status_code)).inc()
+        return response
 
-            embeddings = [e["embedding"] for e in data["data"]]
-            all_embeddings.extend(embeddings)
-
-        return all_embeddings
+    def pipeline_stats(self) -> dict:
+        """Request, retry and split counters of the batch pipelines."""
+        return {provider: pipeline.stats() for provider, pipeline in self._pipelines.items()}
 
     # Local Model Implementation
-    def _generate_local_embedding(self, text: str) -> list[float]:
+    async def _generate_local_embedding(self, text: str) -> np.ndarray:
         """Generate embedding using local sentence-transformers model."""
-        embedding = self._local_model.encode(text)
-        return embedding.tolist()
+        return (await self._local.encode([text]))[0]
 
-    def _generate_local_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
+    async def _generate_local_embeddings_batch(self, texts: list[str]) -> np.ndarray:
         """Generate embeddings batch using local model."""
-        embeddings = self._local_model.encode(texts)
-        return [e.tolist() for e in embeddings]
+        return await self._local.encode(texts)
 
     async def close(self):
-        """Close HTTP client."""
+        """Close HTTP client, local worker pool and cache files."""
         await self.client.aclose()
+        if self.cache is not None:
+            self.cache.close()
+        if self.provider == "local":
+            self._local.close()
@@ -0,0 +1,207 @@
+"""
+Inverted index over item metadata.
+Resolves search filters to candidate key sets before vector scoring.
+"""
+
+import logging
+from collections.abc import Hashable
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataIndex:
+    """
+    Per-field inverted index mapping metadata values to uSearch keys.
+
+    Postings loaded from the on-disk metadata columns are kept as sorted
+    uint64 key arrays; items written since then live in per-value sets, and
+    keys whose loaded postings went stale (updated or deleted items) are
+    masked out at query time. Snapshots merge both into a new base and drop
+    the stale keys, like the LexicalIndex, so the mask only covers changes
+    since the last snapshot. Fields the index cannot answer (unhashable
+    values, or fields only present in the metadata blob column) are tracked
+    so filters on them fall back to post-filtering.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._base: dict[str, dict[Hashable, np.ndarray]] = {}
+        self._stale: set[int] = set()
+        self._stale_keys: Optional[np.ndarray] = None  # _stale as an array, built on demand
+        self._postings: dict[str, dict[Hashable, set[int]]] = {}
+        self._unindexed_fields: set[str] = set()
+        self._touched: Optional[set[int]] = None  # keys changed since freeze
+
+    def load_column(self, field: str, keys: np.ndarray, codes: np.ndarray, values: list):
+        """
+        Bulk-load postings for a dictionary-encoded column.
+
+        Args:
+            field: Metadata field name
+            keys: Keys of the rows, ascending
+            codes: Dictionary code per row (-1 = absent)
+            values: Dictionary mapping codes to values
+        """
+        if not len(codes):
+            return
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+
+        postings = self._base.setdefault(field, {})
+        for code, group in zip(sorted_codes[np.r_[0, bounds]], np.split(sorted_keys, bounds)):
+            if code >= 0 and len(group):
+                postings[values[code]] = group
+
+    def mark_unindexed(self, fields):
+        """Mark fields whose values are not covered by the index."""
+        self._unindexed_fields.update(fields)
+
+    def add(self, key: int, metadata: Optional[dict]):
+        """Index the metadata of one item."""
+        if self._touched is not None:
+            self._touched.add(key)
+        for field, value in (metadata or {}).items():
+            if isinstance(value, Hashable):
+                self._postings.setdefault(field, {}).setdefault(value, set()).add(key)
+            else:
+                self._unindexed_fields.add(field)
+
+    def remove(self, key: int, metadata: Optional[dict]):
+        """Remove the metadata of one item from the index."""
+        if self._touched is not None:
+            self._touched.add(key)
+        if self._base and key not in self._stale:
+            self._stale.add(key)
+            self._stale_keys = None
+        for field, value in (metadata or {}).items():
+            if not isinstance(value, Hashable):
+                continue
+            values = self._postings.get(field)
+            if values is None or value not in values:
+                continue
+            values[value].discard(key)
+            if not values[value]:
+                del values[value]
+
+    def candidates(self, filters: dict) -> Optional[np.ndarray]:
+        """
+        Resolve filters to the keys matching all of them.
+
+        Filter semantics match exact equality per field, with a list value
+        meaning "any of".
+
+        Args:
+            filters: Field -> value or list of accepted values
+
+        Returns:
+            Sorted uint64 array of matching keys, or None if a filter cannot
+            be answered by the index
+        """
+        stale = self._stale_array()
+
+        per_field = []
+        for field, value in filters.items():
+            if field in self._unindexed_fields:
+                return None
+            accepted = value if isinstance(value, list) else [value]
+            if not all(isinstance(v, Hashable) for v in accepted):
+                return None
+
+            base = self._base.get(field, {})
+            live = self._postings.get(field, {})
+            arrays = []
+            for v in accepted:
+                if v in base:
+                    keys = base[v]
+                    arrays.append(keys[~np.isin(keys, stale)] if stale is not None else keys)
+                if v in live:
+                    arrays.append(np.fromiter(live[v], dtype=np.uint64, count=len(live[v])))
+
+            if not arrays:
+                return np.empty(0, dtype=np.uint64)
+            per_field.append(np.unique(np.concatenate(arrays)) if len(arrays) > 1 else np.sort(arrays[0]))
+
+        if not per_field:
+            return None
+
+        # Intersect the most selective fields first so intermediates stay small
+        per_field.sort(key=len)
+        result = per_field[0]
+        for keys in per_field[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, keys, assume_unique=True)
+        return result
+
+    def _stale_array(self) -> Optional[np.ndarray]:
+        """Stale keys as an array for masking, or None if there are none."""
+        if not self._stale:
+            return None
+        if self._stale_keys is None:
+            self._stale_keys = np.fromiter(self._stale, dtype=np.uint64, count=len(self._stale))
+        return self._stale_keys
+
+    def freeze(self) -> dict:
+        """Capture the postings as of now, for ``merge``; tracks later changes."""
+        self._touched = set()
+        return {
+            "base": {field: dict(values) for field, values in self._base.items()},
+            "stale": self._stale_array(),
+            "postings": {
+                field: {
+                    value: np.sort(np.fromiter(keys, dtype=np.uint64, count=len(keys)))
+                    for value, keys in values.items()
+                }
+                for field, values in self._postings.items()
+            },
+        }
+
+    @staticmethod
+    def merge(frozen: dict) -> dict[str, dict[Hashable, np.ndarray]]:
+        """
+        Merge frozen postings into a new base without stale keys.
+
+        Only reads the frozen arrays, so it can run on a worker thread while
+        items keep changing.
+
+        Returns:
+            The merged base, to be passed to ``rebase``
+        """
+        stale = frozen["stale"]
+        merged = {}
+        for field in frozen["base"].keys() | frozen["postings"].keys():
+            base = frozen["base"].get(field, {})
+            live = frozen["postings"].get(field, {})
+            values = {}
+            for value in base.keys() | live.keys():
+                keys = base.get(value)
+                if keys is not None and stale is not None:
+                    keys = keys[~np.isin(keys, stale)]
+                if value in live:
+                    keys = np.union1d(keys, live[value]) if keys is not None else live[value]
+                if len(keys):
+                    values[value] = keys
+            merged[field] = values
+        return merged
+
+    def rebase(self, merged: dict[str, dict[Hashable, np.ndarray]]):
+        """
+        Serve the merged base that replaced the frozen postings.
+
+        Only keys changed since ``freeze`` keep per-value sets, and only
+        their postings in the new base are stale.
+        """
+        touched = self._touched or set()
+        self._touched = None
+        self._base = merged
+        self._stale = set(touched)
+        self._stale_keys = None
+        for field, values in self._postings.items():
+            self._postings[field] = {
+                value: kept for value, keys in values.items() if (kept := keys & touched)
+            }
@@ -0,0 +1,232 @@
+"""
+Streaming bulk ingestion.
+Parses NDJSON items incrementally and pipelines parse -> embed -> add.
+"""
+
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import numpy as np
+from pydantic import ValidationError
+
+from app.models import StreamIndexItem
+
+logger = logging.getLogger(__name__)
+
+_DONE = None  # end-of-stream marker passed through the stage queues
+
+
+class StreamIngest:
+    """
+    Index an NDJSON stream of items in one pass with bounded memory.
+
+    Each line is a JSON object with an ``id``, optional ``metadata`` and
+    either ``content`` (embedded by the service) or a precomputed
+    ``vector``. Three stages run concurrently, connected by queues of
+    ``queue_depth`` batches: parsing, embedding and insertion. When the
+    index or the embedding provider falls behind the queues fill up, the
+    parser stops reading the request body and the client is slowed down by
+    TCP flow control, so memory stays constant whatever the upload size.
+    """
+
+    MAX_REPORTED_ERRORS = 100
+
+    def __init__(
+        self,
+        engine,
+        embeddings,
+        index_name: str,
+        batch_size: int = 500,
+        queue_depth: int = 2,
+        max_line_bytes: int = 1024 * 1024,
+        start_line: int = 0,
+        on_batch: Optional[Callable[[int], Awaitable[None]]] = None,
+    ):
+        """
+        Initialize the ingest.
+
+        Args:
+            engine: SearchEngine receiving the items
+            embeddings: EmbeddingService for items with ``content``
+            index_name: Target index (created from the first batch if missing)
+            batch_size: Items per embedding call and index insert
+            queue_depth: Batches buffered between two stages
+            max_line_bytes: Longest accepted NDJSON line
+            start_line: Lines already processed before this stream (resumes
+                number lines from here)
+            on_batch: Coroutine called after each inserted batch with the
+                number of its last line, e.g. to checkpoint progress
+        """
+        self.engine = engine
+        self.embeddings = embeddings
+        self.index_name = index_name
+        self.batch_size = batch_size
+        self.queue_depth = queue_depth
+        self.max_line_bytes = max_line_bytes
+        self.on_batch = on_batch
+
+        self.lines = start_line
+        self.dimensions: Optional[int] = None  # vector size, once known
+        self.indexed = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+        self.started = time.monotonic()
+        self._changed = asyncio.Event()
+
+    def progress(self) -> dict:
+        """Counters and throughput so far."""
+        elapsed = time.monotonic() - self.started
+        return {
+            "index": self.index_name,
+            "lines": self.lines,
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "items_per_second": round(self.indexed / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    def summary(self) -> dict:
+        """Final report, with the first MAX_REPORTED_ERRORS failures."""
+        return {**self.progress(), "errors": self.errors}
+
+    async def run(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+        """
+        Ingest a byte stream, yielding progress after inserted batches.
+
+        Progress is coalesced: a consumer slower than the pipeline sees the
+        latest counters rather than one record per batch.
+
+        Args:
+            chunks: Request body chunks
+
+        Yields:
+            Progress dicts while running
+        """
+        parsed: asyncio.Queue = asyncio.Queue(self.queue_depth)
+        embedded: asyncio.Queue = asyncio.Queue(self.queue_depth)
+        stages = [
+            asyncio.create_task(self._parse(chunks, parsed)),
+            asyncio.create_task(self._embed(parsed, embedded)),
+            asyncio.create_task(self._add(embedded)),
+        ]
+        running = set(stages)
+        try:
+            # The insert stage finishes last, after the end marker went through
+            while not stages[-1].done():
+                changed = asyncio.create_task(self._changed.wait())
+                done, _ = await asyncio.wait([*running, changed], return_when=asyncio.FIRST_COMPLETED)
+                changed.cancel()
+                for stage in done & running:
+                    if stage.exception() is not None:
+                        raise stage.exception()
+                running -= done
+                if self._changed.is_set() and not stages[-1].done():
+                    self._changed.clear()
+                    yield self.progress()
+        finally:
+            # On failure or client disconnect, stop the other stages too
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+        logger.info(
+            f"Streamed {self.indexed} items into '{self.index_name}' "
+            f"({self.failed} failed, {self.lines} lines)"
+        )
+
+    def _fail(self, line: Optional[int], item_id: Optional[str], error: str, count: int = 1):
+        """Record failed items, keeping only the first errors in memory."""
+        self.failed += count
+        if len(self.errors) < self.MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "id": item_id, "error": error})
+
+    async def _parse(self, chunks: AsyncIterator[bytes], parsed: asyncio.Queue):
+        """Split the body into lines and validate them into batches."""
+        buffer = b""
+        batch: list[tuple[int, StreamIndexItem]] = []
+        async for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            if len(buffer) > self.max_line_bytes:
+                raise ValueError(f"Line {self.lines + 1} exceeds {self.max_line_bytes} bytes")
+            for line in lines:
+                self._parse_line(line, batch)
+                if len(batch) >= self.batch_size:
+                    await parsed.put(batch)
+                    batch = []
+        if buffer:
+            self._parse_line(buffer, batch)
+        if batch:
+            await parsed.put(batch)
+        await parsed.put(_DONE)
+
+    def _parse_line(self, line: bytes, batch: list):
+        """Validate one NDJSON line into the current batch."""
+        # Blank lines are skipped but counted, so numbers match the upload
+        self.lines += 1
+        if not line.strip():
+            return
+        try:
+            item = StreamIndexItem.model_validate_json(line)
+        except ValidationError as e:
+            error = e.errors()[0]
+            self._fail(self.lines, None, f"{'.'.join(map(str, error['loc']))}: {error['msg']}")
+            return
+
+        # A wrong-sized vector would fail the whole batch insert
+        if item.vector is not None:
+            if self.dimensions is None:
+                index = self.engine.indexes.get(self.index_name)
+                self.dimensions = index.ndim if index is not None else len(item.vector)
+            if len(item.vector) != self.dimensions:
+                self._fail(
+                    self.lines, item.id,
+                    f"vector: expected {self.dimensions} dimensions, got {len(item.vector)}",
+                )
+                return
+        batch.append((self.lines, item))
+
+    async def _embed(self, parsed: asyncio.Queue, embedded: asyncio.Queue):
+        """Embed the text items of each batch; precomputed vectors pass through."""
+        while (batch := await parsed.get()) is not _DONE:
+            texts = [item.content for _, item in batch if item.vector is None]
+            vectors = None
+            try:
+                if texts:
+                    vectors = await self.embeddings.generate_embeddings_array(texts)
+            except Exception as e:
+                for line, item in batch:
+                    if item.vector is None:
+                        self._fail(line, item.id, f"Embedding failed: {e}")
+                batch = [(line, item) for line, item in batch if item.vector is not None]
+
+            rows, position = [], 0
+            for _, item in batch:
+                if item.vector is not None:
+                    rows.append(np.asarray(item.vector, dtype=np.float32))
+                else:
+                    rows.append(vectors[position])
+                    position += 1
+            if batch:
+                await embedded.put((batch, rows))
+        await embedded.put(_DONE)
+
+    async def _add(self, embedded: asyncio.Queue):
+        """Insert each embedded batch with one vectorized call."""
+        while (entry := await embedded.get()) is not _DONE:
+            batch, rows = entry
+            try:
+                self.indexed += await self.engine.index_items(
+                    self.index_name,
+                    [item.id for _, item in batch],
+                    np.stack(rows),
+                    [item.metadata for _, item in batch],
+                    [item.content for _, item in batch],
+                )
+            except Exception as e:
+                # E.g. embeddings of a different size than the index
+                self._fail(batch[0][0], batch[0][1].id, f"Batch of {len(batch)} items failed: {e}", len(batch))
+            if self.on_batch is not None:
+                await self.on_batch(batch[-1][0])
+            self._changed.set()
@@ -0,0 +1,344 @@
+"""
+Background indexing jobs.
+Bulk uploads are spooled to disk and indexed by worker tasks with checkpoints.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import orjson
+
+from app.ingest import StreamIngest
+from app.models import StreamIndexItem
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ("queued", "running", "completed", "failed", "cancelled")
+FINISHED_STATES = ("completed", "failed", "cancelled")
+
+
+class JobQueue:
+    """
+    Durable queue of bulk indexing jobs.
+
+    A submitted job is written to ``{path}/{id}.ndjson`` (one item per line)
+    with its state in ``{path}/{id}.json``, and acknowledged immediately.
+    ``workers`` tasks index jobs through the StreamIngest pipeline in small
+    batches, so the index write lock is released between batches and
+    interactive searches interleave with bulk work. The number of processed
+    lines is checkpointed after every batch; jobs found queued or running at
+    startup resume from their checkpoint. Inserts are upserts, so lines
+    replayed after a crash are harmless.
+    """
+
+    READ_CHUNK = 1024 * 1024
+    KEEP_FINISHED = 1000
+
+    def __init__(
+        self,
+        engine,
+        embeddings,
+        path: str,
+        workers: int = 1,
+        batch_size: int = 256,
+    ):
+        """
+        Initialize the job queue.
+
+        Args:
+            engine: SearchEngine receiving the items
+            embeddings: EmbeddingService for items with ``content``
+            path: Directory for job payloads and states
+            workers: Jobs processed concurrently
+            batch_size: Items per embedding call and index insert
+        """
+        self.engine = engine
+        self.embeddings = embeddings
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.batch_size = batch_size
+
+        self.jobs: dict[str, dict] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._running: dict[str, asyncio.Task] = {}
+        self._sessions: dict[str, tuple[float, int]] = {}  # job -> (start time, start line)
+
+    async def start(self):
+        """Load job states, re-queue unfinished jobs and start the workers."""
+        for state_file in sorted(self.path.glob("*.json"), key=lambda f: f.stat().st_mtime):
+            try:
+                job = json.loads(state_file.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable job state {state_file.name}: {e}")
+                continue
+            self.jobs[job["id"]] = job
+            if job["state"] in ("queued", "running"):
+                job["state"] = "queued"
+                self._queue.put_nowait(job["id"])
+                logger.info(f"Resuming job {job['id']} at line {job['processed']}/{job['total']}")
+
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Stop the workers; running jobs stay resumable from their checkpoint."""
+        tasks = self._workers + list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+
+    async def submit_items(self, index_name: str, items: list[StreamIndexItem]) -> dict:
+        """
+        Queue a job for already validated items.
+
+        Args:
+            index_name: Target index
+            items: Items to index
+
+        Returns:
+            Job status
+        """
+        job = self._new_job(index_name)
+
+        def write():
+            with open(self._payload(job["id"]), "wb") as f:
+                for item in items:
+                    f.write(orjson.dumps(item.model_dump(exclude_none=True)) + b"\n")
+
+        await asyncio.to_thread(write)
+        job["total"] = len(items)
+        return await self._enqueue(job)
+
+    async def submit_stream(self, index_name: str, chunks: AsyncIterator[bytes]) -> dict:
+        """
+        Queue a job for an NDJSON upload, spooled to disk as it arrives.
+
+        The body is spooled as is, so reported line numbers match the
+        upload. Lines are validated when the job runs and reported in its
+        errors.
+
+        Args:
+            index_name: Target index
+            chunks: Request body chunks
+
+        Returns:
+            Job status
+        """
+        job = self._new_job(index_name)
+        total, tail = 0, b"\n"
+        try:
+            with open(self._payload(job["id"]), "wb") as f:
+                async for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        total += chunk.count(b"\n")
+                        tail = chunk[-1:]
+                # Terminate a last line sent without a newline
+                if tail != b"\n":
+                    f.write(b"\n")
+                    total += 1
+        except BaseException:
+            self._payload(job["id"]).unlink(missing_ok=True)
+            raise
+        job["total"] = total
+        return await self._enqueue(job)
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """
+        State, progress, throughput and ETA of a job.
+
+        Returns:
+            Status dict, or None for an unknown job
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+
+        status = dict(job)
+        status["items_per_second"] = None
+        status["eta_seconds"] = None
+        session = self._sessions.get(job_id)
+        if job["state"] == "running" and session is not None:
+            started, start_line = session
+            elapsed = time.monotonic() - started
+            done = job["processed"] - start_line
+            if elapsed > 0 and done > 0:
+                rate = done / elapsed
+                status["items_per_second"] = round(rate, 1)
+                status["eta_seconds"] = round((job["total"] - job["processed"]) / rate, 1)
+        elif job["state"] == "completed" and job.get("started_at") and job.get("finished_at"):
+            elapsed = (
+                datetime.fromisoformat(job["finished_at"]) - datetime.fromisoformat(job["started_at"])
+            ).total_seconds()
+            if elapsed > 0:
+                status["items_per_second"] = round(job["processed"] / elapsed, 1)
+            status["eta_seconds"] = 0.0
+        return status
+
+    def list_jobs(self) -> list[dict]:
+        """Statuses of all known jobs, newest first."""
+        return [self.status(job_id) for job_id in reversed(list(self.jobs))]
+
+    def counts(self) -> dict[str, int]:
+        """Number of jobs per state."""
+        counts = dict.fromkeys(JOB_STATES, 0)
+        for job in self.jobs.values():
+            counts[job["state"]] += 1
+        return counts
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job; items already inserted stay indexed.
+
+        Returns:
+            True if the job was cancelled
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job["state"] in FINISHED_STATES:
+            return False
+
+        job["state"] = "cancelled"
+        job["finished_at"] = datetime.utcnow().isoformat()
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._finish(job)
+        return True
+
+    def _new_job(self, index_name: str) -> dict:
+        """State of a new job."""
+        return {
+            "id": uuid.uuid4().hex,
+            "index": index_name,
+            "state": "queued",
+            "total": 0,
+            "processed": 0,
+            "indexed": 0,
+            "failed": 0,
+            "errors": [],
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+        }
+
+    async def _enqueue(self, job: dict) -> dict:
+        """Persist and queue a spooled job."""
+        await asyncio.to_thread(self._save, job)
+        self.jobs[job["id"]] = job
+        self._queue.put_nowait(job["id"])
+        logger.info(f"Queued job {job['id']}: {job['total']} items for '{job['index']}'")
+        return self.status(job["id"])
+
+    async def _work(self):
+        """Worker loop: process queued jobs one at a time."""
+        while True:
+            job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job["state"] != "queued":
+                continue
+            task = self._running[job_id] = asyncio.create_task(self._process(job))
+            try:
+                await asyncio.wait([task])
+            finally:
+                self._running.pop(job_id, None)
+                self._sessions.pop(job_id, None)
+
+    async def _process(self, job: dict):
+        """Index a job's payload from its checkpoint."""
+        job["state"] = "running"
+        job["started_at"] = job["started_at"] or datetime.utcnow().isoformat()
+        await asyncio.to_thread(self._save, job)
+
+        start_line = job["processed"]
+        indexed, failed, errors = job["indexed"], job["failed"], list(job["errors"])
+        self._sessions[job["id"]] = (time.monotonic(), start_line)
+
+        async def checkpoint(line: int):
+            job["processed"] = line
+            job["indexed"] = indexed + ingest.indexed
+            job["failed"] = failed + ingest.failed
+            job["errors"] = (errors + ingest.errors)[:StreamIngest.MAX_REPORTED_ERRORS]
+            await asyncio.to_thread(self._save, job)
+
+        ingest = StreamIngest(
+            self.engine,
+            self.embeddings,
+            job["index"],
+            batch_size=self.batch_size,
+            start_line=start_line,
+            on_batch=checkpoint,
+        )
+        try:
+            async for _ in ingest.run(self._read(job["id"], start_line)):
+                pass
+            await checkpoint(job["total"])
+            job["state"] = "completed"
+        except asyncio.CancelledError:
+            # Cancelled by the user (state already set) or by shutdown (resume later)
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {e}")
+            job["state"] = "failed"
+            job["error"] = str(e)
+        job["finished_at"] = datetime.utcnow().isoformat()
+        self._finish(job)
+        logger.info(
+            f"Job {job['id']} {job['state']}: {job['indexed']} indexed, {job['failed']} failed"
+        )
+
+    async def _read(self, job_id: str, skip: int) -> AsyncIterator[bytes]:
+        """Stream a job payload, starting after its first ``skip`` lines."""
+        with open(self._payload(job_id), "rb") as f:
+            while skip:
+                chunk = await asyncio.to_thread(f.read, self.READ_CHUNK)
+                if not chunk:
+                    return
+                lines = chunk.count(b"\n")
+                if lines < skip:
+                    skip -= lines
+                    continue
+                # Resume just after the skip-th newline of this chunk
+                position = -1
+                for _ in range(skip):
+                    position = chunk.index(b"\n", position + 1)
+                skip = 0
+                if position + 1 < len(chunk):
+                    yield chunk[position + 1:]
+
+            while chunk := await asyncio.to_thread(f.read, self.READ_CHUNK):
+                yield chunk
+
+    def _finish(self, job: dict):
+        """Persist a finished job, drop its payload and prune old jobs."""
+        self._save(job)
+        self._payload(job["id"]).unlink(missing_ok=True)
+
+        finished = [job_id for job_id, other in self.jobs.items() if other["state"] in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.KEEP_FINISHED)]:
+            del self.jobs[job_id]
+            (self.path / f"{job_id}.json").unlink(missing_ok=True)
+
+    def _payload(self, job_id: str) -> Path:
+        """Path of a job's NDJSON payload."""
+        return self.path / f"{job_id}.ndjson"
+
+    def _save(self, job: dict):
+        """Write a job state atomically."""
+        path = self.path / f"{job['id']}.json"
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(job, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
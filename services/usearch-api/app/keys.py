@@ -0,0 +1,98 @@
+"""
+Item ID <-> uSearch key registry.
+Maps string item IDs to stable, monotonically allocated integer keys.
+"""
+
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class KeyRegistry:
+    """
+    Two-way mapping between string item IDs and uSearch integer keys.
+
+    Keys are allocated monotonically and never reused, so an item keeps the
+    same key across restarts and a deleted item's stale vector can never be
+    mistaken for a newer one. The key -> ID direction is a dense list indexed
+    by key (``None`` for freed slots), the ID -> key direction a dict; both
+    lookups are O(1).
+    """
+
+    def __init__(self, ids: Optional[list[Optional[str]]] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            ids: Dense list where position ``k`` holds the ID owning key ``k``
+        """
+        self._ids: list[Optional[str]] = ids if ids is not None else []
+        self._keys: dict[str, int] = {
+            item_id: key for key, item_id in enumerate(self._ids) if item_id is not None
+        }
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._keys
+
+    @property
+    def next_key(self) -> int:
+        """Key that the next new item will receive."""
+        return len(self._ids)
+
+    def get(self, item_id: str) -> Optional[int]:
+        """Return the key of an item, or None if it is not registered."""
+        return self._keys.get(item_id)
+
+    def get_or_create(self, item_id: str) -> int:
+        """Return the key of an item, allocating a new one if needed."""
+        key = self._keys.get(item_id)
+        if key is None:
+            key = len(self._ids)
+            self._ids.append(item_id)
+            self._keys[item_id] = key
+        return key
+
+    def lookup(self, key: int) -> Optional[str]:
+        """Return the ID owning a key, or None for unknown or freed keys."""
+        if 0 <= key < len(self._ids):
+            return self._ids[key]
+        return None
+
+    def remove(self, item_id: str) -> Optional[int]:
+        """Unregister an item. Its key is freed but never reallocated."""
+        key = self._keys.pop(item_id, None)
+        if key is not None:
+            self._ids[key] = None
+        return key
+
+    def items(self):
+        """Iterate over (item_id, key) pairs."""
+        return self._keys.items()
+
+    @classmethod
+    def load(cls, path: Path) -> "KeyRegistry":
+        """Load a registry from disk, returning an empty one if missing."""
+        if not path.exists():
+            return cls()
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def copy(self) -> "KeyRegistry":
+        """Return an independent copy (e.g. to save from another thread)."""
+        return KeyRegistry(list(self._ids))
+
+    def save(self, path: Path):
+        """Persist the registry as a compact JSON array."""
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._ids, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,377 @@
+"""
+BM25 lexical index over item content.
+Keyword retrieval for hybrid search next to the vector index.
+"""
+
+import re
+import math
+import logging
+import unicodedata
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words, keeping dotted/dashed/slashed codes such as "1.A.3.b" or "CO2-eq" whole
+_TOKEN = re.compile(r"\w+(?:[.\-/]\w+)*")
+_SEPARATORS = re.compile(r"[.\-/]")
+
+
+def _tokens(text: str) -> list[str]:
+    """Lowercase, accent-folded tokens, compounds kept whole."""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    if not folded.isascii():
+        folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return _TOKEN.findall(folded)
+
+
+def _parts(token: str) -> list[str]:
+    """Pieces of a compound token (empty for plain words)."""
+    if len(token) > 1 and _SEPARATORS.search(token):
+        return [part for part in _SEPARATORS.split(token) if part]
+    return []
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase, accent-folded terms.
+
+    Compound tokens (factor codes, product references) are emitted whole and
+    as their parts, so "1.A.3.b" matches both the exact code and its pieces.
+    """
+    terms = []
+    for token in _tokens(text):
+        terms.append(token)
+        terms.extend(_parts(token))
+    return terms
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index mapping terms to uSearch keys.
+
+    Postings are kept like the MetadataIndex: a base loaded from the last
+    snapshot, stored in compressed sparse rows (one sorted key array and one
+    uint16 term-frequency array, sliced per term), plus postings of items
+    written since then in per-term dicts. Keys whose base postings went stale
+    (updated or deleted items) are masked out at query time. Snapshots merge
+    both into a new base and drop the stale postings; on disk the keys are
+    delta-encoded and deflate-compressed.
+
+    Document lengths are kept per key, so collection statistics are exact at
+    all times.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._vocabulary: dict[str, int] = {}  # term -> base row
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._keys = np.empty(0, dtype=np.uint32)
+        self._tfs = np.empty(0, dtype=np.uint16)
+        self._stale: set[int] = set()
+        self._stale_keys: Optional[np.ndarray] = None  # _stale as an array, built on demand
+
+        self._live: dict[str, dict[int, int]] = {}  # term -> key -> term frequency
+        self._docs: dict[int, dict[str, int]] = {}  # key -> term frequencies, written since the base
+
+        self._lengths = np.zeros(self.INITIAL_CAPACITY, dtype=np.uint32)  # key -> terms (0: none)
+        self.documents = 0
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        """Number of documents with content."""
+        return self.documents
+
+    def _reserve(self, key: int):
+        """Grow the length array to cover ``key``."""
+        if key < len(self._lengths):
+            return
+        grown = np.zeros(max(key + 1, len(self._lengths) * 2), dtype=np.uint32)
+        grown[:len(self._lengths)] = self._lengths
+        self._lengths = grown
+
+    def add(self, key: int, text: Optional[str]):
+        """Index (or replace) the content of one item."""
+        self.remove(key)
+        terms = Counter(tokenize(text)) if text else None
+        if not terms:
+            return
+
+        tfs = {term: min(count, 65535) for term, count in terms.items()}
+        self._docs[key] = tfs
+        for term, tf in tfs.items():
+            self._live.setdefault(term, {})[key] = tf
+
+        length = sum(terms.values())
+        self._reserve(key)
+        self._lengths[key] = length
+        self.documents += 1
+        self.total_length += length
+
+    def remove(self, key: int):
+        """Remove the content of one item, if any."""
+        if key >= len(self._lengths) or not self._lengths[key]:
+            return
+        self.documents -= 1
+        self.total_length -= int(self._lengths[key])
+        self._lengths[key] = 0
+
+        tfs = self._docs.pop(key, None)
+        if tfs is not None:
+            for term in tfs:
+                postings = self._live[term]
+                del postings[key]
+                if not postings:
+                    del self._live[term]
+        if self._vocabulary and key not in self._stale:
+            self._stale.add(key)
+            self._stale_keys = None
+
+    def search(
+        self,
+        text: str,
+        top_k: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rank documents by BM25 against a query.
+
+        Args:
+            text: Query text
+            top_k: Maximum number of results
+            allowed: Optional sorted array of keys passing the filters
+
+        Returns:
+            Tuple of (uint64 keys, float32 scores), best first
+        """
+        empty = np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.float32)
+        if not self.documents:
+            return empty
+
+        if self._stale and self._stale_keys is None:
+            self._stale_keys = np.fromiter(self._stale, dtype=np.uint64, count=len(self._stale))
+        stale = self._stale_keys if self._stale else None
+        average = self.total_length / self.documents
+        all_keys, all_scores = [], []
+
+        for term in self._query_terms(text):
+            keys, tfs = [], []
+            row = self._vocabulary.get(term)
+            if row is not None:
+                start, end = self._offsets[row], self._offsets[row + 1]
+                base_keys, base_tfs = self._keys[start:end], self._tfs[start:end]
+                if stale is not None:
+                    mask = ~np.isin(base_keys, stale)
+                    base_keys, base_tfs = base_keys[mask], base_tfs[mask]
+                keys.append(base_keys.astype(np.uint64))
+                tfs.append(base_tfs)
+            live = self._live.get(term)
+            if live:
+                keys.append(np.fromiter(live.keys(), dtype=np.uint64, count=len(live)))
+                tfs.append(np.fromiter(live.values(), dtype=np.uint16, count=len(live)))
+            if not keys:
+                continue
+
+            keys = np.concatenate(keys)
+            tf = np.concatenate(tfs).astype(np.float32)
+            if not len(keys):
+                continue
+
+            df = len(keys)
+            idf = math.log(1 + (self.documents - df + 0.5) / (df + 0.5))
+            norm = self.K1 * (1 - self.B + self.B * self._lengths[keys.astype(np.intp)] / average)
+            all_keys.append(keys)
+            all_scores.append(idf * tf * (self.K1 + 1) / (tf + norm))
+
+        if not all_keys:
+            return empty
+
+        # Sum the per-term contributions of each document
+        keys, inverse = np.unique(np.concatenate(all_keys), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(all_scores)).astype(np.float32)
+
+        if allowed is not None:
+            positions = np.minimum(np.searchsorted(allowed, keys), max(len(allowed) - 1, 0))
+            mask = allowed[positions] == keys if len(allowed) else np.zeros(len(keys), dtype=bool)
+            keys, scores = keys[mask], scores[mask]
+
+        # Partial sort: only the top_k best documents need ordering
+        if len(scores) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(scores))
+        order = best[np.argsort(-scores[best], kind="stable")]
+        return keys[order], scores[order]
+
+    def _query_terms(self, text: str) -> set[str]:
+        """
+        Terms of a query.
+
+        A compound token that occurs in the index is matched exactly; its
+        parts are only used when it does not, so a known code does not pull
+        in every document sharing one of its pieces.
+        """
+        terms = set()
+        for token in _tokens(text):
+            parts = _parts(token)
+            if parts and (token in self._vocabulary or token in self._live):
+                parts = []
+            terms.add(token)
+            terms.update(parts)
+        return terms
+
+    def freeze(self) -> dict:
+        """Capture the index as of now, for ``write_snapshot``."""
+        return {
+            "vocabulary": self._vocabulary,
+            "offsets": self._offsets,
+            "keys": self._keys,
+            "tfs": self._tfs,
+            "stale": set(self._stale),
+            "docs": dict(self._docs),
+            "lengths": self._lengths.copy(),
+        }
+
+    @staticmethod
+    def write_snapshot(path: Path, frozen: dict) -> dict:
+        """
+        Merge frozen postings into a new base and write it to ``path``.
+
+        Only reads the frozen arrays, so it can run on a worker thread while
+        items keep changing in memory.
+
+        Returns:
+            The merged base, to be passed to ``rebase``
+        """
+        vocabulary = dict(frozen["vocabulary"])
+        offsets = frozen["offsets"]
+
+        # Base postings without stale keys, as (row, key, tf) triples
+        rows = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+        keys = frozen["keys"].astype(np.uint64)
+        tfs = frozen["tfs"]
+        if frozen["stale"]:
+            stale = np.fromiter(frozen["stale"], dtype=np.uint64, count=len(frozen["stale"]))
+            mask = ~np.isin(keys, stale)
+            rows, keys, tfs = rows[mask], keys[mask], tfs[mask]
+
+        # Postings written since the base
+        docs = frozen["docs"]
+        count = sum(map(len, docs.values()))
+        terms = list(chain.from_iterable(docs.values()))
+        for term in set(terms).difference(vocabulary):
+            vocabulary[term] = len(vocabulary)
+        live_rows = np.fromiter(map(vocabulary.__getitem__, terms), dtype=np.int64, count=count)
+        live_keys = np.repeat(
+            np.fromiter(docs.keys(), dtype=np.uint64, count=len(docs)),
+            np.fromiter(map(len, docs.values()), dtype=np.int64, count=len(docs)),
+        )
+        live_tfs = np.fromiter(
+            chain.from_iterable(doc.values() for doc in docs.values()), dtype=np.uint16, count=count
+        )
+        rows = np.concatenate([rows, live_rows])
+        keys = np.concatenate([keys, live_keys])
+        tfs = np.concatenate([tfs, live_tfs])
+
+        # Drop terms left without postings, then sort by (term, key)
+        counts = np.bincount(rows, minlength=len(vocabulary))
+        kept = np.flatnonzero(counts)
+        remap = np.full(len(vocabulary), -1, dtype=np.int64)
+        remap[kept] = np.arange(len(kept))
+        terms = np.array(list(vocabulary), dtype=object)[kept]
+        rows = remap[rows]
+        order = np.lexsort((keys, rows))
+        rows, keys, tfs = rows[order], keys[order], tfs[order]
+        offsets = np.zeros(len(kept) + 1, dtype=np.int64)
+        np.cumsum(counts[kept], out=offsets[1:])
+
+        key_type = np.uint32 if not len(keys) or keys.max() < 2**32 else np.uint64
+        merged = {
+            "vocabulary": {term: row for row, term in enumerate(terms.tolist())},
+            "offsets": offsets,
+            "keys": keys.astype(key_type),
+            "tfs": tfs,
+        }
+
+        # Delta-encode keys within each term; the first key of a term is absolute
+        deltas = np.diff(keys.astype(np.int64), prepend=0)
+        deltas[offsets[:-1]] = keys[offsets[:-1]].astype(np.int64)
+        path = Path(path)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                terms=np.array(terms.tolist(), dtype=np.str_),
+                offsets=offsets,
+                deltas=deltas.astype(key_type),
+                tfs=tfs,
+                lengths=frozen["lengths"],
+            )
+        return merged
+
+    def rebase(self, frozen: dict, merged: dict):
+        """
+        Serve the merged base that replaced the frozen postings.
+
+        Args:
+            frozen: State captured by ``freeze`` and included in the base
+            merged: Base returned by ``write_snapshot``
+        """
+        frozen_docs = frozen["docs"]
+        # Items changed since the freeze have outdated postings in the new base
+        changed = {key for key, doc in frozen_docs.items() if self._docs.get(key) is not doc}
+        changed.update(self._stale - frozen["stale"])
+
+        self._vocabulary = merged["vocabulary"]
+        self._offsets = merged["offsets"]
+        self._keys = merged["keys"]
+        self._tfs = merged["tfs"]
+        self._stale = changed
+        self._stale_keys = None
+        for key, doc in frozen_docs.items():
+            if self._docs.get(key) is doc:
+                del self._docs[key]
+                for term in doc:
+                    postings = self._live[term]
+                    del postings[key]
+                    if not postings:
+                        del self._live[term]
+
+    @classmethod
+    def load(cls, path: Path) -> "LexicalIndex":
+        """Open an index written by ``write_snapshot`` (empty if missing)."""
+        index = cls()
+        path = Path(path)
+        if not path.exists():
+            return index
+
+        with np.load(path, allow_pickle=False) as data:
+            terms = data["terms"].tolist()
+            offsets = data["offsets"]
+            deltas = data["deltas"]
+            tfs = data["tfs"]
+            lengths = data["lengths"]
+
+        # Undo the per-term delta encoding with one running sum
+        counts = np.diff(offsets)
+        running = np.cumsum(deltas.astype(np.uint64))
+        before = np.zeros(len(counts), dtype=np.uint64)
+        starts = offsets[:-1]
+        before[starts > 0] = running[starts[starts > 0] - 1]
+        keys = running - np.repeat(before, counts)
+
+        index._vocabulary = {term: row for row, term in enumerate(terms)}
+        index._offsets = offsets
+        index._keys = keys.astype(deltas.dtype)
+        index._tfs = tfs
+        index._lengths = lengths.copy() if len(lengths) else index._lengths
+        index.documents = int(np.count_nonzero(lengths))
+        index.total_length = int(lengths.sum(dtype=np.uint64))
+        return index
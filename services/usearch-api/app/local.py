@@ -0,0 +1,91 @@
+"""
+Local embedding backend.
+Runs sentence-transformers inference on a worker pool off the event loop.
+"""
+
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LocalEncoder:
+    """
+    Non-blocking wrapper around a sentence-transformers model.
+
+    ``encode`` sorts texts by length and splits them into batches of similar
+    length, so padding stays small, then encodes the batches in parallel on a
+    thread pool. PyTorch releases the GIL during inference and the threads
+    share one copy of the model; the intra-op thread count is divided among
+    the workers so the pool saturates the available cores without
+    oversubscribing them.
+    """
+
+    def __init__(self, model: Any, workers: Optional[int] = None, batch_size: int = 32):
+        """
+        Initialize the encoder.
+
+        Args:
+            model: Loaded model exposing ``encode(texts, ...)``
+            workers: Number of inference threads (default: min(4, cores))
+            batch_size: Maximum texts per inference batch
+        """
+        cores = os.cpu_count() or 1
+        self.model = model
+        self.workers = workers or min(4, cores)
+        self.batch_size = batch_size
+        self.dimensions = model.get_sentence_embedding_dimension()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="local-embedding"
+        )
+
+        try:
+            import torch
+            torch.set_num_threads(max(1, cores // self.workers))
+        except ImportError:
+            pass
+
+        logger.info(f"Local encoder using {self.workers} workers, batch size {batch_size}")
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Encode one batch (runs on a worker thread)."""
+        return self.model.encode(
+            texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False
+        )
+
+    async def encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Encode texts without blocking the event loop.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            float32 matrix with one row per input text, in input order
+        """
+        if not texts:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+
+        # Group texts of similar length to minimize padding
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._encode, [texts[i] for i in batch])
+            for batch in batches
+        ))
+
+        embeddings = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        for batch, result in zip(batches, results):
+            embeddings[batch] = result
+        return embeddings
+
+    def close(self):
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
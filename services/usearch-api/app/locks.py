@@ -0,0 +1,105 @@
+"""
+Reader/writer lock for asyncio.
+Lets many searches share an index while writes get exclusive access.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class ReadWriteLock:
+    """
+    Asyncio reader/writer lock, granted in FIFO order.
+
+    Any number of readers may hold the lock together; a writer holds it
+    alone. A waiting writer blocks readers that arrive after it, so a steady
+    stream of searches cannot starve writes. Waiters are plain futures of the
+    running loop, so the lock is not tied to one event loop.
+    """
+
+    def __init__(self):
+        """Initialize an unlocked lock."""
+        self._readers = 0
+        self._writer = False
+        self._waiters: deque[tuple[bool, asyncio.Future]] = deque()  # (is_writer, future)
+
+    @property
+    def readers(self) -> int:
+        """Number of readers holding the lock."""
+        return self._readers
+
+    @property
+    def writing(self) -> bool:
+        """Whether a writer holds the lock."""
+        return self._writer
+
+    @property
+    def waiting(self) -> int:
+        """Number of queued readers and writers."""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def read(self):
+        """Hold the lock shared."""
+        if self._writer or self._waiters:
+            await self._wait(False)
+        else:
+            self._readers += 1
+        try:
+            yield
+        finally:
+            self._readers -= 1
+            self._wake()
+
+    @asynccontextmanager
+    async def write(self):
+        """Hold the lock exclusively."""
+        if self._writer or self._readers or self._waiters:
+            await self._wait(True)
+        else:
+            self._writer = True
+        try:
+            yield
+        finally:
+            self._writer = False
+            self._wake()
+
+    async def _wait(self, writer: bool):
+        """Queue until ``_wake`` grants the lock."""
+        future = asyncio.get_running_loop().create_future()
+        entry = (writer, future)
+        self._waiters.append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the cancellation: hand it back
+                if writer:
+                    self._writer = False
+                else:
+                    self._readers -= 1
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+            self._wake()
+            raise
+
+    def _wake(self):
+        """Grant the lock to queued waiters that are compatible with its state."""
+        while self._waiters:
+            writer, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if writer:
+                if self._writer or self._readers:
+                    return
+                self._waiters.popleft()
+                self._writer = True
+                future.set_result(None)
+                return
+            if self._writer:
+                return
+            self._waiters.popleft()
+            self._readers += 1
+            future.set_result(None)
@@ -6,18 +6,32 @@ Handles embedding storage, indexing, and semantic queries.
 """
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional
 import os
+import asyncio
 import logging
 
+import numpy as np
+import orjson
+
+from app import codec
 from app.search import SearchEngine
 from app.embeddings import EmbeddingService
+from app.cache import EmbeddingCache
+from app.ingest import StreamIngest
+from app.jobs import JobQueue
+from app.rerank import Reranker
+from app import metrics
+from app.metrics import MetricsMiddleware, label_index, phase
 from app.models import (
     SearchRequest,
     SearchResponse,
+    BatchSearchRequest,
+    BatchSearchResponse,
     IndexRequest,
     IndexResponse,
     BatchIndexRequest,
@@ -26,6 +40,8 @@ from app.models import (
     StatsResponse,
     SimilarRequest,
     DeleteRequest,
+    IndexJobRequest,
+    JobStatus,
 )
 
 # Configure logging
@@ -38,39 +54,110 @@ logger = logging.getLogger(__name__)
 # Global instances
 search_engine: Optional[SearchEngine] = None
 embedding_service: Optional[EmbeddingService] = None
+job_queue: Optional[JobQueue] = None
+reranker: Optional[Reranker] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager - initialize and cleanup resources."""
-    global search_engine, embedding_service
+    global search_engine, embedding_service, job_queue, reranker
 
     logger.info("Initializing uSearch API...")
 
+    # Initialize embedding cache (memory LRU + persistent disk tier)
+    embedding_cache = None
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true":
+        embedding_cache = EmbeddingCache(
+            path=os.getenv("EMBEDDING_CACHE_PATH", "/data/embedding_cache"),
+            max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+        )
+
     # Initialize embedding service
     embedding_service = EmbeddingService(
         provider=os.getenv("EMBEDDING_PROVIDER", "openai"),
         api_key=os.getenv("EMBEDDING_API_KEY"),
         model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
+        cache=embedding_cache,
+        batch_max_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64")),
+        batch_wait_ms=float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5")),
+        max_concurrency=int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4")),
+        max_retries=int(os.getenv("EMBEDDING_MAX_RETRIES", "5")),
+        local_workers=int(os.getenv("LOCAL_EMBEDDING_WORKERS", "0")) or None,
+        local_batch_size=int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32")),
     )
 
+    # Optional cross-encoder for reranking search results
+    rerank_model = os.getenv("RERANK_MODEL")
+    if rerank_model:
+        try:
+            reranker = Reranker.load(
+                rerank_model,
+                workers=int(os.getenv("RERANK_WORKERS", "0")) or None,
+                batch_size=int(os.getenv("RERANK_BATCH_SIZE", "32")),
+                cache_size=int(os.getenv("RERANK_CACHE_SIZE", "100000")),
+                candidates=int(os.getenv("RERANK_CANDIDATES", "50")),
+                budget_ms=int(os.getenv("RERANK_BUDGET_MS", "300")),
+            )
+        except Exception as e:
+            logger.error(f"Reranking disabled, could not load '{rerank_model}': {e}")
+
     # Initialize search engine
     search_engine = SearchEngine(
         index_path=os.getenv("INDEX_PATH", "/data/indexes"),
         dimensions=int(os.getenv("VECTOR_DIMENSIONS", "1536")),
+        serving_mode=os.getenv("INDEX_SERVING_MODE", "memory"),
+        dtype=os.getenv("INDEX_DTYPE", "f32"),
+        compaction_threshold=float(os.getenv("COMPACTION_THRESHOLD", "0.2")),
+        wal=os.getenv("WAL_ENABLED", "true").lower() == "true",
+        wal_sync=os.getenv("WAL_FSYNC", "true").lower() == "true",
+        wal_max_bytes=int(os.getenv("WAL_MAX_BYTES", str(64 * 1024 * 1024))),
+        snapshot_mutations=int(os.getenv("SNAPSHOT_MUTATIONS", "10000")),
+        search_threads=int(os.getenv("SEARCH_THREADS", "0")) or None,
+        exact_threshold=int(os.getenv("EXACT_SEARCH_THRESHOLD", "10000")),
+        shards=int(os.getenv("INDEX_SHARDS", "1")),
     )
 
     # Load existing indexes
     await search_engine.load_indexes()
 
+    # Periodic background snapshots of changed indexes
+    snapshot_task = None
+    snapshot_interval = float(os.getenv("SNAPSHOT_INTERVAL", "300"))
+    if snapshot_interval > 0:
+        snapshot_task = asyncio.create_task(search_engine.run_snapshots(snapshot_interval))
+
+    # Background bulk indexing jobs (unfinished jobs resume here)
+    job_queue = JobQueue(
+        search_engine,
+        embedding_service,
+        path=os.getenv("JOBS_PATH", "/data/jobs"),
+        workers=int(os.getenv("JOB_WORKERS", "1")),
+        batch_size=int(os.getenv("JOB_BATCH_SIZE", "256")),
+    )
+    await job_queue.start()
+
+    # Scrape-time state: index memory, cache hit counters, queue depths
+    metrics.set_collector("engine", lambda: metrics.collect_engine(search_engine))
+    metrics.set_collector("embeddings", lambda: metrics.collect_embeddings(embedding_service))
+    metrics.set_collector("jobs", lambda: metrics.collect_jobs(job_queue))
+    loop_monitor = asyncio.create_task(metrics.monitor_event_loop())
+
     logger.info("uSearch API initialized successfully")
 
     yield
 
     # Cleanup
     logger.info("Shutting down uSearch API...")
+    loop_monitor.cancel()
+    if snapshot_task:
+        snapshot_task.cancel()
+    await job_queue.close()
     if search_engine:
         await search_engine.save_indexes()
+        search_engine.close()
+    if reranker:
+        reranker.close()
     logger.info("uSearch API shutdown complete")
 
 
@@ -79,6 +166,7 @@ app = FastAPI(
     description="Semantic search microservice using uSearch vector similarity engine",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -90,6 +178,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and per-phase latency for /metrics
+if os.getenv("METRICS_ENABLED", "true").lower() == "true":
+    app.add_middleware(
+        MetricsMiddleware,
+        indexes=lambda: search_engine.indexes if search_engine else (),
+    )
+
 
 # API Key authentication
 async def verify_api_key(x_api_key: str = Header(None)):
@@ -100,6 +195,84 @@ async def verify_api_key(x_api_key: str = Header(None)):
     return x_api_key
 
 
+# Vector payloads: JSON arrays or binary float32
+VECTOR_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"type": "number"}}},
+            codec.RAW_FLOAT32: {"schema": {"type": "string", "format": "binary"}},
+            codec.NPY: {"schema": {"type": "string", "format": "binary"}},
+        },
+    },
+}
+
+
+async def read_vector(request: Request, field: Optional[str] = None) -> tuple[np.ndarray, dict]:
+    """
+    Read a vector from a JSON or binary request body.
+
+    Binary bodies (raw little-endian float32 or .npy) are used in place
+    without copying. JSON bodies are an array, or an object holding the
+    array under ``field``.
+
+    Returns:
+        Tuple of (float32 vector, other fields of a JSON object body)
+    """
+    body = await request.body()
+    media = codec.media_type(request.headers.get("content-type"))
+    try:
+        fields = {}
+        if media in codec.BINARY_TYPES:
+            vector = codec.decode_vectors(body, media)
+        else:
+            data = orjson.loads(body)
+            if field is not None and isinstance(data, dict):
+                fields = data
+                data = fields.pop(field, None)
+            if not isinstance(data, list):
+                raise ValueError("Expected an array of numbers")
+            vector = np.asarray(data, dtype=np.float32)
+
+        # A (1, dimensions) matrix is accepted as a single vector
+        if vector.ndim == 2 and len(vector) == 1:
+            vector = vector[0]
+        if vector.ndim != 1 or not len(vector):
+            raise ValueError(f"Expected a single vector, got shape {vector.shape}")
+        return vector, fields
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid vector payload: {e}")
+
+
+class NDJSONStream(StreamingResponse):
+    """
+    Streaming NDJSON response that leaves the request body to the endpoint.
+
+    StreamingResponse watches for disconnects by reading the request
+    channel, which would swallow an upload that is still being consumed.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def vector_response(vectors: np.ndarray, media: str, model: str) -> Response:
+    """Binary response carrying float32 vectors and their shape."""
+    return Response(
+        content=codec.encode_vectors(vectors, media),
+        media_type=media,
+        headers={
+            "X-Vector-Count": str(len(vectors) if vectors.ndim > 1 else 1),
+            "X-Vector-Dimensions": str(vectors.shape[-1]),
+            "X-Embedding-Model": model,
+        },
+    )
+
+
 # Health & Status Endpoints
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
@@ -111,13 +284,27 @@ async def health_check():
     )
 
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def get_metrics():
+    """Prometheus metrics in the text exposition format."""
+    if os.getenv("METRICS_ENABLED", "true").lower() != "true":
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.get("/stats", response_model=StatsResponse, tags=["Health"])
 async def get_stats(api_key: str = Depends(verify_api_key)):
     """Get detailed statistics about indexes and vectors."""
     if not search_engine:
         raise HTTPException(status_code=503, detail="Search engine not initialized")
 
-    return await search_engine.get_stats()
+    stats = await search_engine.get_stats()
+    if embedding_service and embedding_service.cache:
+        stats.embedding_cache = embedding_service.cache.stats()
+    return stats
 
 
 # Search Endpoints
@@ -130,29 +317,73 @@ async def semantic_search(
     Perform semantic search using natural language query.
 
     The query is converted to an embedding and compared against stored vectors
-    using HNSW approximate nearest neighbor search.
+    using HNSW approximate nearest neighbor search. With ``hybrid``, the query
+    text is also matched against indexed content (BM25) and both rankings are
+    fused, which helps with codes and exact product names. With ``rerank``,
+    more candidates are retrieved and reordered by a cross-encoder within a
+    time budget; past the budget, the retrieval order is returned.
     """
     if not search_engine or not embedding_service:
         raise HTTPException(status_code=503, detail="Services not initialized")
 
     try:
+        label_index(request.index)
+
         # Generate embedding for query
-        query_embedding = await embedding_service.generate_embedding(request.query)
+        with phase("embed"):
+            query_embedding = await embedding_service.generate_embedding(request.query)
+
+        # Retrieve more candidates when they are reranked afterwards
+        top_k = request.top_k
+        if request.rerank and reranker:
+            top_k = max(top_k, request.rerank_candidates or reranker.candidates)
 
         # Search in specified index
-        results = await search_engine.search(
-            index_name=request.index,
-            query_vector=query_embedding,
-            top_k=request.top_k,
-            filters=request.filters,
-            min_score=request.min_score,
-        )
+        with phase("search"):
+            if request.hybrid:
+                results = await search_engine.hybrid_search(
+                    index_name=request.index,
+                    query_vector=query_embedding,
+                    query_text=request.query,
+                    top_k=top_k,
+                    filters=request.filters,
+                    min_score=request.min_score,
+                    mode=request.mode,
+                    ef=request.ef,
+                    fusion=request.fusion,
+                    text_weight=request.text_weight,
+                )
+            else:
+                results = await search_engine.search(
+                    index_name=request.index,
+                    query_vector=query_embedding,
+                    top_k=top_k,
+                    filters=request.filters,
+                    min_score=request.min_score,
+                    mode=request.mode,
+                    ef=request.ef,
+                )
+
+        reranked = None
+        if request.rerank:
+            reranked = False
+            if not reranker:
+                metrics.RERANK_REQUESTS.labels("unavailable").inc()
+            elif results:
+                budget = request.rerank_budget_ms or reranker.budget_ms
+                with phase("rerank"):
+                    contents = await search_engine.get_contents(request.index, [r.id for r in results])
+                    results, reranked = await reranker.rerank(
+                        request.query, results, contents, request.top_k, budget / 1000
+                    )
+            results = results[:request.top_k]
 
         return SearchResponse(
             query=request.query,
             results=results,
             total=len(results),
             index=request.index,
+            reranked=reranked,
         )
 
     except Exception as e:
@@ -160,28 +391,39 @@ async def semantic_search(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/search/vector", response_model=SearchResponse, tags=["Search"])
+@app.post("/search/vector", response_model=SearchResponse, tags=["Search"], openapi_extra=VECTOR_BODY)
 async def vector_search(
+    request: Request,
     index: str,
-    vector: list[float],
     top_k: int = 10,
     min_score: float = 0.0,
+    mode: Optional[str] = None,
+    ef: Optional[int] = Query(default=None, ge=1, le=4096),
     api_key: str = Depends(verify_api_key)
 ):
     """
     Perform search using a pre-computed vector.
     Use this when you already have an embedding from another source.
+    The body is a JSON array, raw little-endian float32
+    (application/octet-stream) or a .npy file (application/x-npy).
+    ``ef`` overrides the index's HNSW search effort for this query.
     """
     if not search_engine:
         raise HTTPException(status_code=503, detail="Search engine not initialized")
 
+    vector, _ = await read_vector(request)
+
     try:
-        results = await search_engine.search(
-            index_name=index,
-            query_vector=vector,
-            top_k=top_k,
-            min_score=min_score,
-        )
+        label_index(index)
+        with phase("search"):
+            results = await search_engine.search(
+                index_name=index,
+                query_vector=vector,
+                top_k=top_k,
+                min_score=min_score,
+                mode=mode,
+                ef=ef,
+            )
 
         return SearchResponse(
             query="[vector search]",
@@ -195,6 +437,55 @@ async def vector_search(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/search/batch", response_model=BatchSearchResponse, tags=["Search"])
+async def batch_search(
+    request: BatchSearchRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Run many searches in one request.
+
+    Text queries are embedded in a single provider batch and all unfiltered
+    queries share one multi-threaded uSearch batch search.
+    """
+    if not search_engine or not embedding_service:
+        raise HTTPException(status_code=503, detail="Services not initialized")
+
+    try:
+        label_index(request.index)
+        if request.queries is not None:
+            with phase("embed"):
+                vectors = await embedding_service.generate_embeddings_array(request.queries)
+            labels = request.queries
+        else:
+            vectors = np.asarray(request.vectors, dtype=np.float32)
+            labels = ["[vector search]"] * len(request.vectors)
+
+        with phase("search"):
+            results = await search_engine.search_many(
+                index_name=request.index,
+                query_vectors=vectors,
+                top_k=request.top_k,
+                filters=request.filters,
+                min_score=request.min_score,
+                mode=request.mode,
+                ef=request.ef,
+            )
+
+        return BatchSearchResponse(
+            results=[
+                SearchResponse(query=label, results=hits, total=len(hits), index=request.index)
+                for label, hits in zip(labels, results)
+            ],
+            total=len(results),
+            index=request.index,
+        )
+
+    except Exception as e:
+        logger.error(f"Batch search error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/similar", response_model=SearchResponse, tags=["Search"])
 async def find_similar(
     request: SimilarRequest,
@@ -208,12 +499,14 @@ async def find_similar(
         raise HTTPException(status_code=503, detail="Search engine not initialized")
 
     try:
-        results = await search_engine.find_similar(
-            index_name=request.index,
-            item_id=request.item_id,
-            top_k=request.top_k,
-            exclude_self=request.exclude_self,
-        )
+        label_index(request.index)
+        with phase("search"):
+            results = await search_engine.find_similar(
+                index_name=request.index,
+                item_id=request.item_id,
+                top_k=request.top_k,
+                exclude_self=request.exclude_self,
+            )
 
         return SearchResponse(
             query=f"similar to {request.item_id}",
@@ -241,16 +534,21 @@ async def index_item(
         raise HTTPException(status_code=503, detail="Services not initialized")
 
     try:
+        label_index(request.index)
+
         # Generate embedding from content
-        embedding = await embedding_service.generate_embedding(request.content)
+        with phase("embed"):
+            embedding = await embedding_service.generate_embedding(request.content)
 
         # Store in index
-        await search_engine.index_item(
-            index_name=request.index,
-            item_id=request.id,
-            vector=embedding,
-            metadata=request.metadata,
-        )
+        with phase("index"):
+            await search_engine.index_item(
+                index_name=request.index,
+                item_id=request.id,
+                vector=embedding,
+                metadata=request.metadata,
+                content=request.content,
+            )
 
         return IndexResponse(
             success=True,
@@ -265,26 +563,47 @@ async def index_item(
 
 @app.post("/index/vector", response_model=IndexResponse, tags=["Indexing"])
 async def index_vector(
+    request: Request,
     index: str,
     id: str,
-    vector: list[float],
-    metadata: Optional[dict] = None,
+    x_metadata: Optional[str] = Header(None),
     api_key: str = Depends(verify_api_key)
 ):
     """
     Index an item with a pre-computed vector.
     Use this when embeddings are generated externally.
+
+    The body is either JSON ``{"vector": [...], "metadata": {...}}`` or a
+    binary vector (application/octet-stream: raw little-endian float32,
+    application/x-npy: .npy file) with metadata as JSON in X-Metadata.
+    A JSON body may also carry ``content`` for hybrid search.
     """
     if not search_engine:
         raise HTTPException(status_code=503, detail="Search engine not initialized")
 
+    vector, fields = await read_vector(request, field="vector")
+    metadata = fields.get("metadata")
+    if x_metadata is not None:
+        try:
+            metadata = orjson.loads(x_metadata)
+        except orjson.JSONDecodeError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid X-Metadata header: {e}")
+    if metadata is not None and not isinstance(metadata, dict):
+        raise HTTPException(status_code=422, detail="Metadata must be a JSON object")
+    content = fields.get("content")
+    if content is not None and not isinstance(content, str):
+        raise HTTPException(status_code=422, detail="Content must be a string")
+
     try:
-        await search_engine.index_item(
-            index_name=index,
-            item_id=id,
-            vector=vector,
-            metadata=metadata,
-        )
+        label_index(index)
+        with phase("index"):
+            await search_engine.index_items(
+                index_name=index,
+                item_ids=[id],
+                vectors=vector.reshape(1, -1),
+                metadatas=[metadata],
+                contents=[content],
+            )
 
         return IndexResponse(
             success=True,
@@ -310,32 +629,44 @@ async def batch_index(
         raise HTTPException(status_code=503, detail="Services not initialized")
 
     try:
-        indexed = 0
+        label_index(request.index)
         errors = []
+        item_ids = []
+        vectors = []
+        metadatas = []
+        contents = []
 
-        # Process items in batches for embedding generation
+        # Generate embeddings in provider-sized batches
         batch_size = 100
         items = request.items
 
         for i in range(0, len(items), batch_size):
             batch = items[i:i + batch_size]
-            contents = [item.content for item in batch]
-
-            # Generate embeddings in batch
-            embeddings = await embedding_service.generate_embeddings_batch(contents)
-
-            # Index each item
-            for j, item in enumerate(batch):
-                try:
-                    await search_engine.index_item(
-                        index_name=request.index,
-                        item_id=item.id,
-                        vector=embeddings[j],
-                        metadata=item.metadata,
-                    )
-                    indexed += 1
-                except Exception as e:
-                    errors.append({"id": item.id, "error": str(e)})
+            texts = [item.content for item in batch]
+
+            try:
+                with phase("embed"):
+                    embeddings = await embedding_service.generate_embeddings_array(texts)
+            except Exception as e:
+                errors.extend({"id": item.id, "error": str(e)} for item in batch)
+                continue
+
+            item_ids.extend(item.id for item in batch)
+            vectors.append(embeddings)
+            metadatas.extend(item.metadata for item in batch)
+            contents.extend(texts)
+
+        # Insert all embedded items with a single vectorized call
+        indexed = 0
+        if item_ids:
+            with phase("index"):
+                indexed = await search_engine.index_items(
+                    index_name=request.index,
+                    item_ids=item_ids,
+                    vectors=np.concatenate(vectors),
+                    metadatas=metadatas,
+                    contents=contents,
+                )
 
         return BatchIndexResponse(
             success=len(errors) == 0,
@@ -349,6 +680,144 @@ async def batch_index(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post(
+    "/index/stream",
+    tags=["Indexing"],
+    response_class=NDJSONStream,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        },
+    },
+)
+async def stream_index(
+    request: Request,
+    index: str,
+    batch_size: int = Query(default=500, ge=1, le=10000),
+    progress: bool = True,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Index an NDJSON upload of any size in one pass.
+
+    Each line is ``{"id": ..., "content": ...}`` or ``{"id": ..., "vector":
+    [...]}`` with optional ``metadata``. Lines are parsed, embedded and
+    inserted in pipelined batches while the body is still uploading, with
+    backpressure to the client. The response is NDJSON: ``progress`` events
+    after inserted batches (unless ``progress=false``), then a ``done`` (or
+    ``error``) event with totals and the first failed lines. Clients sending
+    long uploads should read the response concurrently.
+    """
+    if not search_engine or not embedding_service:
+        raise HTTPException(status_code=503, detail="Services not initialized")
+
+    label_index(index)
+    ingest = StreamIngest(
+        search_engine,
+        embedding_service,
+        index,
+        batch_size=batch_size,
+        queue_depth=int(os.getenv("INGEST_QUEUE_DEPTH", "2")),
+    )
+
+    async def events():
+        try:
+            async for update in ingest.run(request.stream()):
+                if progress:
+                    yield orjson.dumps({"event": "progress", **update}) + b"\n"
+        except Exception as e:
+            logger.error(f"Stream index error: {e}")
+            yield orjson.dumps({"event": "error", "detail": str(e), **ingest.summary()}) + b"\n"
+            return
+        yield orjson.dumps({"event": "done", **ingest.summary()}) + b"\n"
+
+    return NDJSONStream(events())
+
+
+# Job Endpoints
+@app.post("/jobs/index", response_model=JobStatus, status_code=202, tags=["Jobs"])
+async def submit_index_job(
+    request: IndexJobRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Queue a bulk indexing job and return at once.
+    Items are ``content`` (embedded by the service) or precomputed ``vector``.
+    Poll ``GET /jobs/{id}`` for progress.
+    """
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+
+    try:
+        return await job_queue.submit_items(request.index, request.items)
+    except Exception as e:
+        logger.error(f"Submit job error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post(
+    "/jobs/index/stream",
+    response_model=JobStatus,
+    status_code=202,
+    tags=["Jobs"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        },
+    },
+)
+async def submit_index_job_stream(
+    request: Request,
+    index: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Queue a bulk indexing job from an NDJSON upload (same lines as
+    ``/index/stream``), spooled to disk without holding it in memory.
+    """
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+
+    try:
+        return await job_queue.submit_stream(index, request.stream())
+    except Exception as e:
+        logger.error(f"Submit job error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/jobs", response_model=list[JobStatus], tags=["Jobs"])
+async def list_jobs(api_key: str = Depends(verify_api_key)):
+    """List indexing jobs, newest first."""
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    return job_queue.list_jobs()
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus, tags=["Jobs"])
+async def get_job(job_id: str, api_key: str = Depends(verify_api_key)):
+    """Progress, throughput and ETA of an indexing job."""
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+
+    status = job_queue.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return status
+
+
+@app.delete("/jobs/{job_id}", tags=["Jobs"])
+async def cancel_job(job_id: str, api_key: str = Depends(verify_api_key)):
+    """Cancel a queued or running job; items already indexed are kept."""
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+
+    if not await job_queue.cancel(job_id):
+        raise HTTPException(status_code=404, detail=f"No active job '{job_id}'")
+    return {"success": True, "id": job_id}
+
+
 @app.delete("/index/{index_name}/{item_id}", tags=["Indexing"])
 async def delete_item(
     index_name: str,
@@ -383,6 +852,14 @@ async def create_index(
     index_name: str,
     dimensions: int = 1536,
     metric: str = "cos",
+    serving_mode: Optional[str] = None,
+    dtype: Optional[str] = None,
+    rescore: Optional[bool] = None,
+    search_mode: Optional[str] = None,
+    connectivity: Optional[int] = Query(default=None, ge=2, le=128),
+    expansion_add: Optional[int] = Query(default=None, ge=1, le=4096),
+    expansion_search: Optional[int] = Query(default=None, ge=1, le=4096),
+    shards: Optional[int] = Query(default=None, ge=1, le=64),
     api_key: str = Depends(verify_api_key)
 ):
     """
@@ -392,13 +869,45 @@ async def create_index(
         index_name: Unique name for the index
         dimensions: Vector dimensions (1536 for OpenAI, 1024 for Claude)
         metric: Distance metric (cos, l2, ip)
+        serving_mode: memory or view (read-only mmap); defaults to INDEX_SERVING_MODE
+        dtype: Storage type (f32, f16, i8, b1); defaults to INDEX_DTYPE
+        rescore: Rerank quantized candidates with float32 vectors (default for i8, b1)
+        search_mode: auto (exact below EXACT_SEARCH_THRESHOLD vectors), ann or exact
+        connectivity: HNSW edges per node (M, default 16)
+        expansion_add: HNSW ef_construction (default 128)
+        expansion_search: Default HNSW ef_search (default 64), overridable per query with ``ef``
+        shards: HNSW graphs the index is split into by key hash; defaults to INDEX_SHARDS
     """
     if not search_engine:
         raise HTTPException(status_code=503, detail="Search engine not initialized")
 
     try:
-        await search_engine.create_index(index_name, dimensions, metric)
-        return {"success": True, "index": index_name, "dimensions": dimensions}
+        await search_engine.create_index(
+            index_name,
+            dimensions,
+            metric,
+            serving_mode=serving_mode,
+            dtype=dtype,
+            rescore=rescore,
+            search_mode=search_mode,
+            connectivity=connectivity,
+            expansion_add=expansion_add,
+            expansion_search=expansion_search,
+            shards=shards,
+        )
+        info = search_engine.index_info[index_name]
+        return {
+            "success": True,
+            "index": index_name,
+            "dimensions": dimensions,
+            "dtype": info["dtype"],
+            "rescore": info["rescore"],
+            "search_mode": info["search_mode"],
+            "connectivity": info["connectivity"],
+            "expansion_add": info["expansion_add"],
+            "expansion_search": info["expansion_search"],
+            "shards": info["shards"],
+        }
 
     except Exception as e:
         logger.error(f"Create index error: {e}")
@@ -441,17 +950,47 @@ async def optimize_index(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/indexes/{index_name}/snapshot", tags=["Management"])
+async def snapshot_index(
+    index_name: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """Write a snapshot of an index now (runs off the event loop)."""
+    if not search_engine:
+        raise HTTPException(status_code=503, detail="Search engine not initialized")
+
+    try:
+        committed = await search_engine.snapshot_index(index_name)
+        if not committed:
+            raise ValueError(f"Snapshot of index '{index_name}' failed")
+        return {"success": True, "index": index_name, "status": "snapshotted"}
+
+    except Exception as e:
+        logger.error(f"Snapshot index error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # Embedding Endpoints
 @app.post("/embeddings", tags=["Embeddings"])
 async def generate_embedding(
     text: str,
+    accept: Optional[str] = Header(None),
     api_key: str = Depends(verify_api_key)
 ):
-    """Generate an embedding vector for the given text."""
+    """
+    Generate an embedding vector for the given text.
+    Send ``Accept: application/octet-stream`` (raw little-endian float32) or
+    ``application/x-npy`` to receive the vector as binary.
+    """
     if not embedding_service:
         raise HTTPException(status_code=503, detail="Embedding service not initialized")
 
     try:
+        media = codec.binary_accept(accept)
+        if media is not None:
+            embedding = await embedding_service.generate_embedding(text)
+            return vector_response(np.asarray(embedding, dtype=np.float32), media, embedding_service.model)
+
         embedding = await embedding_service.generate_embedding(text)
         return {
             "embedding": embedding,
@@ -467,13 +1006,23 @@ async def generate_embedding(
 @app.post("/embeddings/batch", tags=["Embeddings"])
 async def generate_embeddings_batch(
     texts: list[str],
+    accept: Optional[str] = Header(None),
     api_key: str = Depends(verify_api_key)
 ):
-    """Generate embedding vectors for multiple texts."""
+    """
+    Generate embedding vectors for multiple texts.
+    Binary responses (see /embeddings) hold one row per text; with raw
+    float32 the shape is given by X-Vector-Count and X-Vector-Dimensions.
+    """
     if not embedding_service:
         raise HTTPException(status_code=503, detail="Embedding service not initialized")
 
     try:
+        media = codec.binary_accept(accept)
+        if media is not None:
+            embeddings = await embedding_service.generate_embeddings_array(texts)
+            return vector_response(embeddings, media, embedding_service.model)
+
         embeddings = await embedding_service.generate_embeddings_batch(texts)
         return {
             "embeddings": embeddings,
@@ -0,0 +1,364 @@
+"""
+Columnar, memory-mapped metadata store.
+Keeps per-item metadata on disk as typed columns plus a JSON blob column.
+"""
+
+import os
+import json
+import shutil
+import logging
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataStore:
+    """
+    Per-index metadata storage addressed by uSearch key.
+
+    Rows are indexed by key, which the KeyRegistry allocates densely, so a
+    lookup is a direct array access. Common filter fields are stored as
+    dictionary-encoded int32 columns; any other field goes into a compact JSON
+    blob column. Columns are memory-mapped on open and only the rows actually
+    returned by a search are decoded into dicts.
+
+    On-disk layout (one directory per index)::
+
+        header.json      row count, blob size, dictionaries, blob field names
+        present.u1       1 if the row holds an item
+        blob_offset.u8   offset of the row's JSON blob in blob.bin
+        blob_length.u4   length of that blob (0 = no extra fields)
+        <field>.i4       dictionary code per typed field (-1 = absent)
+        blob.bin         concatenated JSON blobs
+
+    Saves append new rows and blobs and rewrite changed rows in place, so
+    their cost follows the number of changed rows, not the store size. The
+    header is committed last, so data past the recorded row count and blob
+    size is ignored on open. Snapshots without a write-ahead log instead
+    stage rewritten columns and the header for the caller to rename.
+    """
+
+    TYPED_FIELDS = ("scope", "source", "country", "unit")
+
+    # Fixed bookkeeping columns; typed fields are int32 dictionary codes
+    _COLUMNS = {
+        "present": np.uint8,
+        "blob_offset": np.uint64,
+        "blob_length": np.uint32,
+    }
+
+    def __init__(self, path: Path):
+        """
+        Initialize an empty store.
+
+        Args:
+            path: Directory holding the store files
+        """
+        self.path = Path(path)
+        self.rows = 0  # rows committed to disk
+        self.blob_size = 0
+        self.values: dict[str, list] = {field: [] for field in self.TYPED_FIELDS}
+        self.blob_fields: set[str] = set()
+        self._codes: dict[str, dict] = {field: {} for field in self.TYPED_FIELDS}
+        self._pending: dict[int, Optional[dict]] = {}  # unsaved rows (None = deleted)
+        self._map_columns()
+
+    def _column_file(self, column: str) -> Path:
+        """Path of a column file, suffixed with its dtype (e.g. scope.i4)."""
+        dtype = np.dtype(self._column_dtype(column))
+        return self.path / f"{column}.{dtype.kind}{dtype.itemsize}"
+
+    def _column_dtype(self, column: str):
+        """NumPy dtype of a column."""
+        return self._COLUMNS.get(column, np.int32)
+
+    def _all_columns(self) -> list[str]:
+        """Names of all column files."""
+        return [*self._COLUMNS, *self.TYPED_FIELDS]
+
+    @classmethod
+    def open(cls, path: Path) -> "MetadataStore":
+        """Open a store from disk, memory-mapping its columns."""
+        store = cls(path)
+        header_file = store.path / "header.json"
+        if header_file.exists():
+            with open(header_file, "r") as f:
+                header = json.load(f)
+            store.rows = header["rows"]
+            store.blob_size = header["blob_size"]
+            store.blob_fields = set(header.get("blob_fields", []))
+            for field in cls.TYPED_FIELDS:
+                store.values[field] = header["values"].get(field, [])
+                store._codes[field] = {v: code for code, v in enumerate(store.values[field])}
+            store._map_columns()
+        return store
+
+    def _map_columns(self):
+        """(Re)map column files, ignoring anything past the committed rows."""
+        self._columns: dict[str, np.ndarray] = {}
+        for column in self._all_columns():
+            dtype = self._column_dtype(column)
+            if self.rows:
+                self._columns[column] = np.memmap(
+                    self._column_file(column), dtype=dtype, mode="r", shape=(self.rows,)
+                )
+            else:
+                self._columns[column] = np.empty(0, dtype=dtype)
+
+        if self.blob_size:
+            self._blob = np.memmap(self.path / "blob.bin", dtype=np.uint8, mode="r", shape=(self.blob_size,))
+        else:
+            self._blob = np.empty(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        present = int(np.count_nonzero(self._columns["present"]))
+        for key, metadata in self._pending.items():
+            was_present = key < self.rows and self._columns["present"][key]
+            present += (metadata is not None) - bool(was_present)
+        return present
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are unsaved changes."""
+        return bool(self._pending)
+
+    def get(self, key: int) -> Optional[dict]:
+        """
+        Hydrate the metadata of one row.
+
+        Returns:
+            A new metadata dict, or None if the row holds no item
+        """
+        if key in self._pending:
+            metadata = self._pending[key]
+            return dict(metadata) if metadata is not None else None
+        if key >= self.rows or not self._columns["present"][key]:
+            return None
+
+        metadata = {}
+        for field in self.TYPED_FIELDS:
+            code = self._columns[field][key]
+            if code >= 0:
+                metadata[field] = self.values[field][code]
+
+        length = int(self._columns["blob_length"][key])
+        if length:
+            offset = int(self._columns["blob_offset"][key])
+            metadata.update(json.loads(self._blob[offset:offset + length].tobytes()))
+        return metadata
+
+    def put(self, key: int, metadata: Optional[dict]):
+        """Set the metadata of a row."""
+        self._pending[key] = dict(metadata or {})
+
+    def delete(self, key: int):
+        """Clear a row."""
+        if key in self._pending or key < self.rows:
+            self._pending[key] = None
+
+    def column(self, field: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the committed rows of a typed field.
+
+        Returns:
+            Tuple of (keys, codes) for present rows; decode codes via ``values``
+        """
+        keys = np.flatnonzero(self._columns["present"]).astype(np.uint64)
+        return keys, np.asarray(self._columns[field][keys.astype(np.intp)])
+
+    def _encode(self, metadata: dict) -> tuple[dict[str, int], bytes]:
+        """Split metadata into typed column codes and a JSON blob."""
+        codes = {}
+        rest = {}
+        for field, value in metadata.items():
+            typed = field in self._codes and isinstance(value, (str, int)) and not isinstance(value, bool)
+            if typed:
+                code = self._codes[field].get(value)
+                if code is None:
+                    code = len(self.values[field])
+                    self.values[field].append(value)
+                    self._codes[field][value] = code
+                codes[field] = code
+            else:
+                rest[field] = value
+        self.blob_fields.update(rest)
+        blob = json.dumps(rest, separators=(",", ":")).encode() if rest else b""
+        return codes, blob
+
+    def save(self):
+        """
+        Persist pending rows, appending where possible.
+
+        Rows that already exist are overwritten in place. Before that, the
+        header is committed with the grown dictionaries and blob size, so
+        every value written in place is valid even if the process dies
+        before the new row count is committed; the write-ahead log then
+        applies those rows again.
+        """
+        self._save(in_place=True)
+
+    def _save(self, in_place: bool) -> list[tuple[Path, Path]]:
+        """
+        Write pending rows, as ``save`` does when ``in_place``.
+
+        Otherwise no committed byte is overwritten: column files with
+        rewritten rows are copied to ``.snapshot`` files and changed there,
+        and the header goes to ``header.json.snapshot``. New rows and blobs
+        are still appended past the committed sizes, which readers ignore.
+
+        Returns:
+            (staged, live) file pairs the caller must rename into place
+        """
+        if not self._pending:
+            return []
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        new_rows = max(self.rows, max(self._pending) + 1)
+        tail = new_rows - self.rows
+
+        # Encode pending rows; blobs are appended past the committed size
+        updates: dict[str, dict[int, int]] = {column: {} for column in self._all_columns()}
+        blob_offset = self.blob_size
+        with open(self.path / "blob.bin", "ab") as blob_file:
+            blob_file.truncate(self.blob_size)
+            for key in sorted(self._pending):
+                metadata = self._pending[key]
+                row = {column: (-1 if column in self.TYPED_FIELDS else 0) for column in self._all_columns()}
+                if metadata is not None:
+                    codes, blob = self._encode(metadata)
+                    row.update(codes)
+                    row["present"] = 1
+                    if blob:
+                        blob_file.write(blob)
+                        row["blob_offset"] = blob_offset
+                        row["blob_length"] = len(blob)
+                        blob_offset += len(blob)
+                for column, value in row.items():
+                    updates[column][key] = value
+            blob_file.flush()
+            os.fsync(blob_file.fileno())
+
+        # Publish the codes and blobs that rewritten rows will refer to
+        self.blob_size = blob_offset
+        rewrite = min(self._pending) < self.rows
+        if rewrite and in_place:
+            self._write_header()
+
+        # Write each column: in-place for existing rows, one append for new ones
+        renames = []
+        for column in self._all_columns():
+            dtype = np.dtype(self._column_dtype(column))
+            fill = -1 if column in self.TYPED_FIELDS else 0
+            tail_values = np.full(tail, fill, dtype=dtype)
+            file = self._column_file(column)
+            file.touch(exist_ok=True)
+            if rewrite and not in_place:
+                staged = file.with_name(file.name + ".snapshot")
+                shutil.copyfile(file, staged)
+                renames.append((staged, file))
+                file = staged
+
+            with open(file, "r+b") as f:
+                for key, value in updates[column].items():
+                    if key < self.rows:
+                        f.seek(key * dtype.itemsize)
+                        f.write(np.array([value], dtype=dtype).tobytes())
+                    else:
+                        tail_values[key - self.rows] = value
+                f.seek(self.rows * dtype.itemsize)
+                f.write(tail_values.tobytes())
+                f.truncate(new_rows * dtype.itemsize)
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Commit the header last
+        self.rows = new_rows
+        if not in_place:
+            return renames + [(self._write_header(staged=True), self.path / "header.json")]
+        self._write_header()
+        self._pending.clear()
+        self._map_columns()
+        return []
+
+    def freeze(self) -> dict[int, Optional[dict]]:
+        """Capture the unsaved rows as of now, for ``write_snapshot``."""
+        return dict(self._pending)
+
+    def write_snapshot(
+        self, pending: dict[int, Optional[dict]], in_place: bool = True
+    ) -> list[tuple[Path, Path]]:
+        """
+        Save rows captured by ``freeze`` into this store's files.
+
+        Writes through a second handle, so it can run on a worker thread
+        while rows keep changing in memory: frozen rows stay pending in this
+        store until ``reopen``, so reads never see the rows rewritten in
+        place. Only the captured rows are written.
+
+        Args:
+            pending: Rows captured by ``freeze``
+            in_place: Commit the rows now, rewriting existing ones in place.
+                A crash before the rest of the snapshot commits then leaves
+                rows newer than the index, so this needs a write-ahead log
+                to replay them; otherwise stage the changes
+
+        Returns:
+            (staged, live) file pairs to rename into place with the rest of
+            the snapshot; empty when ``in_place``
+        """
+        clone = MetadataStore.open(self.path)
+        clone._pending = dict(pending)
+        return clone._save(in_place)
+
+    def reopen(self, frozen: dict[int, Optional[dict]]) -> "MetadataStore":
+        """
+        Open this store's files again after ``write_snapshot``.
+
+        Args:
+            frozen: Rows captured by ``freeze`` and included in the snapshot
+
+        Returns:
+            The new store, keeping rows changed since the freeze as pending
+        """
+        store = MetadataStore.open(self.path)
+        store._pending = {
+            key: metadata
+            for key, metadata in self._pending.items()
+            if key not in frozen or frozen[key] is not metadata
+        }
+        return store
+
+    def _write_header(self, staged: bool = False) -> Path:
+        """
+        Atomically replace header.json.
+
+        With ``staged``, write header.json.snapshot instead and return it
+        for the caller to rename.
+        """
+        header = {
+            "version": 1,
+            "rows": self.rows,
+            "blob_size": self.blob_size,
+            "values": self.values,
+            "blob_fields": sorted(self.blob_fields),
+        }
+        header_file = self.path / "header.json"
+        tmp_file = self.path / ("header.json.snapshot" if staged else "header.json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(header, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        if staged:
+            return tmp_file
+        os.replace(tmp_file, header_file)
+        return header_file
+
+    def destroy(self):
+        """Delete the store from disk."""
+        self._columns = {}
+        self._blob = np.empty(0, dtype=np.uint8)
+        if self.path.exists():
+            shutil.rmtree(self.path)
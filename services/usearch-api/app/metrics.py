@@ -0,0 +1,294 @@
+"""
+Prometheus metrics.
+Metric definitions on prometheus_client, request phase timing and
+collectors for engine, cache and queue state.
+"""
+
+import time
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Callable, Collection, Iterable, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans sub-millisecond index lookups to slow provider calls
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Per-request phase durations, filled in by endpoints through ``phase``
+_request: ContextVar[Optional[dict]] = ContextVar("usearch_request", default=None)
+
+
+class _ScrapeCollector:
+    """Metrics read from live state at scrape time (gauges, external counters)."""
+
+    def __init__(self):
+        self._collectors: dict[str, Callable[[], Iterable[Metric]]] = {}
+
+    def set(self, name: str, collector: Callable[[], Iterable[Metric]]):
+        self._collectors[name] = collector
+
+    def collect(self) -> Iterable[Metric]:
+        for name, collector in list(self._collectors.items()):
+            try:
+                yield from collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector '{name}' failed: {e}")
+
+
+REGISTRY = CollectorRegistry(auto_describe=False)
+_SCRAPE = _ScrapeCollector()
+REGISTRY.register(_SCRAPE)
+
+
+def set_collector(name: str, collector: Callable[[], Iterable[Metric]]):
+    """Install (or replace) a function producing metrics at scrape time."""
+    _SCRAPE.set(name, collector)
+
+
+def render() -> bytes:
+    """All metrics in the Prometheus text format."""
+    return generate_latest(REGISTRY)
+
+
+HTTP_REQUESTS = Counter(
+    "usearch_http_requests",
+    "HTTP requests by route and status",
+    ("endpoint", "method", "status"),
+    registry=REGISTRY,
+)
+HTTP_LATENCY = Histogram(
+    "usearch_http_request_duration_seconds",
+    "HTTP request latency by route, index and phase (total, embed, search, index, rerank, serialize)",
+    ("endpoint", "index", "phase"),
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+SEARCH_PHASES = Histogram(
+    "usearch_search_phase_duration_seconds",
+    "Search engine time by index and phase (lock_wait, filter, ann, exact, rescore, lexical, fusion, hydrate)",
+    ("index", "phase"),
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+EXECUTOR_WAIT = Histogram(
+    "usearch_executor_wait_seconds",
+    "Time uSearch calls wait for a free worker thread",
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+EMBEDDING_LATENCY = Histogram(
+    "usearch_embedding_duration_seconds",
+    "Embedding provider call latency",
+    ("provider",),
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+EMBEDDING_TEXTS = Counter(
+    "usearch_embedding_texts", "Texts sent to the embedding provider", ("provider",), registry=REGISTRY
+)
+EMBEDDING_ERRORS = Counter(
+    "usearch_embedding_errors", "Failed embedding provider calls", ("provider", "error"), registry=REGISTRY
+)
+EMBEDDING_RESPONSES = Counter(
+    "usearch_embedding_http_responses",
+    "Embedding provider HTTP responses",
+    ("provider", "status"),
+    registry=REGISTRY,
+)
+RERANK_REQUESTS = Counter(
+    "usearch_rerank_requests",
+    "Rerank calls by outcome (reranked, timeout, error, no_content, unavailable)",
+    ("outcome",),
+    registry=REGISTRY,
+)
+RERANK_PAIRS = Counter(
+    "usearch_rerank_pairs", "Query-candidate pairs by source (cached, scored)", ("source",), registry=REGISTRY
+)
+LOOP_LAG = Histogram(
+    "usearch_event_loop_lag_seconds",
+    "Delay of event loop wake-ups beyond their schedule",
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+
+class phase:
+    """
+    Time a phase of the current HTTP request.
+
+    Used as ``with phase("embed"):`` inside endpoints; a no-op outside a
+    request instrumented by MetricsMiddleware.
+    """
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record = _request.get()
+        if record is not None:
+            phases = record["phases"]
+            phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+def label_index(index: str):
+    """Attach the target index to the current request's metrics."""
+    record = _request.get()
+    if record is not None:
+        record["index"] = index
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts and phase latencies.
+
+    Endpoints time their phases with ``phase``; whatever the request spends
+    outside them (request parsing, response validation and serialization)
+    is recorded as the ``serialize`` phase.
+
+    Index names come from request bodies, so only loaded indexes become
+    label values; anything else is recorded as ``unknown`` to keep the
+    number of series bounded.
+    """
+
+    def __init__(self, app, indexes: Optional[Callable[[], Collection[str]]] = None):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application
+            indexes: Returns the names of the loaded indexes
+        """
+        self.app = app
+        self.indexes = indexes or (lambda: ())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        record = {"phases": {}, "index": ""}
+        token = _request.set(record)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request.reset(token)
+
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            HTTP_REQUESTS.labels(endpoint, scope["method"], str(status)).inc()
+            if endpoint != "/metrics":
+                index = record["index"]
+                if index and index not in self.indexes():
+                    index = "unknown"
+                HTTP_LATENCY.labels(endpoint, index, "total").observe(elapsed)
+                phases = record["phases"]
+                for name, seconds in phases.items():
+                    HTTP_LATENCY.labels(endpoint, index, name).observe(seconds)
+                if phases:
+                    serialize = max(0.0, elapsed - sum(phases.values()))
+                    HTTP_LATENCY.labels(endpoint, index, "serialize").observe(serialize)
+
+
+async def monitor_event_loop(interval: float = 0.5):
+    """
+    Sample event loop lag until cancelled.
+
+    A loop blocked by synchronous work wakes this task late; the delay
+    beyond ``interval`` is the lag every other request experienced.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(0.0, loop.time() - scheduled))
+
+
+def collect_engine(engine) -> list[Metric]:
+    """Index sizes, memory, dead entries, log sizes and queue depths of a SearchEngine."""
+    labels = ["index"]
+    vectors = GaugeMetricFamily("usearch_index_vectors", "Live vectors per index", labels=labels)
+    memory = GaugeMetricFamily("usearch_index_memory_bytes", "uSearch index memory usage", labels=labels)
+    dead = GaugeMetricFamily("usearch_index_dead_entries", "Removed entries awaiting compaction", labels=labels)
+    wal = GaugeMetricFamily("usearch_wal_bytes", "Write-ahead log bytes since the last snapshot", labels=labels)
+    readers = GaugeMetricFamily("usearch_index_lock_readers", "Searches holding the index lock", labels=labels)
+    waiters = GaugeMetricFamily("usearch_index_lock_waiters", "Operations queued for the index lock", labels=labels)
+
+    for name, index in list(engine.indexes.items()):
+        vectors.add_metric([name], len(index))
+        memory.add_metric([name], index.memory_usage)
+        dead.add_metric([name], engine._dead_entries(name))
+        if name in engine.wals:
+            wal.add_metric([name], engine.wals[name].size)
+        lock = engine._locks.get(name)
+        if lock is not None:
+            readers.add_metric([name], lock.readers)
+            waiters.add_metric([name], lock.waiting)
+
+    queue = GaugeMetricFamily(
+        "usearch_executor_queue_depth",
+        "uSearch calls waiting for a worker thread",
+        value=engine._executor._work_queue.qsize(),
+    )
+    return [vectors, memory, dead, wal, readers, waiters, queue]
+
+
+def collect_embeddings(service) -> list[Metric]:
+    """Cache hit counters, micro-batch queue depth and pipeline retries of an EmbeddingService."""
+    metrics = []
+    if service.cache is not None:
+        stats = service.cache.stats()
+        lookups = CounterMetricFamily(
+            "usearch_embedding_cache_lookups", "Embedding cache lookups by result", labels=["result"]
+        )
+        for result in ("memory_hits", "disk_hits", "misses"):
+            lookups.add_metric([result], stats[result])
+        entries = GaugeMetricFamily("usearch_embedding_cache_entries", "Cached embeddings per tier", labels=["tier"])
+        entries.add_metric(["memory"], stats["memory_entries"])
+        entries.add_metric(["disk"], stats["disk_entries"])
+        metrics += [lookups, entries]
+
+    if service.batcher is not None:
+        metrics.append(GaugeMetricFamily(
+            "usearch_embedding_batch_pending",
+            "Texts waiting in the embedding micro-batcher",
+            value=service.batcher.stats()["pending"],
+        ))
+
+    pipeline = CounterMetricFamily(
+        "usearch_embedding_pipeline", "Batch pipeline requests, retries and splits", labels=["provider", "event"]
+    )
+    for provider, stats in service.pipeline_stats().items():
+        for event, value in stats.items():
+            pipeline.add_metric([provider, event], value)
+    metrics.append(pipeline)
+    return metrics
+
+
+def collect_jobs(queue) -> list[Metric]:
+    """Indexing jobs per state of a JobQueue."""
+    jobs = GaugeMetricFamily("usearch_jobs", "Indexing jobs by state", labels=["state"])
+    for state, count in queue.counts().items():
+        jobs.add_metric([state], count)
+    return [jobs]
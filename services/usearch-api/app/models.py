@@ -2,8 +2,8 @@
 Pydantic models for uSearch API requests and responses.
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Union
 from datetime import datetime
 
 
@@ -21,7 +21,15 @@ class IndexStats(BaseModel):
     vector_count: int
     dimensions: int
     metric: str
+    dtype: str = "f32"
+    serving_mode: str = "memory"
+    search_mode: str = "auto"
+    shards: int = 1
     size_bytes: int
+    memory_bytes: int = 0
+    text_documents: int = 0
+    dead_entries: int = 0
+    dead_ratio: float = 0.0
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -33,6 +41,7 @@ class StatsResponse(BaseModel):
     indexes: list[IndexStats]
     memory_usage_mb: float
     uptime_seconds: float
+    embedding_cache: Optional[dict] = None
 
 
 # Search
@@ -43,6 +52,46 @@ class SearchRequest(BaseModel):
     top_k: int = Field(default=10, description="Number of results to return", ge=1, le=100)
     filters: Optional[dict] = Field(default=None, description="Metadata filters")
     min_score: float = Field(default=0.0, description="Minimum similarity score", ge=0.0, le=1.0)
+    mode: Optional[str] = Field(
+        default=None,
+        description="Search mode: auto, ann (HNSW) or exact (brute force); defaults to the index setting",
+    )
+    ef: Optional[int] = Field(
+        default=None,
+        description="HNSW candidates explored (higher: better recall, slower); defaults to the index setting",
+        ge=1,
+        le=4096,
+    )
+    hybrid: bool = Field(
+        default=False,
+        description="Also match the query against indexed content (BM25) and fuse both rankings",
+    )
+    fusion: str = Field(
+        default="rrf",
+        description="Hybrid fusion: rrf (reciprocal rank fusion) or weighted (normalized scores)",
+    )
+    text_weight: float = Field(
+        default=0.3,
+        description="Weight of the lexical ranking in hybrid search",
+        ge=0.0,
+        le=1.0,
+    )
+    rerank: bool = Field(
+        default=False,
+        description="Reorder retrieved candidates with the cross-encoder (if enabled on the server)",
+    )
+    rerank_candidates: Optional[int] = Field(
+        default=None,
+        description="Candidates retrieved for reranking; defaults to the server setting",
+        ge=1,
+        le=1000,
+    )
+    rerank_budget_ms: Optional[int] = Field(
+        default=None,
+        description="Time allowed for reranking before falling back to retrieval order",
+        ge=1,
+        le=60000,
+    )
 
 
 class SearchResult(BaseModel):
@@ -50,6 +99,9 @@ class SearchResult(BaseModel):
     id: str = Field(..., description="Item ID")
     score: float = Field(..., description="Similarity score (0-1)")
     metadata: Optional[dict] = Field(default=None, description="Item metadata")
+    rerank_score: Optional[float] = Field(
+        default=None, description="Cross-encoder relevance (unbounded logit), set when reranked"
+    )
 
 
 class SearchResponse(BaseModel):
@@ -58,6 +110,53 @@ class SearchResponse(BaseModel):
     results: list[SearchResult]
     total: int
     index: str
+    reranked: Optional[bool] = Field(
+        default=None, description="Whether rerank was requested and applied (None if not requested)"
+    )
+
+
+class BatchSearchRequest(BaseModel):
+    """
+    Multi-query search request.
+
+    Provide either ``queries`` (texts, embedded in one batch) or ``vectors``
+    (pre-computed embeddings). ``top_k``, ``filters`` and ``min_score`` apply
+    to every query, or per query when given as lists of the same length.
+    """
+    index: str = Field(..., description="Index to search in")
+    queries: Optional[list[str]] = Field(default=None, description="Natural language queries")
+    vectors: Optional[list[list[float]]] = Field(default=None, description="Query vectors")
+    top_k: Union[int, list[int]] = Field(default=10, description="Results per query")
+    filters: Union[dict, list[Optional[dict]], None] = Field(default=None, description="Metadata filters")
+    min_score: Union[float, list[float]] = Field(default=0.0, description="Minimum similarity score")
+    mode: Optional[str] = Field(default=None, description="Search mode: auto, ann or exact")
+    ef: Optional[int] = Field(default=None, description="HNSW candidates explored per query", ge=1, le=4096)
+
+    @model_validator(mode="after")
+    def check_queries(self):
+        if (self.queries is None) == (self.vectors is None):
+            raise ValueError("Provide exactly one of 'queries' or 'vectors'")
+        count = len(self.queries if self.queries is not None else self.vectors)
+        if not 1 <= count <= 1000:
+            raise ValueError("Between 1 and 1000 queries are allowed per batch")
+        for name in ("top_k", "filters", "min_score"):
+            value = getattr(self, name)
+            if isinstance(value, list) and len(value) != count:
+                raise ValueError(f"'{name}' has {len(value)} entries for {count} queries")
+        top_ks = self.top_k if isinstance(self.top_k, list) else [self.top_k]
+        if not all(1 <= k <= 100 for k in top_ks):
+            raise ValueError("'top_k' must be between 1 and 100")
+        min_scores = self.min_score if isinstance(self.min_score, list) else [self.min_score]
+        if not all(0.0 <= score <= 1.0 for score in min_scores):
+            raise ValueError("'min_score' must be between 0 and 1")
+        return self
+
+
+class BatchSearchResponse(BaseModel):
+    """Multi-query search response, one entry per query in request order."""
+    results: list[SearchResponse]
+    total: int
+    index: str
 
 
 class SimilarRequest(BaseModel):
@@ -91,6 +190,49 @@ class BatchIndexItem(BaseModel):
     metadata: Optional[dict] = Field(default=None, description="Additional metadata")
 
 
+class StreamIndexItem(BaseModel):
+    """
+    One NDJSON line of a streaming ingest: text content or a precomputed vector.
+
+    Content sent along with a vector is not embedded; it only feeds the
+    lexical index used by hybrid search.
+    """
+    id: str = Field(..., description="Unique item ID")
+    content: Optional[str] = Field(default=None, description="Text content to embed and match lexically")
+    vector: Optional[list[float]] = Field(default=None, description="Precomputed embedding vector")
+    metadata: Optional[dict] = Field(default=None, description="Additional metadata")
+
+    @model_validator(mode="after")
+    def check_payload(self):
+        if self.content is None and self.vector is None:
+            raise ValueError("Provide content or vector")
+        return self
+
+
+class IndexJobRequest(BaseModel):
+    """Bulk indexing job submission."""
+    index: str = Field(..., description="Index to store in")
+    items: list[StreamIndexItem] = Field(..., description="Items to index", min_length=1)
+
+
+class JobStatus(BaseModel):
+    """Progress of a background indexing job."""
+    id: str
+    index: str
+    state: str = Field(..., description="queued, running, completed, failed or cancelled")
+    total: int = Field(..., description="Items in the job")
+    processed: int = Field(..., description="Items processed (checkpointed)")
+    indexed: int
+    failed: int
+    errors: list[dict] = Field(default_factory=list, description="First failed items")
+    error: Optional[str] = None
+    items_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 class BatchIndexRequest(BaseModel):
     """Batch index request."""
     index: str = Field(..., description="Index to store in")
@@ -117,6 +259,29 @@ class CreateIndexRequest(BaseModel):
     name: str = Field(..., description="Index name", min_length=1, max_length=64)
     dimensions: int = Field(default=1536, description="Vector dimensions", ge=64, le=4096)
     metric: str = Field(default="cos", description="Distance metric: cos, l2, ip")
+    dtype: Optional[str] = Field(default=None, description="Storage type: f32, f16, i8, b1")
+    rescore: Optional[bool] = Field(
+        default=None,
+        description="Rerank quantized candidates at full precision (default for i8, b1)",
+    )
+    serving_mode: Optional[str] = Field(
+        default=None,
+        description="Serving mode: memory (private copy) or view (read-only mmap)",
+    )
+    search_mode: Optional[str] = Field(
+        default=None,
+        description="Search mode: auto (exact for small indexes), ann (HNSW) or exact (brute force)",
+    )
+    connectivity: Optional[int] = Field(default=None, description="HNSW edges per node (M), default 16", ge=2, le=128)
+    expansion_add: Optional[int] = Field(
+        default=None, description="HNSW ef_construction, default 128", ge=1, le=4096
+    )
+    expansion_search: Optional[int] = Field(
+        default=None, description="Default HNSW ef_search, default 64", ge=1, le=4096
+    )
+    shards: Optional[int] = Field(
+        default=None, description="HNSW graphs the index is split into by key hash", ge=1, le=64
+    )
 
 
 class IndexInfo(BaseModel):
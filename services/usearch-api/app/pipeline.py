@@ -0,0 +1,238 @@
+"""
+Concurrent, rate-limit-aware batch embedding pipeline.
+Splits inputs by item and token budget and sends sub-batches in parallel.
+"""
+
+import re
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# 400 bodies of requests over a provider's token or size limit
+_SIZE_ERROR = re.compile(r"tokens|context length|too (large|long|many)|limit", re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate (about 3 characters per token)."""
+    return len(text) // 3 + 1
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a rate-limit reset duration into seconds.
+
+    Accepts plain seconds ("2", "0.5") and Go-style durations as sent by
+    OpenAI ("1s", "6m0s", "250ms").
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def is_too_large(response: httpx.Response) -> bool:
+    """Whether a rejected request was over the provider's size limits."""
+    if response.status_code == 413:
+        return True
+    return response.status_code == 400 and bool(_SIZE_ERROR.search(response.text))
+
+
+async def gather_or_cancel(*coros: Awaitable) -> list:
+    """Like asyncio.gather, but cancel the other awaitables once one fails."""
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class BatchPipeline:
+    """
+    Send a large embedding job as concurrent, bounded sub-batches.
+
+    Features:
+    - Chunking by both item count and estimated tokens per request
+    - At most ``max_concurrency`` requests in flight
+    - A shared pause gate fed by 429 responses and x-ratelimit-* headers,
+      so every worker backs off together when the quota is exhausted
+    - Retries of only the failed sub-batch, with exponential backoff and
+      jitter when the provider gives no hint
+    - Sub-batches rejected as too large (413, or 400 citing a token or
+      size limit) are split in half and retried; other 400s fail at once
+    - The first failed sub-batch cancels the others
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list[str]], Awaitable[httpx.Response]],
+        parse: Callable[[dict], list[Any]],
+        max_items: int,
+        max_tokens: int,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        base_backoff: float = 0.5,
+        max_backoff: float = 60.0,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            send: Posts one sub-batch and returns the raw response
+            parse: Extracts the ordered embeddings from a response body
+            max_items: Maximum inputs per request
+            max_tokens: Maximum estimated tokens per request
+            max_concurrency: Maximum requests in flight
+            max_retries: Retries per sub-batch before giving up
+            base_backoff: First backoff delay in seconds without a hint
+            max_backoff: Upper bound for any backoff delay
+        """
+        self.send = send
+        self.parse = parse
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._resume_at = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.splits = 0
+
+    def chunk(self, texts: list[str]) -> list[tuple[int, list[str]]]:
+        """Split texts into (offset, sub-batch) pairs within both limits."""
+        chunks = []
+        start = 0
+        tokens = 0
+        for i, text in enumerate(texts):
+            cost = estimate_tokens(text)
+            if i > start and (i - start >= self.max_items or tokens + cost > self.max_tokens):
+                chunks.append((start, texts[start:i]))
+                start = i
+                tokens = 0
+            tokens += cost
+        if start < len(texts):
+            chunks.append((start, texts[start:]))
+        return chunks
+
+    async def run(self, texts: list[str]) -> list[Any]:
+        """Embed all texts, preserving input order."""
+        results: list[Any] = [None] * len(texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def worker(offset: int, batch: list[str]):
+            async with semaphore:
+                embeddings = await self._send_with_retry(batch)
+            results[offset:offset + len(batch)] = embeddings
+
+        await gather_or_cancel(*(worker(offset, batch) for offset, batch in self.chunk(texts)))
+        return results
+
+    async def _send_with_retry(self, batch: list[str]) -> list[Any]:
+        """Send one sub-batch, retrying it alone on rate limits and errors."""
+        attempt = 0
+        while True:
+            await self._wait_for_capacity()
+            self.requests += 1
+
+            try:
+                response = await self.send(batch)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Embedding request failed ({e}), retrying in {delay:.2f}s")
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self._observe(response.headers)
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+                delay = self._retry_delay(response.headers, attempt)
+                logger.warning(
+                    f"Embedding provider returned {response.status_code} for {len(batch)} inputs, "
+                    f"retrying in {delay:.2f}s"
+                )
+                self._pause(delay)
+                attempt += 1
+                self.retries += 1
+                continue
+
+            # Token estimate was too optimistic: split and retry both halves
+            if is_too_large(response) and len(batch) > 1:
+                self.splits += 1
+                middle = len(batch) // 2
+                left, right = await gather_or_cancel(
+                    self._send_with_retry(batch[:middle]),
+                    self._send_with_retry(batch[middle:]),
+                )
+                return left + right
+
+            response.raise_for_status()
+            return self.parse(response.json())
+
+    async def _wait_for_capacity(self):
+        """Sleep while the shared pause gate is closed."""
+        loop = asyncio.get_running_loop()
+        while (delay := self._resume_at - loop.time()) > 0:
+            await asyncio.sleep(delay)
+
+    def _pause(self, delay: float):
+        """Close the pause gate for all workers for ``delay`` seconds."""
+        loop = asyncio.get_running_loop()
+        self._resume_at = max(self._resume_at, loop.time() + delay)
+
+    def _observe(self, headers: httpx.Headers):
+        """Pause proactively when the provider reports an exhausted quota."""
+        for kind in ("requests", "tokens"):
+            if headers.get(f"x-ratelimit-remaining-{kind}") == "0":
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self._pause(min(reset, self.max_backoff))
+
+    def _retry_delay(self, headers: httpx.Headers, attempt: int) -> float:
+        """Delay before retrying, from provider hints or exponential backoff."""
+        retry_after_ms = parse_duration(headers.get("retry-after-ms"))
+        hints = [
+            retry_after_ms / 1000 if retry_after_ms else None,
+            parse_duration(headers.get("retry-after")),
+            parse_duration(headers.get("x-ratelimit-reset-requests")),
+            parse_duration(headers.get("x-ratelimit-reset-tokens")),
+        ]
+        for hint in hints:
+            if hint:
+                return min(hint, self.max_backoff)
+        return self._backoff(attempt)
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    def stats(self) -> dict:
+        """Request, retry and split counters."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "splits": self.splits,
+        }
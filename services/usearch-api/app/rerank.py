@@ -0,0 +1,221 @@
+"""
+Cross-encoder reranking.
+Rescores retrieved candidates against the query on a worker pool off the event loop.
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional
+
+import numpy as np
+
+from app.metrics import RERANK_PAIRS, RERANK_REQUESTS
+from app.models import SearchResult
+
+logger = logging.getLogger(__name__)
+
+
+class Reranker:
+    """
+    Non-blocking wrapper around a sentence-transformers cross-encoder.
+
+    A cross-encoder reads the query and a candidate together, so it orders
+    candidates far better than vector similarity, at the cost of one model
+    pass per pair. Pairs are scored in length-sorted batches in parallel on
+    a thread pool, like the LocalEncoder. Scores are cached per (query,
+    content) pair in an LRU, so repeated queries and unchanged items are
+    free; updating an item's content changes its cache key.
+
+    Each call has a time budget. If scoring does not finish in time (or
+    fails), the candidates keep their retrieval order; batches already
+    running still complete and fill the cache, batches not yet started are
+    dropped.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        workers: Optional[int] = None,
+        batch_size: int = 32,
+        cache_size: int = 100000,
+        candidates: int = 50,
+        budget_ms: int = 300,
+    ):
+        """
+        Initialize the reranker.
+
+        Args:
+            model: Loaded model exposing ``predict(pairs, ...)``
+            workers: Number of inference threads (default: min(4, cores))
+            batch_size: Maximum pairs per inference batch
+            cache_size: Cached (query, content) scores (0 disables the cache)
+            candidates: Default number of candidates retrieved per query
+            budget_ms: Default time budget per query in milliseconds
+        """
+        cores = os.cpu_count() or 1
+        self.model = model
+        self.workers = workers or min(4, cores)
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.candidates = candidates
+        self.budget_ms = budget_ms
+        self._cache: OrderedDict[bytes, float] = OrderedDict()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="rerank"
+        )
+
+        try:
+            import torch
+            torch.set_num_threads(max(1, cores // self.workers))
+        except ImportError:
+            pass
+
+        logger.info(f"Reranker using {self.workers} workers, batch size {batch_size}")
+
+    @classmethod
+    def load(cls, model_name: str, **kwargs) -> "Reranker":
+        """Load a cross-encoder model by name (e.g. cross-encoder/ms-marco-MiniLM-L-6-v2)."""
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError:
+            raise ImportError("sentence-transformers required for reranking")
+        reranker = cls(CrossEncoder(model_name), **kwargs)
+        logger.info(f"Loaded rerank model: {model_name}")
+        return reranker
+
+    @staticmethod
+    def _digest(query: str, content: str) -> bytes:
+        """Cache key of a (query, content) pair."""
+        return hashlib.blake2b(f"{query}\0{content}".encode("utf-8"), digest_size=16).digest()
+
+    def _remember(self, digests: list[bytes], scores: np.ndarray):
+        """Store scores in the LRU cache."""
+        if not self.cache_size:
+            return
+        for digest, score in zip(digests, scores.tolist()):
+            self._cache[digest] = score
+            self._cache.move_to_end(digest)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _batch_done(self, loop: asyncio.AbstractEventLoop, digests: list[bytes], job: Future):
+        """Cache the scores of a finished batch (called from the worker thread)."""
+        if job.cancelled() or job.exception() is not None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._remember, digests, job.result())
+        except RuntimeError:
+            pass  # event loop closed
+
+    def _predict(self, pairs: list[tuple[str, str]]) -> np.ndarray:
+        """Score one batch (runs on a worker thread)."""
+        scores = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        return np.asarray(scores, dtype=np.float32).reshape(len(pairs))
+
+    async def score(self, query: str, contents: list[str], timeout: float) -> Optional[np.ndarray]:
+        """
+        Score candidates against a query within a time budget.
+
+        Args:
+            query: Query text
+            contents: Candidate texts
+            timeout: Seconds to wait for the model
+
+        Returns:
+            One score per candidate, or None if the budget ran out or the
+            model failed
+        """
+        digests = [self._digest(query, content) for content in contents]
+        scores = np.empty(len(contents), dtype=np.float32)
+        missing = []
+        for i, digest in enumerate(digests):
+            cached = self._cache.get(digest)
+            if cached is None:
+                missing.append(i)
+            else:
+                self._cache.move_to_end(digest)
+                scores[i] = cached
+        RERANK_PAIRS.labels("cached").inc(len(contents) - len(missing))
+        RERANK_PAIRS.labels("scored").inc(len(missing))
+        if not missing:
+            return scores
+
+        # Group pairs of similar length to minimize padding
+        missing.sort(key=lambda i: len(contents[i]))
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for batch in batches:
+            job = self._executor.submit(self._predict, [(query, contents[i]) for i in batch])
+            # Late batches still fill the cache for the next identical query
+            job.add_done_callback(partial(self._batch_done, loop, [digests[i] for i in batch]))
+            futures.append(asyncio.wrap_future(job))
+
+        _, pending = await asyncio.wait(futures, timeout=timeout)
+        if pending:
+            for future in pending:
+                future.cancel()  # batches already running finish in the background
+            RERANK_REQUESTS.labels("timeout").inc()
+            return None
+
+        for batch, future in zip(batches, futures):
+            if future.exception() is not None:
+                logger.warning(f"Reranking failed: {future.exception()}")
+                RERANK_REQUESTS.labels("error").inc()
+                return None
+            scores[batch] = future.result()
+        return scores
+
+    async def rerank(
+        self,
+        query: str,
+        results: list[SearchResult],
+        contents: list[Optional[str]],
+        top_k: int,
+        timeout: float,
+    ) -> tuple[list[SearchResult], bool]:
+        """
+        Reorder retrieved results by cross-encoder score.
+
+        Results keep their 0-1 retrieval ``score`` (which ``min_score``
+        applies to); the cross-encoder output is set as ``rerank_score``.
+        Results without stored content keep their retrieval order after the
+        reranked ones.
+
+        Args:
+            query: Query text
+            results: Retrieved candidates, best first
+            contents: Stored content per candidate
+            top_k: Number of results to return
+            timeout: Seconds to wait for the model
+
+        Returns:
+            Tuple of (top_k results, whether they were reranked)
+        """
+        scored = [i for i, content in enumerate(contents) if content]
+        if not scored:
+            RERANK_REQUESTS.labels("no_content").inc()
+            return results[:top_k], False
+
+        scores = await self.score(query, [contents[i] for i in scored], timeout)
+        if scores is None:
+            return results[:top_k], False
+
+        order = np.argsort(-scores, kind="stable")
+        reranked = [
+            results[scored[i]].model_copy(update={"rerank_score": round(float(scores[i]), 4)})
+            for i in order.tolist()
+        ]
+        unscored = [result for result, content in zip(results, contents) if not content]
+        RERANK_REQUESTS.labels("reranked").inc()
+        return (reranked + unscored)[:top_k], True
+
+    def close(self):
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
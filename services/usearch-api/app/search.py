@@ -5,16 +5,29 @@ Provides HNSW-based approximate nearest neighbor search.
 
 import os
 import json
+import shutil
 import asyncio
+import threading
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional, Union
 from datetime import datetime
 
 import numpy as np
 from usearch.index import Index, MetricKind
 
+from app.filters import MetadataIndex
+from app.keys import KeyRegistry
+from app.lexical import LexicalIndex
+from app.locks import ReadWriteLock
+from app.metastore import MetadataStore
+from app.metrics import EXECUTOR_WAIT, SEARCH_PHASES
+from app.shards import ShardedIndex
+from app.vectors import VectorStore
+from app.wal import WriteAheadLog
 from app.models import SearchResult, IndexStats, StatsResponse
 
 logger = logging.getLogger(__name__)
@@ -29,6 +42,10 @@ class SearchEngine:
     - Persistent storage
     - Metadata filtering
     - Automatic index management
+    - uSearch calls run on a thread pool; searches of an index proceed in
+      parallel while writes to it are exclusive (per-index reader/writer lock)
+    - Optional sharding: an index can span several uSearch graphs that are
+      written, searched, persisted and compacted independently
     """
 
     METRIC_MAP = {
@@ -37,19 +54,134 @@ class SearchEngine:
         "ip": MetricKind.IP,
     }
 
-    def __init__(self, index_path: str = "/data/indexes", dimensions: int = 1536):
+    # Storage scalar types and their size in bits
+    DTYPE_BITS = {
+        "f32": 32,
+        "f16": 16,
+        "i8": 8,
+        "b1": 1,
+    }
+
+    # Quantized indexes fetch this many times top_k candidates for rescoring
+    RESCORE_OVERSAMPLING = 4
+
+    # memory: private in-RAM copy; view: read-only mmap shared via page cache
+    SERVING_MODES = ("memory", "view")
+
+    # Filtered searches whose candidate set is at most this large are scored
+    # exactly over the candidates instead of traversing the HNSW graph
+    EXACT_FILTER_THRESHOLD = 4096
+
+    # Indexes with fewer removed entries than this are never compacted
+    COMPACTION_MIN_DEAD = 100
+
+    # HNSW parameters of indexes whose registry entry predates them
+    HNSW_DEFAULTS = {
+        "connectivity": 16,  # M: graph edges per node
+        "expansion_add": 128,  # ef_construction
+        "expansion_search": 64,  # ef_search, overridable per query
+    }
+    # Accepted (min, max) of each HNSW parameter, as in CreateIndexRequest
+    HNSW_LIMITS = {
+        "connectivity": (2, 128),
+        "expansion_add": (1, 4096),
+        "expansion_search": (1, 4096),
+    }
+    MAX_SHARDS = 64  # each shard brings its own graph and thread pool work
+
+    # auto: exact below exact_threshold vectors, HNSW above;
+    # ann: always HNSW; exact: brute-force scan of all vectors
+    SEARCH_MODES = ("auto", "ann", "exact")
+
+    # Hybrid search: rrf fuses ranks, weighted fuses normalized scores
+    FUSION_METHODS = ("rrf", "weighted")
+    RRF_K = 60
+    # Each retriever contributes this many times top_k candidates to fusion
+    HYBRID_OVERSAMPLING = 4
+
+    def __init__(
+        self,
+        index_path: str = "/data/indexes",
+        dimensions: int = 1536,
+        serving_mode: str = "memory",
+        dtype: str = "f32",
+        compaction_threshold: float = 0.2,
+        wal: bool = True,
+        wal_sync: bool = True,
+        wal_max_bytes: int = 64 * 1024 * 1024,
+        snapshot_mutations: int = 10000,
+        search_threads: Optional[int] = None,
+        exact_threshold: int = 10000,
+        shards: int = 1,
+    ):
         """
         Initialize the search engine.
 
         Args:
             index_path: Directory path for persistent index storage
             dimensions: Default vector dimensions for new indexes
+            serving_mode: Default serving mode for indexes (memory, view)
+            dtype: Default storage type for new indexes (f32, f16, i8, b1)
+            compaction_threshold: Dead-entry ratio that starts a background
+                compaction (0 disables automatic compaction)
+            wal: Log mutations to a write-ahead log replayed on load
+            wal_sync: fsync the log before acknowledging a write
+            wal_max_bytes: Log size that triggers a snapshot of the index
+            snapshot_mutations: Number of changed items that triggers a
+                snapshot of the index (0 disables)
+            search_threads: Threads running uSearch calls (default: one per core)
+            exact_threshold: Indexes in auto search mode with at most this
+                many vectors are searched exactly instead of through HNSW
+            shards: Default number of shards for new indexes
         """
+        if serving_mode not in self.SERVING_MODES:
+            raise ValueError(f"Unknown serving mode: {serving_mode}")
+        if dtype not in self.DTYPE_BITS:
+            raise ValueError(f"Unknown dtype: {dtype}")
+        if not 1 <= shards <= self.MAX_SHARDS:
+            raise ValueError(f"Invalid shards: {shards}")
+
         self.index_path = Path(index_path)
         self.default_dimensions = dimensions
-        self.indexes: dict[str, Index] = {}
-        self.metadata: dict[str, dict[str, dict]] = {}  # index -> id -> metadata
+        self.default_serving_mode = serving_mode
+        self.default_dtype = dtype
+        self.default_shards = shards
+        self.indexes: dict[str, ShardedIndex] = {}
+        self.views: set[str] = set()  # indexes currently served from a read-only mmap
+        self.metadata: dict[str, MetadataStore] = {}  # index -> key -> metadata
+        self.keys: dict[str, KeyRegistry] = {}  # index -> id <-> key registry
+        self.filters: dict[str, MetadataIndex] = {}  # index -> metadata inverted index
+        self.vectors: dict[str, VectorStore] = {}  # index -> float32 rows for rescoring
+        self.lexical: dict[str, LexicalIndex] = {}  # index -> BM25 index over item content
+        self.contents: dict[str, MetadataStore] = {}  # index -> key -> {"content": text}
         self.index_info: dict[str, dict] = {}  # index -> info (dimensions, metric, etc.)
+        self.exact_threshold = exact_threshold
+        # index -> (sorted keys, float32 rows, squared norms) for exact search
+        self._exact: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self.compaction_threshold = compaction_threshold
+        self._compactions: dict[str, asyncio.Task] = {}  # index -> running compaction
+        self._touched: dict[str, set[int]] = {}  # index -> keys written during compaction
+        self.wal_enabled = wal
+        self.wal_sync = wal_sync
+        self.wal_max_bytes = wal_max_bytes
+        self.wals: dict[str, WriteAheadLog] = {}  # index -> mutations since last snapshot
+        self.snapshot_mutations = snapshot_mutations
+        self._snapshots: dict[str, asyncio.Task] = {}  # index -> background snapshot
+        self._snapshot_locks: dict[str, asyncio.Lock] = {}
+        self._mutations: dict[str, int] = {}  # index -> items changed since startup
+        self._snapshot_mutations: dict[str, int] = {}  # index -> mutations at last snapshot
+        self._locks: dict[str, ReadWriteLock] = {}  # index -> reader/writer lock
+        # registry.json is shared by all indexes; held from building it to its rename
+        self._registry_lock = threading.Lock()
+        self.search_threads = search_threads or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.search_threads, thread_name_prefix="usearch"
+        )
+        # Per-shard work fanned out from the calls above; a separate pool, so
+        # a busy engine pool cannot starve the shards it is waiting for
+        self._shard_executor = ThreadPoolExecutor(
+            max_workers=self.search_threads, thread_name_prefix="usearch-shard"
+        )
         self.start_time = time.time()
 
         # Ensure index directory exists
@@ -58,6 +190,8 @@ class SearchEngine:
     async def load_indexes(self):
         """Load all existing indexes from disk."""
         try:
+            self._recover_snapshots()
+
             # Load index registry
             registry_path = self.index_path / "registry.json"
             if registry_path.exists():
@@ -76,27 +210,49 @@ class SearchEngine:
     async def _load_index(self, name: str, info: dict):
         """Load a single index from disk."""
         try:
-            index_file = self.index_path / f"{name}.usearch"
-            metadata_file = self.index_path / f"{name}_metadata.json"
-
-            if index_file.exists():
-                # Create index with stored parameters
-                metric = self.METRIC_MAP.get(info.get("metric", "cos"), MetricKind.Cos)
-                index = Index(
-                    ndim=info.get("dimensions", self.default_dimensions),
-                    metric=metric,
-                )
-                index.load(str(index_file))
+            index_files = self._index_files(name, info)
+            metadata_dir = self.index_path / f"{name}.meta"
+            legacy_metadata_file = self.index_path / f"{name}_metadata.json"
+            keys_file = self.index_path / f"{name}_keys.json"
+
+            if index_files[0].exists():
+                legacy = not metadata_dir.exists() and legacy_metadata_file.exists()
+
+                if self._serving_mode(name) == "view" and not legacy:
+                    # Memory-map the files; pages are shared across workers
+                    index = self._open_index(name, info, view=True)
+                    self.views.add(name)
+                else:
+                    # Create shards with stored parameters
+                    index = self._open_index(name, info, view=False)
                 self.indexes[name] = index
+                self.lexical[name] = LexicalIndex.load(self.index_path / f"{name}.lexical")
 
-                # Load metadata
-                if metadata_file.exists():
-                    with open(metadata_file, "r") as f:
-                        self.metadata[name] = json.load(f)
+                # Load key registry and metadata, converting older JSON metadata
+                self.contents[name] = MetadataStore.open(self.index_path / f"{name}.content")
+                if not legacy:
+                    self.keys[name] = KeyRegistry.load(keys_file)
+                    self.metadata[name] = MetadataStore.open(metadata_dir)
                 else:
-                    self.metadata[name] = {}
+                    self.keys[name], self.metadata[name] = self._migrate_legacy_metadata(
+                        name, index, legacy_metadata_file, keys_file
+                    )
+                    await self._save_index(name)
+
+                # Open full-precision vectors of quantized indexes
+                if info.get("rescore"):
+                    self.vectors[name] = VectorStore(
+                        self.index_path / f"{name}.vectors",
+                        info.get("dimensions", self.default_dimensions),
+                    )
+
+                # Build the metadata inverted index from the typed columns
+                self.filters[name] = self._build_filter_index(self.metadata[name])
 
-                logger.info(f"Loaded index '{name}' with {len(index)} vectors")
+                # Re-apply operations logged after the last snapshot
+                await self._replay_wal(name)
+
+                logger.info(f"Loaded index '{name}' with {len(self.indexes[name])} vectors")
 
         except Exception as e:
             logger.error(f"Error loading index '{name}': {e}")
@@ -108,45 +264,346 @@ class SearchEngine:
             for name, index in self.indexes.items():
                 await self._save_index(name)
 
-            # Save registry
-            registry_path = self.index_path / "registry.json"
-            with open(registry_path, "w") as f:
-                json.dump(self.index_info, f, indent=2, default=str)
-
             logger.info(f"Saved {len(self.indexes)} indexes")
 
         except Exception as e:
             logger.error(f"Error saving indexes: {e}")
 
-    async def _save_index(self, name: str):
-        """Save a single index to disk."""
+    def _save_registry(self):
+        """Write registry.json atomically from the live entries (worker thread)."""
+        registry_path = self.index_path / "registry.json"
+        tmp_path = registry_path.with_name(registry_path.name + ".tmp")
+        with self._registry_lock:
+            self._write_registry(tmp_path, self._registry_entries())
+            os.replace(tmp_path, registry_path)
+
+    def _registry_entries(self) -> dict[str, dict]:
+        """Copy of the live registry entries, safe to serialize off the event loop."""
+        return {name: dict(entry) for name, entry in list(self.index_info.items())}
+
+    @staticmethod
+    def _write_registry(path: Path, entries: dict[str, dict]):
+        """Write registry entries to a file and fsync it."""
+        with open(path, "w") as f:
+            json.dump(entries, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def snapshot_index(self, name: str) -> bool:
+        """
+        Snapshot an index to disk now.
+
+        Returns:
+            Whether the snapshot was committed
+        """
         if name not in self.indexes:
-            return
+            raise ValueError(f"Index '{name}' not found")
+        return await self._save_index(name)
 
-        try:
-            index_file = self.index_path / f"{name}.usearch"
-            metadata_file = self.index_path / f"{name}_metadata.json"
+    async def _save_index(self, name: str) -> bool:
+        """
+        Snapshot a single index to disk without blocking the event loop.
+
+        The index, key registry, metadata and registry entry are captured at
+        one point in time under the read lock (the write-ahead log is rotated
+        at the same point). Changed shards are serialized to temporary files
+        while the lock is held, rather than copied in memory; everything else
+        is written on a worker thread while reads and writes continue. Index,
+        keys and lexical files are written next to the live ones and
+        committed together by atomic renames (see _commit_snapshot).
+        Metadata and content stores only append and rewrite the captured
+        rows, in place when rows past the snapshot are restored from the
+        log, else staged and renamed with the other files.
 
-            # Save index
-            self.indexes[name].save(str(index_file))
+        Returns:
+            Whether the snapshot was committed; logged operations are only
+            released when it was
+        """
+        if name not in self.indexes:
+            return False
 
-            # Save metadata
-            if name in self.metadata:
-                with open(metadata_file, "w") as f:
-                    json.dump(self.metadata[name], f, indent=2)
+        async with self._snapshot_lock(name):
+            lock = self._lock(name)
 
-            # Update timestamp
-            if name in self.index_info:
+            # Freeze a consistent point in time while writers are held off.
+            # Views are unchanged since they were mapped and need no copy.
+            async with lock.read():
+                if name not in self.indexes:
+                    return False
                 self.index_info[name]["updated_at"] = datetime.utcnow().isoformat()
+                wal = self.wals.get(name)
+                segment = wal.rotate() if wal is not None else None
+                mutations = self._mutations.get(name, 0)
+                info = json.loads(json.dumps(self.index_info[name], default=str))
+                # Only shards changed since the last snapshot are rewritten
+                # (mapped shards are never dirty). They go straight to disk:
+                # a copy would double the index's memory while it is taken
+                index = self.indexes[name]
+                shard_files = [
+                    index_file.with_name(index_file.name + ".tmp")
+                    for index_file in self._index_files(name, info)
+                ]
+                try:
+                    shards = await self._run(index.save_dirty, shard_files)
+                except Exception as e:
+                    logger.error(f"Error saving index '{name}': {e}")
+                    return False
+                registry = self.keys[name].copy()
+                store = self.metadata[name]
+                frozen = store.freeze()
+                lexical = self.lexical[name]
+                frozen_lexical = lexical.freeze()
+                contents = self.contents[name]
+                frozen_contents = contents.freeze()
+                filter_index = self.filters[name]
+                frozen_filters = filter_index.freeze()
+
+            try:
+                # Fold stale keys out of the filter postings, like the lexical ones
+                merged_filters = await asyncio.to_thread(MetadataIndex.merge, frozen_filters)
+                postings = await asyncio.to_thread(
+                    self._write_snapshot,
+                    name,
+                    shards,
+                    registry,
+                    store,
+                    frozen,
+                    frozen_lexical,
+                    contents,
+                    frozen_contents,
+                    info,
+                )
+            except Exception as e:
+                logger.error(f"Error saving index '{name}': {e}")
+                if name in self.indexes:
+                    self.indexes[name].mark_dirty(shards)
+                return False
 
-        except Exception as e:
-            logger.error(f"Error saving index '{name}': {e}")
+            async with lock.write():
+                # Serve the committed files from now on
+                self.metadata[name] = store.reopen(frozen)
+                lexical.rebase(frozen_lexical, postings)
+                filter_index.rebase(merged_filters)
+                self.contents[name] = contents.reopen(frozen_contents)
+                legacy_metadata_file = self.index_path / f"{name}_metadata.json"
+                if legacy_metadata_file.exists():
+                    legacy_metadata_file.unlink()
+
+                # Return to a shared read-only mapping if nothing changed meanwhile
+                if (
+                    self._serving_mode(name) == "view"
+                    and (name not in self.views or shards)
+                    and self._mutations.get(name, 0) == mutations
+                ):
+                    self.indexes[name] = self._open_index(name, self.index_info[name], view=True)
+                    self.views.add(name)
+
+            # Logged operations up to the freeze are now part of the snapshot
+            if wal is not None:
+                await wal.release(segment)
+            self._snapshot_mutations[name] = mutations
+            return True
+
+    def _snapshot_lock(self, name: str) -> asyncio.Lock:
+        """Lock serializing snapshots (and deletion) of an index."""
+        return self._snapshot_locks.setdefault(name, asyncio.Lock())
+
+    def _lock(self, name: str) -> ReadWriteLock:
+        """
+        Reader/writer lock of an index.
+
+        Searches hold it shared for as long as a worker thread uses the
+        index; writes, swaps and deletion hold it exclusively. Taken after
+        the snapshot lock when both are needed.
+        """
+        return self._locks.setdefault(name, ReadWriteLock())
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run blocking uSearch work on the engine's thread pool.
+
+        uSearch releases the GIL, so calls from concurrent requests use
+        separate cores. If the caller is cancelled, this still waits for the
+        worker to finish so the caller's lock covers the whole call.
+        """
+        submitted = time.perf_counter()
+
+        def call():
+            EXECUTOR_WAIT.observe(time.perf_counter() - submitted)
+            return func(*args, **kwargs)
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await asyncio.wait([future])
+            raise
+
+    def close(self):
+        """Shut down the uSearch thread pools."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._shard_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _write_snapshot(
+        self,
+        name: str,
+        shards: list[int],
+        registry: KeyRegistry,
+        store: MetadataStore,
+        frozen: dict[int, Optional[dict]],
+        frozen_lexical: dict,
+        contents: MetadataStore,
+        frozen_contents: dict[int, Optional[dict]],
+        info: dict,
+    ) -> dict:
+        """
+        Write snapshot files next to the live ones and commit them (worker thread).
+
+        The changed ``shards`` were already saved to their ``.tmp`` files.
+
+        Returns:
+            The merged lexical postings, for LexicalIndex.rebase
+        """
+        renames = []
+
+        index_files = self._index_files(name, info)
+        for shard in shards:
+            index_file = index_files[shard]
+            tmp_file = index_file.with_name(index_file.name + ".tmp")
+            _fsync_file(tmp_file)
+            renames.append((tmp_file, index_file))
+
+        keys_file = self.index_path / f"{name}_keys.json"
+        tmp_keys = keys_file.with_name(keys_file.name + ".snapshot")
+        registry.save(tmp_keys)
+        renames.append((tmp_keys, keys_file))
+
+        # Metadata and content stores append and rewrite the frozen rows in
+        # place when rows newer than the snapshot come back from the log
+        # replay; without a log, rewrites are staged and committed below
+        in_place = name in self.wals
+        renames += store.write_snapshot(frozen, in_place)
+        renames += contents.write_snapshot(frozen_contents, in_place)
+
+        lexical_file = self.index_path / f"{name}.lexical"
+        tmp_lexical = lexical_file.with_name(lexical_file.name + ".tmp")
+        postings = LexicalIndex.write_snapshot(tmp_lexical, frozen_lexical)
+        _fsync_file(tmp_lexical)
+        renames.append((tmp_lexical, lexical_file))
+
+        # Float32 rows are addressed by key and updated in place; rows newer
+        # than the snapshot are rewritten by the log replay after a crash
+        if name in self.vectors:
+            self.vectors[name].flush()
+
+        # Other indexes' entries come from the live registry at commit time,
+        # so indexes created or deleted meanwhile are neither dropped nor
+        # brought back; the lock keeps another commit from slipping in
+        registry_file = self.index_path / "registry.json"
+        tmp_registry = self.index_path / f"registry.json.{name}.tmp"
+        with self._registry_lock:
+            self._write_registry(tmp_registry, {**self._registry_entries(), name: info})
+            renames.append((tmp_registry, registry_file))
+            self._commit_snapshot(name, renames)
+        return postings
+
+    def _commit_snapshot(self, name: str, renames: list[tuple[Path, Path]]):
+        """
+        Atomically publish a snapshot's files.
+
+        A marker listing the renames is written first (itself by atomic
+        rename); that is the commit point. If the process dies while the
+        renames are applied, load_indexes finds the marker and rolls the
+        snapshot forward.
+        """
+        marker = self.index_path / f"{name}.commit"
+        tmp_marker = marker.with_name(marker.name + ".tmp")
+        with open(tmp_marker, "w") as f:
+            json.dump(
+                [[str(src.relative_to(self.index_path)), str(dst.relative_to(self.index_path))]
+                 for src, dst in renames],
+                f,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_marker, marker)
+        for directory in {self.index_path, *(src.parent for src, _ in renames)}:
+            _fsync_file(directory)
+
+        self._apply_renames(renames)
+        marker.unlink()
+
+    @staticmethod
+    def _apply_renames(renames: list[tuple[Path, Path]]):
+        """Move snapshot files into place; directories replace their live copy."""
+        for src, dst in renames:
+            if not src.exists():
+                continue  # already applied before a crash
+            if src.is_dir():
+                old = dst.with_name(dst.name + ".old")
+                if old.exists():
+                    shutil.rmtree(old)
+                if dst.exists():
+                    os.replace(dst, old)
+                os.replace(src, dst)
+                if old.exists():
+                    shutil.rmtree(old)
+            else:
+                os.replace(src, dst)
+        for directory in {dst.parent for _, dst in renames}:
+            _fsync_file(directory)
+
+    def _recover_snapshots(self):
+        """Roll forward committed snapshots and drop unfinished ones."""
+        for marker in self.index_path.glob("*.commit"):
+            with open(marker, "r") as f:
+                renames = [(self.index_path / src, self.index_path / dst) for src, dst in json.load(f)]
+            logger.warning(f"Completing interrupted snapshot '{marker.name}'")
+            self._apply_renames(renames)
+            marker.unlink()
+
+        # Leftovers of snapshots that never reached their commit point
+        for pattern in (
+            "*.usearch.tmp",
+            "*_keys.json.snapshot",
+            "*.meta/*.snapshot",
+            "*.content/*.snapshot",
+            "*.lexical.tmp",
+            "registry.json.*.tmp",
+            "*.commit.tmp",
+        ):
+            for path in self.index_path.glob(pattern):
+                path.unlink()
+        for pattern in ("*.meta.tmp", "*.meta.old", "*.content.tmp", "*.content.old"):
+            for path in self.index_path.glob(pattern):
+                shutil.rmtree(path)
+
+    async def run_snapshots(self, interval: float):
+        """
+        Snapshot changed indexes every ``interval`` seconds, until cancelled.
+
+        Args:
+            interval: Seconds between snapshot rounds
+        """
+        while True:
+            await asyncio.sleep(interval)
+            for name in list(self.indexes):
+                if self._mutations.get(name, 0) != self._snapshot_mutations.get(name, 0):
+                    await self._save_index(name)
 
     async def create_index(
         self,
         name: str,
         dimensions: int = None,
-        metric: str = "cos"
+        metric: str = "cos",
+        serving_mode: Optional[str] = None,
+        dtype: Optional[str] = None,
+        rescore: Optional[bool] = None,
+        search_mode: Optional[str] = None,
+        connectivity: Optional[int] = None,
+        expansion_add: Optional[int] = None,
+        expansion_search: Optional[int] = None,
+        shards: Optional[int] = None,
     ):
         """
         Create a new vector index.
@@ -155,33 +612,75 @@ class SearchEngine:
             name: Unique index name
             dimensions: Vector dimensions
             metric: Distance metric (cos, l2, ip)
+            serving_mode: memory or view; defaults to the engine setting
+            dtype: Storage type (f32, f16, i8, b1); defaults to the engine setting
+            rescore: Keep float32 copies and rerank quantized candidates exactly;
+                defaults to True for i8 and b1
+            search_mode: auto, ann or exact; defaults to auto
+            connectivity: HNSW graph edges per node (M); defaults to 16
+            expansion_add: Candidates explored per insert (ef_construction);
+                defaults to 128
+            expansion_search: Candidates explored per query (ef_search) unless
+                the query sets its own; defaults to 64
+            shards: Number of uSearch graphs the index is split into; fixed
+                for the life of the index, defaults to the engine setting
         """
         if name in self.indexes:
             raise ValueError(f"Index '{name}' already exists")
+        if serving_mode is not None and serving_mode not in self.SERVING_MODES:
+            raise ValueError(f"Unknown serving mode: {serving_mode}")
+        if search_mode is not None and search_mode not in self.SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {search_mode}")
+        hnsw = {
+            "connectivity": connectivity,
+            "expansion_add": expansion_add,
+            "expansion_search": expansion_search,
+        }
+        for param, value in hnsw.items():
+            if value is None:
+                hnsw[param] = self.HNSW_DEFAULTS[param]
+            elif not self.HNSW_LIMITS[param][0] <= value <= self.HNSW_LIMITS[param][1]:
+                raise ValueError(f"Invalid {param}: {value}")
+
+        dtype = dtype or self.default_dtype
+        if dtype not in self.DTYPE_BITS:
+            raise ValueError(f"Unknown dtype: {dtype}")
+        if rescore is None:
+            rescore = dtype in ("i8", "b1")
+        if dtype == "b1" and not rescore:
+            raise ValueError("Binary (b1) indexes require rescoring")
+        shards = shards or self.default_shards
+        if not 1 <= shards <= self.MAX_SHARDS:
+            raise ValueError(f"Invalid shards: {shards}")
 
         dims = dimensions or self.default_dimensions
-        metric_kind = self.METRIC_MAP.get(metric, MetricKind.Cos)
-
-        # Create uSearch index
-        index = Index(
-            ndim=dims,
-            metric=metric_kind,
-            connectivity=16,  # HNSW M parameter
-            expansion_add=128,  # ef_construction
-            expansion_search=64,  # ef_search
-        )
-
-        self.indexes[name] = index
-        self.metadata[name] = {}
-        self.index_info[name] = {
+        info = {
             "dimensions": dims,
             "metric": metric,
+            "dtype": dtype,
+            "rescore": rescore,
+            "serving_mode": serving_mode or self.default_serving_mode,
+            "search_mode": search_mode or "auto",
+            **hnsw,
+            "shards": shards,
             "created_at": datetime.utcnow().isoformat(),
             "updated_at": datetime.utcnow().isoformat(),
         }
 
-        # Save immediately
+        self.indexes[name] = self._new_index(info)
+        self.metadata[name] = MetadataStore(self.index_path / f"{name}.meta")
+        self.keys[name] = KeyRegistry()
+        self.filters[name] = MetadataIndex()
+        self.lexical[name] = LexicalIndex()
+        self.contents[name] = MetadataStore(self.index_path / f"{name}.content")
+        self.index_info[name] = info
+        if rescore:
+            self.vectors[name] = VectorStore(self.index_path / f"{name}.vectors", dims)
+
+        # Save immediately, including the registry so the write-ahead log
+        # of this index is found again after a crash
         await self._save_index(name)
+        self._open_wal(name)
 
         logger.info(f"Created index '{name}' with {dims} dimensions")
 
@@ -190,21 +689,53 @@ class SearchEngine:
         if name not in self.indexes:
             raise ValueError(f"Index '{name}' not found")
 
+        # Let a running snapshot finish so it cannot recreate deleted files,
+        # and in-flight searches and writes so none sees a half-deleted index
+        async with self._snapshot_lock(name):
+            async with self._lock(name).write():
+                await self._delete_index(name)
+
+    async def _delete_index(self, name: str):
+        """Delete an index once no snapshot, search or write of it is running."""
+        if name not in self.indexes:
+            return
+
+        # Stop a running compaction of this index
+        task = self._compactions.pop(name, None)
+        if task is not None:
+            task.cancel()
+
+        index_files = self._index_files(name, self.index_info.get(name, {}))
+
         # Remove from memory
         del self.indexes[name]
+        self.views.discard(name)
         if name in self.metadata:
-            del self.metadata[name]
+            self.metadata.pop(name).destroy()
         if name in self.index_info:
             del self.index_info[name]
+        self.keys.pop(name, None)
+        self.filters.pop(name, None)
+        self.lexical.pop(name, None)
+        if name in self.contents:
+            self.contents.pop(name).destroy()
+        self._exact.pop(name, None)
+        if name in self.vectors:
+            self.vectors.pop(name).destroy()
+        if name in self.wals:
+            self.wals.pop(name).destroy()
+        self._mutations.pop(name, None)
+        self._snapshot_mutations.pop(name, None)
+        await asyncio.to_thread(self._save_registry)
 
         # Remove files
-        index_file = self.index_path / f"{name}.usearch"
-        metadata_file = self.index_path / f"{name}_metadata.json"
-
-        if index_file.exists():
-            index_file.unlink()
-        if metadata_file.exists():
-            metadata_file.unlink()
+        for suffix in ("_metadata.json", "_keys.json", ".lexical"):
+            path = self.index_path / f"{name}{suffix}"
+            if path.exists():
+                path.unlink()
+        for path in index_files:
+            if path.exists():
+                path.unlink()
 
         logger.info(f"Deleted index '{name}'")
 
@@ -213,7 +744,8 @@ class SearchEngine:
         index_name: str,
         item_id: str,
         vector: list[float],
-        metadata: Optional[dict] = None
+        metadata: Optional[dict] = None,
+        content: Optional[str] = None,
     ):
         """
         Add or update an item in the index.
@@ -223,30 +755,143 @@ class SearchEngine:
             item_id: Unique item identifier
             vector: Embedding vector
             metadata: Optional metadata dict
+            content: Optional text for the lexical (BM25) index
         """
-        # Auto-create index if needed
-        if index_name not in self.indexes:
-            await self.create_index(index_name, dimensions=len(vector))
+        await self.index_items(
+            index_name=index_name,
+            item_ids=[item_id],
+            vectors=np.asarray(vector, dtype=np.float32).reshape(1, -1),
+            metadatas=[metadata],
+            contents=[content],
+        )
 
-        index = self.indexes[index_name]
+    async def index_items(
+        self,
+        index_name: str,
+        item_ids: list[str],
+        vectors: np.ndarray,
+        metadatas: Optional[list[Optional[dict]]] = None,
+        contents: Optional[list[Optional[str]]] = None,
+    ) -> int:
+        """
+        Add or update many items with a single uSearch insert.
 
-        # Convert to numpy array
-        vec = np.array(vector, dtype=np.float32)
+        Args:
+            index_name: Target index name
+            item_ids: Unique item identifiers, one per row of ``vectors``
+            vectors: Matrix of shape (len(item_ids), dimensions)
+            metadatas: Optional metadata dicts aligned with ``item_ids``
+            contents: Optional texts aligned with ``item_ids`` for the lexical
+                index; like metadata, an update replaces the previous text
 
-        # Generate numeric key from string ID
-        key = self._id_to_key(index_name, item_id)
+        Returns:
+            Number of items indexed
+        """
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(item_ids):
+            raise ValueError(
+                f"Expected {len(item_ids)} vectors, got array of shape {matrix.shape}"
+            )
+        if metadatas is not None and len(metadatas) != len(item_ids):
+            raise ValueError("metadatas must be aligned with item_ids")
+        if contents is not None and len(contents) != len(item_ids):
+            raise ValueError("contents must be aligned with item_ids")
+        if not item_ids:
+            return 0
 
-        # Add to index
-        index.add(key, vec)
+        # Auto-create index if needed
+        if index_name not in self.indexes:
+            await self.create_index(index_name, dimensions=matrix.shape[1])
+
+        dimensions = self.indexes[index_name].ndim
+        if matrix.shape[1] != dimensions:
+            raise ValueError(
+                f"Vector dimensions {matrix.shape[1]} do not match index '{index_name}' ({dimensions})"
+            )
+
+        # Keep the last occurrence of IDs repeated within the batch
+        rows = {item_id: row for row, item_id in enumerate(item_ids)}
+        if len(rows) != len(item_ids):
+            item_ids = list(rows)
+            matrix = matrix[list(rows.values())]
+            if metadatas is not None:
+                metadatas = [metadatas[row] for row in rows.values()]
+            if contents is not None:
+                contents = [contents[row] for row in rows.values()]
+
+        async with self._lock(index_name).write():
+            if index_name not in self.indexes:
+                raise ValueError(f"Index '{index_name}' not found")
+            updated = await self._run(
+                self._apply_items, index_name, item_ids, matrix, metadatas, contents
+            )
+            if updated:
+                self._maybe_compact(index_name)
+            self._log(index_name, "add", item_ids, matrix, metadatas, contents)
+
+        await self._commit_log(index_name)
+        return len(item_ids)
+
+    def _apply_items(
+        self,
+        index_name: str,
+        item_ids: list[str],
+        matrix: np.ndarray,
+        metadatas: Optional[list[Optional[dict]]],
+        contents: Optional[list[Optional[str]]] = None,
+    ) -> bool:
+        """
+        Insert deduplicated items (worker thread, under the write lock).
 
-        # Store metadata
-        if index_name not in self.metadata:
-            self.metadata[index_name] = {}
+        Returns:
+            Whether any item replaced an existing one
+        """
+        index = self._writable_index(index_name)
+        self._exact.pop(index_name, None)
+
+        # Look up or allocate the numeric keys for these IDs
+        registry = self.keys[index_name]
+        first_new_key = registry.next_key
+        keys = np.fromiter(
+            (registry.get_or_create(item_id) for item_id in item_ids),
+            dtype=np.uint64,
+            count=len(item_ids),
+        )
 
-        self.metadata[index_name][item_id] = {
-            "key": key,
-            **(metadata or {}),
-        }
+        # Updates: drop the previous vectors so the keys can be re-added
+        existing = np.asarray(index.contains(keys), dtype=bool)
+        if existing.any():
+            index.remove(keys[existing])
+        if index_name in self._touched:
+            self._touched[index_name].update(keys.tolist())
+
+        # Single multi-threaded insert
+        index.add(keys, self._quantize(index_name, matrix), threads=0)
+        if index_name in self.vectors:
+            self.vectors[index_name].put(keys, matrix)
+
+        # Store metadata and keep the inverted index in sync
+        store = self.metadata[index_name]
+        filter_index = self.filters[index_name]
+        for row, key in enumerate(keys.tolist()):
+            if key < first_new_key:
+                filter_index.remove(key, store.get(key))
+            metadata = dict(metadatas[row] or {}) if metadatas is not None else {}
+            store.put(key, metadata)
+            filter_index.add(key, metadata)
+
+        # Content replaces the item's previous text, like metadata
+        lexical = self.lexical[index_name]
+        texts = self.contents[index_name]
+        for row, key in enumerate(keys.tolist()):
+            content = contents[row] if contents is not None else None
+            lexical.add(key, content)
+            if content:
+                texts.put(key, {"content": content})
+            else:
+                texts.delete(key)
+
+        return bool(existing.any())
 
     async def search(
         self,
@@ -255,6 +900,8 @@ class SearchEngine:
         top_k: int = 10,
         filters: Optional[dict] = None,
         min_score: float = 0.0,
+        mode: Optional[str] = None,
+        ef: Optional[int] = None,
     ) -> list[SearchResult]:
         """
         Search for similar vectors.
@@ -265,6 +912,9 @@ class SearchEngine:
             top_k: Number of results
             filters: Metadata filters
             min_score: Minimum similarity score
+            mode: auto, ann or exact; defaults to the index's search mode
+            ef: HNSW candidates to explore (higher: better recall, slower);
+                defaults to the index's expansion_search
 
         Returns:
             List of SearchResult objects
@@ -272,55 +922,712 @@ class SearchEngine:
         if index_name not in self.indexes:
             raise ValueError(f"Index '{index_name}' not found")
 
-        index = self.indexes[index_name]
+        if mode is not None and mode not in self.SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        if ef is not None and ef < 1:
+            raise ValueError(f"Invalid ef: {ef}")
+
+        # Convert query to numpy
+        query = np.asarray(query_vector, dtype=np.float32)
+
+        waiting = time.perf_counter()
+        async with self._lock(index_name).read():
+            SEARCH_PHASES.labels(index_name, "lock_wait").observe(time.perf_counter() - waiting)
+            # The index may have been deleted while waiting for the lock
+            if index_name not in self.indexes:
+                raise ValueError(f"Index '{index_name}' not found")
+            if len(self.indexes[index_name]) == 0:
+                return []
+            return await self._run(
+                self._search_one, index_name, query, top_k, filters, min_score, mode, ef
+            )
+
+    async def hybrid_search(
+        self,
+        index_name: str,
+        query_vector: list[float],
+        query_text: str,
+        top_k: int = 10,
+        filters: Optional[dict] = None,
+        min_score: float = 0.0,
+        mode: Optional[str] = None,
+        ef: Optional[int] = None,
+        fusion: str = "rrf",
+        text_weight: float = 0.3,
+    ) -> list[SearchResult]:
+        """
+        Search vectors and item content together and fuse the two rankings.
+
+        The vector search and a BM25 search of the indexed content run in
+        parallel on the thread pool under one read lock. Each contributes
+        HYBRID_OVERSAMPLING times top_k candidates, which are fused before the
+        cut to top_k. Lexical matches recover what embeddings miss, such as
+        factor codes and exact product names.
+
+        Args:
+            index_name: Index to search
+            query_vector: Query embedding vector
+            query_text: Query text for the lexical index
+            top_k: Number of results
+            filters: Metadata filters, applied to both retrievers
+            min_score: Minimum fused score
+            mode: auto, ann or exact; defaults to the index's search mode
+            ef: HNSW candidates to explore; defaults to the index's expansion_search
+            fusion: rrf (reciprocal rank fusion) or weighted (similarity and
+                max-normalized BM25 scores combined linearly)
+            text_weight: Weight of the lexical ranking (0-1)
+
+        Returns:
+            List of SearchResult objects with fused scores (0-1)
+        """
+        if index_name not in self.indexes:
+            raise ValueError(f"Index '{index_name}' not found")
+        if mode is not None and mode not in self.SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        if ef is not None and ef < 1:
+            raise ValueError(f"Invalid ef: {ef}")
+        if fusion not in self.FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {fusion}")
+        if not 0.0 <= text_weight <= 1.0:
+            raise ValueError(f"Invalid text_weight: {text_weight}")
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        count = top_k * self.HYBRID_OVERSAMPLING
+
+        waiting = time.perf_counter()
+        async with self._lock(index_name).read():
+            SEARCH_PHASES.labels(index_name, "lock_wait").observe(time.perf_counter() - waiting)
+            if index_name not in self.indexes:
+                raise ValueError(f"Index '{index_name}' not found")
+            if len(self.indexes[index_name]) == 0:
+                return []
+            # Wait for both workers even if one fails, so the lock covers them
+            vector_hits, lexical_hits = await asyncio.gather(
+                self._run(self._search_one, index_name, query, count, filters, 0.0, mode, ef),
+                self._run(self._lexical_search, index_name, query_text, count, filters),
+                return_exceptions=True,
+            )
+        for hits in (vector_hits, lexical_hits):
+            if isinstance(hits, BaseException):
+                raise hits
+
+        with SEARCH_PHASES.labels(index_name, "fusion").time():
+            return self._fuse(vector_hits, lexical_hits, top_k, min_score, fusion, text_weight)
+
+    def _lexical_search(
+        self,
+        index_name: str,
+        text: str,
+        count: int,
+        filters: Optional[dict],
+    ) -> list[SearchResult]:
+        """
+        BM25 search of item content (worker thread, under the read lock).
+
+        Returns:
+            Results scored relative to the best match (0-1)
+        """
+        lexical = self.lexical[index_name]
+        allowed = None
+        if filters:
+            with SEARCH_PHASES.labels(index_name, "filter").time():
+                allowed = self.filters[index_name].candidates(filters)
+            if allowed is not None and not len(allowed):
+                return []
+        # Filters the index cannot answer are checked per hit: rank everything
+        post_filter = bool(filters) and allowed is None
+
+        with SEARCH_PHASES.labels(index_name, "lexical").time():
+            keys, scores = lexical.search(text, len(lexical) if post_filter else count, allowed)
 
-        if len(index) == 0:
+        results = []
+        registry = self.keys[index_name]
+        store = self.metadata[index_name]
+        with SEARCH_PHASES.labels(index_name, "hydrate").time():
+            best = float(scores[0]) if len(scores) else 1.0
+            for key, score in zip(keys.tolist(), scores.tolist()):
+                item_id = registry.lookup(key)
+                if item_id is None:
+                    continue
+                item_metadata = store.get(key) or {}
+                if post_filter and not self._matches_filters(item_metadata, filters):
+                    continue
+                results.append(SearchResult(
+                    id=item_id,
+                    score=round(score / best, 4),
+                    metadata=item_metadata if item_metadata else None,
+                ))
+                if len(results) >= count:
+                    break
+        return results
+
+    def _fuse(
+        self,
+        vector_hits: list[SearchResult],
+        lexical_hits: list[SearchResult],
+        top_k: int,
+        min_score: float,
+        fusion: str,
+        text_weight: float,
+    ) -> list[SearchResult]:
+        """
+        Merge vector and lexical rankings into one top_k.
+
+        Scores are normalized so an item ranked first by every retriever that
+        returned hits scores 1; when one retriever finds nothing, the other's
+        ranking is used alone.
+        """
+        weights = (
+            (1.0 - text_weight) if vector_hits else 0.0,
+            text_weight if lexical_hits else 0.0,
+        )
+        total = sum(weights)
+        if not total:
             return []
 
-        # Convert query to numpy
-        query = np.array(query_vector, dtype=np.float32)
+        fused: dict[str, float] = {}
+        hits: dict[str, SearchResult] = {}
+        for weight, ranking in zip(weights, (vector_hits, lexical_hits)):
+            for rank, hit in enumerate(ranking):
+                if fusion == "rrf":
+                    contribution = (self.RRF_K + 1) / (self.RRF_K + rank + 1)
+                else:
+                    contribution = hit.score
+                fused[hit.id] = fused.get(hit.id, 0.0) + weight * contribution / total
+                hits.setdefault(hit.id, hit)
+
+        results = []
+        for item_id, score in sorted(fused.items(), key=lambda entry: entry[1], reverse=True)[:top_k]:
+            if score < min_score:
+                break
+            results.append(SearchResult(id=item_id, score=round(score, 4), metadata=hits[item_id].metadata))
+        return results
+
+    async def search_many(
+        self,
+        index_name: str,
+        query_vectors: np.ndarray,
+        top_k: Union[int, list[int]] = 10,
+        filters: Union[None, dict, list[Optional[dict]]] = None,
+        min_score: Union[float, list[float]] = 0.0,
+        mode: Optional[str] = None,
+        ef: Optional[int] = None,
+    ) -> list[list[SearchResult]]:
+        """
+        Search for the neighbors of many query vectors at once.
+
+        Unfiltered queries share one multi-threaded uSearch batch search (or
+        one matrix product in exact mode); queries with filters go through
+        the same pre-filtering as ``search``.
+
+        Args:
+            index_name: Index to search
+            query_vectors: Matrix of shape (queries, dimensions)
+            top_k: Number of results, shared or per query
+            filters: Metadata filters, shared or per query
+            min_score: Minimum similarity score, shared or per query
+            mode: auto, ann or exact; defaults to the index's search mode
+            ef: HNSW candidates to explore per query; defaults to the index's
+                expansion_search
+
+        Returns:
+            One list of SearchResult objects per query, in query order
+        """
+        if index_name not in self.indexes:
+            raise ValueError(f"Index '{index_name}' not found")
+        if mode is not None and mode not in self.SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        if ef is not None and ef < 1:
+            raise ValueError(f"Invalid ef: {ef}")
+
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        dimensions = self.index_info[index_name]["dimensions"]
+        if queries.ndim != 2 or queries.shape[1] != dimensions:
+            raise ValueError(
+                f"Expected query matrix of shape (n, {dimensions}), got {queries.shape}"
+            )
+
+        count = len(queries)
+        top_ks = np.broadcast_to(np.asarray(top_k, dtype=np.int64), (count,))
+        min_scores = np.broadcast_to(np.asarray(min_score, dtype=np.float32), (count,))
+        if filters is None or isinstance(filters, dict):
+            filters = [filters] * count
+        if len(filters) != count:
+            raise ValueError(f"Expected {count} filters, got {len(filters)}")
+
+        waiting = time.perf_counter()
+        async with self._lock(index_name).read():
+            SEARCH_PHASES.labels(index_name, "lock_wait").observe(time.perf_counter() - waiting)
+            if index_name not in self.indexes:
+                raise ValueError(f"Index '{index_name}' not found")
+            return await self._run(
+                self._search_batch, index_name, queries, top_ks, filters, min_scores, mode, ef
+            )
+
+    def _search_batch(
+        self,
+        index_name: str,
+        queries: np.ndarray,
+        top_ks: np.ndarray,
+        filters: list[Optional[dict]],
+        min_scores: np.ndarray,
+        mode: Optional[str],
+        ef: Optional[int],
+    ) -> list[list[SearchResult]]:
+        """Search validated per-query arguments (worker thread, under the read lock)."""
+        count = len(queries)
+        results: list[list[SearchResult]] = [[] for _ in range(count)]
+        if len(self.indexes[index_name]) == 0:
+            return results
+
+        plain = np.array([i for i in range(count) if not filters[i]], dtype=np.intp)
+        if len(plain):
+            if self._use_exact(index_name, mode):
+                hits = self._exact_search(index_name, queries[plain], top_ks[plain], min_scores[plain])
+            else:
+                hits = self._ann_search_many(
+                    index_name, queries[plain], top_ks[plain], min_scores[plain], ef
+                )
+            for i, result in zip(plain.tolist(), hits):
+                results[i] = result
+
+        for i in range(count):
+            if filters[i]:
+                results[i] = self._search_one(
+                    index_name, queries[i], int(top_ks[i]), filters[i], float(min_scores[i]), mode, ef
+                )
+        return results
+
+    def _search_one(
+        self,
+        index_name: str,
+        query: np.ndarray,
+        top_k: int,
+        filters: Optional[dict],
+        min_score: float,
+        mode: Optional[str] = None,
+        ef: Optional[int] = None,
+    ) -> list[SearchResult]:
+        """Search one query vector, pre-filtering through the metadata index."""
+        index = self.indexes[index_name]
+        exact = self._use_exact(index_name, mode)
+
+        if not filters:
+            if exact:
+                return self._exact_search(
+                    index_name, query[None], np.array([top_k]), np.array([min_score])
+                )[0]
+            results, _ = self._ann_search(index_name, query, top_k, top_k, min_score, ef)
+            return results
+
+        # Pre-filter through the metadata inverted index
+        with SEARCH_PHASES.labels(index_name, "filter").time():
+            candidates = self.filters[index_name].candidates(filters)
+        if candidates is not None:
+            if not len(candidates):
+                return []
+            if exact or len(candidates) <= self.EXACT_FILTER_THRESHOLD:
+                return self._search_candidates(index_name, query, candidates, top_k, min_score)
+        elif exact:
+            # Filters the index cannot answer: rank everything, then post-filter
+            return self._exact_search(
+                index_name, query[None], np.array([top_k]), np.array([min_score]), filters=filters
+            )[0]
+
+        # Filter too broad for exact scoring (or not answerable by the index):
+        # over-fetch in proportion to selectivity, widening until top_k is met
+        selectivity = len(candidates) / len(index) if candidates is not None else 0.1
+        count = min(len(index), max(top_k, int(top_k / max(selectivity, 1e-6) * 2)))
+
+        while True:
+            results, cut_off = self._ann_search(
+                index_name,
+                query,
+                count,
+                top_k,
+                min_score,
+                ef,
+                allowed=candidates,
+                filters=filters if candidates is None else None,
+            )
+            if len(results) >= top_k or cut_off or count >= len(index):
+                return results
+            count = min(len(index), count * 4)
+
+    def _ann_search(
+        self,
+        index_name: str,
+        query: np.ndarray,
+        count: int,
+        top_k: int,
+        min_score: float,
+        ef: Optional[int] = None,
+        **kwargs,
+    ) -> tuple[list[SearchResult], bool]:
+        """
+        Run an HNSW search, rescoring quantized candidates at full precision.
+
+        Args:
+            index_name: Index to search
+            query: Query vector
+            count: Number of neighbors to fetch from the graph
+            top_k: Maximum number of results
+            min_score: Minimum similarity score
+            ef: Candidates to explore; defaults to the index's expansion_search
+            **kwargs: Candidate filtering options for _collect_results
+
+        Returns:
+            Tuple of (results, whether the min_score cut-off was reached)
+        """
+        index = self.indexes[index_name]
+        store = self.vectors.get(index_name)
+        if store is not None:
+            count = count * self.RESCORE_OVERSAMPLING
+        count = self._fetch_count(index_name, count, ef)
+
+        with SEARCH_PHASES.labels(index_name, "ann").time():
+            matches = index.search(self._quantize(index_name, query), count)
+        keys, distances = matches.keys, matches.distances
+
+        if store is not None and len(keys):
+            with SEARCH_PHASES.labels(index_name, "rescore").time():
+                metric = self.index_info[index_name].get("metric", "cos")
+                distances = exact_distances(store.get(keys), query, metric)
+                order = np.argsort(distances, kind="stable")
+                keys, distances = keys[order], distances[order]
+
+        with SEARCH_PHASES.labels(index_name, "hydrate").time():
+            return self._collect_results(index_name, keys, distances, top_k, min_score, **kwargs)
+
+    def _ann_search_many(
+        self,
+        index_name: str,
+        queries: np.ndarray,
+        top_ks: np.ndarray,
+        min_scores: np.ndarray,
+        ef: Optional[int] = None,
+    ) -> list[list[SearchResult]]:
+        """
+        Run one HNSW batch search for several unfiltered queries.
+
+        Args:
+            index_name: Index to search
+            queries: Query matrix
+            top_ks: Maximum number of results per query
+            min_scores: Minimum similarity score per query
+            ef: Candidates to explore; defaults to the index's expansion_search
+
+        Returns:
+            One list of SearchResult objects per query
+        """
+        index = self.indexes[index_name]
+        store = self.vectors.get(index_name)
+        count = int(top_ks.max())
+        if store is not None:
+            count = count * self.RESCORE_OVERSAMPLING
+        count = self._fetch_count(index_name, count, ef)
+
+        with SEARCH_PHASES.labels(index_name, "ann").time():
+            matches = index.search(self._quantize(index_name, queries), count, threads=0)
+        if len(queries) == 1:
+            # uSearch returns single-query matches for a one-row batch
+            keys = np.zeros((1, count), dtype=np.uint64)
+            distances = np.full((1, count), np.inf, dtype=np.float32)
+            found = len(matches.keys)
+            keys[0, :found], distances[0, :found] = matches.keys, matches.distances
+            counts = np.array([found])
+        else:
+            keys, distances, counts = matches.keys, matches.distances, matches.counts
+
+        # Slots past each query's match count hold garbage
+        valid = np.arange(keys.shape[1]) < counts[:, None]
+        distances = np.where(valid, distances, np.inf).astype(np.float32)
+
+        if store is not None:
+            with SEARCH_PHASES.labels(index_name, "rescore").time():
+                metric = self.index_info[index_name].get("metric", "cos")
+                rows = np.nonzero(valid)[0]
+                distances[valid] = exact_distances(store.get(keys[valid]), queries[rows], metric)
+                order = np.argsort(distances, axis=1, kind="stable")
+                keys = np.take_along_axis(keys, order, axis=1)
+                distances = np.take_along_axis(distances, order, axis=1)
+
+        # Score cut-offs for all queries at once; hits are sorted per row
+        with np.errstate(over="ignore"):
+            scores = np.where(distances <= 1, 1 - distances, 1 / (1 + distances))
+        passing = np.isfinite(distances) & (scores >= min_scores[:, None])
+
+        results = []
+        with SEARCH_PHASES.labels(index_name, "hydrate").time():
+            for row in range(len(queries)):
+                mask = passing[row]
+                hits, _ = self._collect_results(
+                    index_name,
+                    keys[row][mask],
+                    distances[row][mask],
+                    int(top_ks[row]),
+                    float(min_scores[row]),
+                )
+                results.append(hits)
+        return results
+
+    def _fetch_count(self, index_name: str, count: int, ef: Optional[int]) -> int:
+        """
+        Number of neighbors to request from uSearch for a given search effort.
+
+        uSearch explores max(expansion_search, count) candidates and has no
+        per-call expansion, so indexes keep expansion_search at 1 and the
+        effort is chosen per query by fetching at least ``ef`` neighbors.
+        The extra neighbors come from the same traversal and cost little.
+        """
+        if ef is None:
+            ef = self.index_info.get(index_name, {}).get(
+                "expansion_search", self.HNSW_DEFAULTS["expansion_search"]
+            )
+        return min(len(self.indexes[index_name]), max(count, ef))
+
+    def _search_candidates(
+        self,
+        index_name: str,
+        query: np.ndarray,
+        keys: np.ndarray,
+        top_k: int,
+        min_score: float,
+    ) -> list[SearchResult]:
+        """Score a small candidate set exactly and return the best matches."""
+        metric = self.index_info.get(index_name, {}).get("metric", "cos")
+
+        with SEARCH_PHASES.labels(index_name, "exact").time():
+            cached = self._exact.get(index_name)
+            if cached is not None:
+                # Slice the contiguous exact-search matrix instead of fetching rows
+                all_keys, matrix, norms = cached
+                rows = np.minimum(np.searchsorted(all_keys, keys), max(len(all_keys) - 1, 0))
+                present = all_keys[rows] == keys if len(all_keys) else np.zeros(len(keys), dtype=bool)
+                keys, rows = keys[present], rows[present]
+                distances = _matrix_distances(matrix[rows], norms[rows], query[None], metric)[0]
+            else:
+                distances = exact_distances(self._get_vectors(index_name, keys), query, metric)
+
+            # Partial sort: only the top_k best candidates need ordering
+            if len(distances) > top_k:
+                best = np.argpartition(distances, top_k - 1)[:top_k]
+            else:
+                best = np.arange(len(distances))
+            order = best[np.argsort(distances[best], kind="stable")]
+
+        with SEARCH_PHASES.labels(index_name, "hydrate").time():
+            results, _ = self._collect_results(
+                index_name, keys[order], distances[order], top_k, min_score
+            )
+        return results
+
+    def _use_exact(self, index_name: str, mode: Optional[str]) -> bool:
+        """Whether a search should scan all vectors instead of the HNSW graph."""
+        mode = mode or self.index_info.get(index_name, {}).get("search_mode", "auto")
+        if mode == "auto":
+            return len(self.indexes[index_name]) <= self.exact_threshold
+        return mode == "exact"
+
+    def _exact_matrix(self, index_name: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Contiguous float32 copy of an index for exact search.
+
+        Built on first use and dropped by writes. Rows are ordered by key and
+        normalized for cosine indexes, so scoring is a single matrix product.
+
+        Returns:
+            Tuple of (sorted keys, row matrix, squared norms of the raw rows)
+        """
+        cached = self._exact.get(index_name)
+        if cached is not None:
+            return cached
+
+        index = self.indexes[index_name]
+        keys = np.sort(np.asarray(index.keys, dtype=np.uint64))
+        if len(keys):
+            matrix = np.ascontiguousarray(self._get_vectors(index_name, keys), dtype=np.float32)
+        else:
+            matrix = np.empty((0, index.ndim), dtype=np.float32)
 
-        # Search - get more results if filtering
-        search_k = top_k * 3 if filters else top_k
-        matches = index.search(query, search_k)
+        norms = np.einsum("ij,ij->i", matrix, matrix)
+        if self.index_info.get(index_name, {}).get("metric", "cos") == "cos":
+            lengths = np.sqrt(norms)
+            matrix = matrix / np.where(lengths > 0, lengths, 1)[:, None]
 
-        # Build results
+        cached = self._exact[index_name] = (keys, matrix, norms)
+        return cached
+
+    def _exact_search(
+        self,
+        index_name: str,
+        queries: np.ndarray,
+        top_ks: np.ndarray,
+        min_scores: np.ndarray,
+        filters: Optional[dict] = None,
+    ) -> list[list[SearchResult]]:
+        """
+        Brute-force search: one BLAS matrix product and a partial sort per query.
+
+        Args:
+            index_name: Index to search
+            queries: Query matrix
+            top_ks: Maximum number of results per query
+            min_scores: Minimum similarity score per query
+            filters: Optional metadata filters checked per hit (ranks all rows)
+
+        Returns:
+            One list of SearchResult objects per query
+        """
+        with SEARCH_PHASES.labels(index_name, "exact").time():
+            keys, matrix, norms = self._exact_matrix(index_name)
+            if not len(keys):
+                return [[] for _ in range(len(queries))]
+
+            metric = self.index_info.get(index_name, {}).get("metric", "cos")
+            distances = _matrix_distances(matrix, norms, queries, metric)
+
+            # Partial sort: only the best rows of each query need ordering
+            count = len(keys) if filters else min(len(keys), int(top_ks.max()))
+            if count < len(keys):
+                best = np.argpartition(distances, count - 1, axis=1)[:, :count]
+            else:
+                best = np.broadcast_to(np.arange(len(keys)), distances.shape)
+            best_distances = np.take_along_axis(distances, best, axis=1)
+            order = np.argsort(best_distances, axis=1, kind="stable")
+            best = np.take_along_axis(best, order, axis=1)
+            best_distances = np.take_along_axis(best_distances, order, axis=1)
+
+        results = []
+        with SEARCH_PHASES.labels(index_name, "hydrate").time():
+            for row in range(len(queries)):
+                hits, _ = self._collect_results(
+                    index_name,
+                    keys[best[row]],
+                    best_distances[row],
+                    int(top_ks[row]),
+                    float(min_scores[row]),
+                    filters=filters,
+                )
+                results.append(hits)
+        return results
+
+    async def measure_recall(
+        self,
+        index_name: str,
+        query_vectors: np.ndarray,
+        top_k: int = 10,
+    ) -> float:
+        """
+        Recall@k of HNSW search, using exact search as ground truth.
+
+        Args:
+            index_name: Index to evaluate
+            query_vectors: Matrix of shape (queries, dimensions)
+            top_k: Number of neighbors compared per query
+
+        Returns:
+            Share of the exact top_k neighbors that HNSW search also returns
+        """
+        approximate = await self.search_many(index_name, query_vectors, top_k, mode="ann")
+        exact = await self.search_many(index_name, query_vectors, top_k, mode="exact")
+        expected = sum(len(truth) for truth in exact)
+        if not expected:
+            return 1.0
+        found = sum(
+            len({r.id for r in hits} & {r.id for r in truth})
+            for hits, truth in zip(approximate, exact)
+        )
+        return found / expected
+
+    def _collect_results(
+        self,
+        index_name: str,
+        keys: np.ndarray,
+        distances: np.ndarray,
+        top_k: int,
+        min_score: float,
+        allowed: Optional[np.ndarray] = None,
+        filters: Optional[dict] = None,
+    ) -> tuple[list[SearchResult], bool]:
+        """
+        Turn ranked (key, distance) pairs into search results.
+
+        Args:
+            index_name: Index the keys belong to
+            keys: Matched keys, best first
+            distances: Distances aligned with keys
+            top_k: Maximum number of results
+            min_score: Minimum similarity score
+            allowed: Optional sorted array of keys passing the filters
+            filters: Optional metadata filters to check per hit
+
+        Returns:
+            Tuple of (results, whether the min_score cut-off was reached)
+        """
         results = []
-        key_to_id = self._build_key_to_id_map(index_name)
+        registry = self.keys[index_name]
+        store = self.metadata[index_name]
 
-        for key, distance in zip(matches.keys, matches.distances):
+        # Drop hits outside the candidate set with one vectorized lookup
+        if allowed is not None and len(allowed):
+            positions = np.searchsorted(allowed, keys)
+            mask = allowed[np.minimum(positions, len(allowed) - 1)] == keys
+            keys, distances = keys[mask], distances[mask]
+
+        for key, distance in zip(keys.tolist(), distances.tolist()):
             # Convert distance to similarity score (0-1)
             # For cosine distance, similarity = 1 - distance
             score = float(1 - distance) if distance <= 1 else float(1 / (1 + distance))
 
+            # Matches are ordered, so nothing further can pass
             if score < min_score:
-                continue
+                return results, True
 
-            # Find item ID
-            item_id = key_to_id.get(int(key))
-            if not item_id:
+            # Find item ID (None for vectors of deleted items)
+            item_id = registry.lookup(key)
+            if item_id is None:
                 continue
 
             # Get metadata
-            item_metadata = self.metadata.get(index_name, {}).get(item_id, {})
+            item_metadata = store.get(key) or {}
 
             # Apply filters
             if filters and not self._matches_filters(item_metadata, filters):
                 continue
 
-            # Remove internal key from metadata
-            result_metadata = {k: v for k, v in item_metadata.items() if k != "key"}
-
             results.append(SearchResult(
                 id=item_id,
                 score=round(score, 4),
-                metadata=result_metadata if result_metadata else None,
+                metadata=item_metadata if item_metadata else None,
             ))
 
             if len(results) >= top_k:
                 break
 
-        return results
+        return results, False
+
+    async def get_contents(self, index_name: str, item_ids: list[str]) -> list[Optional[str]]:
+        """
+        Text content stored with items, e.g. for reranking.
+
+        Returns:
+            Content per ID, None for unknown items or items indexed without it
+        """
+        if index_name not in self.indexes:
+            raise ValueError(f"Index '{index_name}' not found")
+
+        async with self._lock(index_name).read():
+            if index_name not in self.indexes:
+                raise ValueError(f"Index '{index_name}' not found")
+            registry = self.keys[index_name]
+            store = self.contents[index_name]
+            contents = []
+            for item_id in item_ids:
+                key = registry.get(item_id)
+                row = store.get(key) if key is not None else None
+                contents.append(row.get("content") if row else None)
+            return contents
 
     async def find_similar(
         self,
@@ -333,14 +1640,18 @@ class SearchEngine:
         if index_name not in self.indexes:
             raise ValueError(f"Index '{index_name}' not found")
 
-        # Get the item's vector
-        key = self._id_to_key(index_name, item_id)
-        index = self.indexes[index_name]
+        async with self._lock(index_name).read():
+            if index_name not in self.indexes:
+                raise ValueError(f"Index '{index_name}' not found")
+
+            # Get the item's vector
+            key = self.keys[index_name].get(item_id)
+            index = self.indexes[index_name]
 
-        # Retrieve vector by key
-        vector = index.get(key)
-        if vector is None:
-            raise ValueError(f"Item '{item_id}' not found in index '{index_name}'")
+            # Retrieve vector by key
+            if key is None or key not in index:
+                raise ValueError(f"Item '{item_id}' not found in index '{index_name}'")
+            vector = self._get_vectors(index_name, np.array([key], dtype=np.uint64))[0]
 
         # Search using the vector
         results = await self.search(
@@ -360,23 +1671,264 @@ class SearchEngine:
         if index_name not in self.indexes:
             raise ValueError(f"Index '{index_name}' not found")
 
-        # Remove from metadata
-        if index_name in self.metadata and item_id in self.metadata[index_name]:
-            key = self.metadata[index_name][item_id].get("key")
-            del self.metadata[index_name][item_id]
-
-            # Note: uSearch doesn't support deletion directly
-            # In production, you'd need to rebuild the index or use soft deletion
-            logger.warning(f"Item '{item_id}' removed from metadata (vector remains in index)")
+        async with self._lock(index_name).write():
+            if index_name not in self.indexes:
+                raise ValueError(f"Index '{index_name}' not found")
+
+            # Free the key and remove its metadata
+            key = self.keys[index_name].remove(item_id)
+            if key is None:
+                return
+            store = self.metadata[index_name]
+            self.filters[index_name].remove(key, store.get(key))
+            store.delete(key)
+            self.lexical[index_name].remove(key)
+            self.contents[index_name].delete(key)
+
+            # uSearch tombstones the node: it leaves search results at once
+            # and its slot is reclaimed by the next compaction
+            if index_name in self.views:
+                await self._run(self._writable_index, index_name)
+            index = self.indexes[index_name]
+            if key in index:
+                index.remove(key)
+            self._exact.pop(index_name, None)
+            if index_name in self._touched:
+                self._touched[index_name].add(key)
+            self._maybe_compact(index_name)
+            self._log(index_name, "delete", [item_id])
+
+        await self._commit_log(index_name)
 
     async def optimize_index(self, index_name: str):
         """Optimize an index for better performance."""
         if index_name not in self.indexes:
             raise ValueError(f"Index '{index_name}' not found")
 
-        # Save and reload to compact
+        # Rebuild without removed entries (also persists the index)
+        dropped = await self.compact_index(index_name)
+        logger.info(f"Optimized index '{index_name}' ({dropped} dead entries dropped)")
+
+    async def compact_index(self, index_name: str) -> int:
+        """
+        Rebuild an index without its removed entries and swap it in.
+
+        Shards are rebuilt one at a time. The live vectors of a shard are
+        snapshotted under the read lock and its new graph is built on a
+        worker thread without holding the lock; writes made meanwhile are
+        replayed onto the new graph under the write lock, just before it
+        replaces the old shard. Concurrent calls share one compaction.
+
+        Args:
+            index_name: Index to compact
+
+        Returns:
+            Number of dead entries dropped
+        """
+        if index_name not in self.indexes:
+            raise ValueError(f"Index '{index_name}' not found")
+
+        task = self._compactions.get(index_name)
+        if task is None or task.done():
+            task = asyncio.get_running_loop().create_task(self._compact(index_name))
+            self._compactions[index_name] = task
+        return await asyncio.shield(task)
+
+    def _maybe_compact(self, index_name: str):
+        """Start a background compaction once enough entries are dead."""
+        if self.compaction_threshold <= 0:
+            return
+        task = self._compactions.get(index_name)
+        if task is not None and not task.done():
+            return
+
+        # Only shards over the threshold are rebuilt
+        index = self.indexes[index_name]
+        shards = [
+            shard
+            for shard in range(index.shard_count)
+            if index.dead_entries(shard) >= self.COMPACTION_MIN_DEAD
+            and index.dead_entries(shard) / index.shards[shard].stats.nodes >= self.compaction_threshold
+        ]
+        if not shards:
+            return
+
+        dead = sum(index.dead_entries(shard) for shard in shards)
+        logger.info(f"Index '{index_name}' has {dead} dead entries, compacting in background")
+        task = asyncio.get_running_loop().create_task(self._compact(index_name, shards))
+        task.add_done_callback(self._log_compaction_error)
+        self._compactions[index_name] = task
+
+    @staticmethod
+    def _log_compaction_error(task: asyncio.Task):
+        """Report failures of background compactions."""
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background compaction failed: {task.exception()}")
+
+    async def _compact(self, index_name: str, shards: Optional[list[int]] = None) -> int:
+        """Rebuild shards of an index (all by default) from their live entries."""
+        if index_name not in self.indexes:
+            return 0
+        if shards is None:
+            shards = list(range(self.indexes[index_name].shard_count))
+
+        dropped = 0
+        for shard in shards:
+            dead = await self._compact_shard(index_name, shard)
+            if dead is None:
+                return dropped  # deleted while compacting
+            dropped += dead
+
+        # Persist; only the rebuilt shards are rewritten
         await self._save_index(index_name)
-        logger.info(f"Optimized index '{index_name}'")
+
+        logger.info(f"Compacted index '{index_name}': dropped {dropped} dead entries")
+        return dropped
+
+    async def _compact_shard(self, index_name: str, shard: int) -> Optional[int]:
+        """
+        Rebuild one shard and swap it in (see compact_index).
+
+        Returns:
+            Number of dead entries dropped, or None if the index was deleted
+        """
+        lock = self._lock(index_name)
+
+        # Snapshot live entries; writes from here on are recorded for replay
+        async with lock.read():
+            if index_name not in self.indexes:
+                return None
+            dead = self.indexes[index_name].dead_entries(shard)
+            keys, data = await self._run(self._live_entries, index_name, shard)
+            info = dict(self.index_info[index_name])
+            self._touched[index_name] = set()
+
+        def build() -> Index:
+            compacted = self._new_shard(info)
+            if len(keys):
+                compacted.add(keys, data, threads=0)
+            return compacted
+
+        try:
+            compacted = await asyncio.to_thread(build)
+        except BaseException:
+            self._touched.pop(index_name, None)
+            raise
+
+        async with lock.write():
+            touched = self._touched.pop(index_name, set())
+
+            # The index may have been deleted while building
+            if index_name not in self.indexes:
+                return None
+
+            # Replay writes made during the build
+            if touched:
+                await self._run(self._replay_touched, index_name, shard, compacted, touched)
+
+            # Swap; other shards of a view-mode index stay mapped until the
+            # next write copies them (the save after compaction maps them all)
+            index = self.indexes[index_name]
+            index.replace(shard, compacted)
+            if index.shard_count == 1:
+                self.views.discard(index_name)
+            self._exact.pop(index_name, None)
+
+        return dead
+
+    def _live_entries(self, index_name: str, shard: int) -> tuple[np.ndarray, np.ndarray]:
+        """Keys and encoded vectors of the live entries of a shard (worker thread)."""
+        keys = self.indexes[index_name].shard_keys(shard)
+        return keys, self._quantize(index_name, self._get_vectors(index_name, keys))
+
+    def _replay_touched(self, index_name: str, shard: int, compacted: Index, touched: set[int]):
+        """Bring a rebuilt shard up to date with keys written during its build."""
+        current = self.indexes[index_name]
+        changed = np.fromiter(touched, dtype=np.uint64, count=len(touched))
+        changed = changed[current.shard_of(changed) == shard]
+        stale = changed[np.asarray(compacted.contains(changed), dtype=bool)]
+        if len(stale):
+            compacted.remove(stale)
+        live = changed[np.asarray(current.contains(changed), dtype=bool)]
+        if len(live):
+            compacted.add(live, self._quantize(index_name, self._get_vectors(index_name, live)))
+
+    def _open_wal(self, name: str):
+        """Start logging mutations of an index."""
+        if self.wal_enabled:
+            self.wals[name] = WriteAheadLog(self.index_path / f"{name}.wal", sync=self.wal_sync)
+
+    async def _replay_wal(self, name: str):
+        """Apply logged operations on top of the loaded snapshot, then keep logging."""
+        wal_file = self.index_path / f"{name}.wal"
+        if not self.wal_enabled and not wal_file.exists():
+            return
+
+        wal = WriteAheadLog(wal_file, sync=self.wal_sync)
+        replayed = 0
+        for op, item_ids, vectors, metadatas, contents in wal.records():
+            if op == "add":
+                await self.index_items(name, item_ids, vectors, metadatas, contents)
+            elif op == "delete":
+                for item_id in item_ids:
+                    await self.delete_item(name, item_id)
+            replayed += 1
+        if replayed:
+            logger.info(f"Replayed {replayed} logged operations for index '{name}'")
+
+        # Keep the segments until the next snapshot covers them
+        if self.wal_enabled:
+            self.wals[name] = wal
+        else:
+            wal.close()
+
+    def _log(
+        self,
+        name: str,
+        op: str,
+        item_ids: list[str],
+        vectors: Optional[np.ndarray] = None,
+        metadatas: Optional[list[Optional[dict]]] = None,
+        contents: Optional[list[Optional[str]]] = None,
+    ):
+        """
+        Record an applied operation in the write-ahead log.
+
+        Called under the write lock, so records follow the order in which
+        operations were applied; ``_commit_log`` then makes them durable.
+        """
+        self._mutations[name] = self._mutations.get(name, 0) + len(item_ids)
+
+        wal = self.wals.get(name)
+        if wal is not None:
+            wal.append(op, item_ids, vectors, metadatas, contents)
+
+    async def _commit_log(self, name: str):
+        """Make logged operations durable and schedule snapshots."""
+        wal = self.wals.get(name)
+        if wal is not None:
+            await wal.commit()
+
+        # Fold enough changes (or a large log) into a fresh snapshot
+        changed = self._mutations.get(name, 0) - self._snapshot_mutations.get(name, 0)
+        if (self.snapshot_mutations and changed >= self.snapshot_mutations) or (
+            wal is not None and wal.size > self.wal_max_bytes
+        ):
+            task = self._snapshots.get(name)
+            if task is None or task.done():
+                self._snapshots[name] = asyncio.get_running_loop().create_task(
+                    self._save_index(name)
+                )
+
+    def _dead_entries(self, index_name: str) -> int:
+        """Number of removed entries still occupying graph nodes."""
+        index = self.indexes[index_name]
+        return sum(index.dead_entries(shard) for shard in range(index.shard_count))
+
+    def _dead_ratio(self, index_name: str) -> float:
+        """Share of graph nodes that belong to removed entries."""
+        nodes = self.indexes[index_name].nodes
+        return self._dead_entries(index_name) / nodes if nodes else 0.0
 
     async def list_indexes(self) -> list[dict]:
         """List all indexes with their info."""
@@ -387,7 +1939,14 @@ class SearchEngine:
                 "name": name,
                 "dimensions": info.get("dimensions", self.default_dimensions),
                 "metric": info.get("metric", "cos"),
+                "dtype": info.get("dtype", "f32"),
+                "rescore": info.get("rescore", False),
+                "serving_mode": self._serving_mode(name),
+                "search_mode": info.get("search_mode", "auto"),
+                **{param: info.get(param, default) for param, default in self.HNSW_DEFAULTS.items()},
+                "shards": index.shard_count,
                 "vector_count": len(index),
+                "dead_entries": self._dead_entries(name),
                 "created_at": info.get("created_at"),
                 "updated_at": info.get("updated_at"),
             })
@@ -405,21 +1964,29 @@ class SearchEngine:
 
             # Estimate size
             dims = info.get("dimensions", self.default_dimensions)
-            size_bytes = vec_count * dims * 4  # float32 = 4 bytes
+            bits = self.DTYPE_BITS.get(info.get("dtype"), 32)
+            size_bytes = vec_count * dims * bits // 8
 
             indexes.append(IndexStats(
                 name=name,
                 vector_count=vec_count,
                 dimensions=dims,
                 metric=info.get("metric", "cos"),
+                dtype=info.get("dtype", "f32"),
+                serving_mode=self._serving_mode(name),
+                search_mode=info.get("search_mode", "auto"),
+                shards=index.shard_count,
                 size_bytes=size_bytes,
+                memory_bytes=index.memory_usage,
+                text_documents=len(self.lexical[name]),
+                dead_entries=self._dead_entries(name),
+                dead_ratio=round(self._dead_ratio(name), 4),
                 created_at=info.get("created_at"),
                 updated_at=info.get("updated_at"),
             ))
 
-        # Estimate memory usage (rough)
-        import sys
-        memory_mb = sum(sys.getsizeof(idx) for idx in self.indexes.values()) / 1024 / 1024
+        # Graph and vectors as allocated by uSearch (mapped file size for views)
+        memory_mb = sum(idx.memory_usage for idx in self.indexes.values()) / 1024 / 1024
 
         return StatsResponse(
             total_vectors=total_vectors,
@@ -429,38 +1996,133 @@ class SearchEngine:
             uptime_seconds=round(time.time() - self.start_time, 2),
         )
 
+    def _new_index(self, info: dict) -> ShardedIndex:
+        """Create an empty index (all shards unsaved) from its registry info."""
+        index = ShardedIndex(
+            [self._new_shard(info) for _ in range(info.get("shards", 1))],
+            self._shard_executor,
+        )
+        index.mark_dirty(range(index.shard_count))
+        return index
+
+    def _open_index(self, name: str, info: dict, view: bool) -> ShardedIndex:
+        """Load (or memory-map, for ``view``) the persisted shards of an index."""
+        shards = []
+        for index_file in self._index_files(name, info):
+            shard = self._new_shard(info)
+            if view:
+                shard.view(str(index_file))
+            else:
+                shard.load(str(index_file))
+            shards.append(shard)
+        return ShardedIndex(shards, self._shard_executor)
+
+    def _index_files(self, name: str, info: dict) -> list[Path]:
+        """uSearch files of an index, one per shard."""
+        count = info.get("shards", 1)
+        if count == 1:
+            return [self.index_path / f"{name}.usearch"]
+        return [self.index_path / f"{name}.shard{shard}.usearch" for shard in range(count)]
+
+    def _new_shard(self, info: dict) -> Index:
+        """Create an empty uSearch index from its registry info."""
+        dims = info.get("dimensions", self.default_dimensions)
+        dtype = info.get("dtype")
+        hnsw = {
+            "connectivity": info.get("connectivity", self.HNSW_DEFAULTS["connectivity"]),
+            "expansion_add": info.get("expansion_add", self.HNSW_DEFAULTS["expansion_add"]),
+            "expansion_search": 1,  # effort is set per query (see _fetch_count)
+        }
+
+        # Binary indexes compare sign bits; scores come from rescoring
+        if dtype == "b1":
+            return Index(ndim=dims, metric=MetricKind.Hamming, dtype="b1", **hnsw)
+
+        metric = self.METRIC_MAP.get(info.get("metric", "cos"), MetricKind.Cos)
+        return Index(ndim=dims, metric=metric, dtype=dtype, **hnsw)
+
+    def _quantize(self, name: str, vectors: np.ndarray) -> np.ndarray:
+        """Encode float32 vectors for an index (sign bits for b1 indexes)."""
+        if self.index_info.get(name, {}).get("dtype") == "b1":
+            return np.packbits(vectors > 0, axis=-1)
+        return vectors
+
+    def _get_vectors(self, name: str, keys: np.ndarray) -> np.ndarray:
+        """Fetch float32 vectors, preferring full-precision copies."""
+        if name in self.vectors:
+            return self.vectors[name].get(keys)
+        return np.asarray(self.indexes[name].get(keys, dtype=np.float32), dtype=np.float32)
+
+    def _serving_mode(self, name: str) -> str:
+        """Serving mode of an index, falling back to the engine default."""
+        return self.index_info.get(name, {}).get("serving_mode", self.default_serving_mode)
+
+    def _writable_index(self, name: str) -> ShardedIndex:
+        """
+        Return an index that accepts writes.
+
+        Indexes served as a read-only view are copied into process memory on
+        their first write; the next save maps the persisted file again.
+        """
+        if name in self.views:
+            self.indexes[name] = self.indexes[name].copy()
+            self.views.discard(name)
+            logger.info(f"Index '{name}' copied into memory for writes")
+        return self.indexes[name]
+
     def get_index_count(self) -> int:
         """Get number of loaded indexes."""
         return len(self.indexes)
 
-    def _id_to_key(self, index_name: str, item_id: str) -> int:
-        """Convert string ID to numeric key for uSearch."""
-        # Check if already indexed
-        if index_name in self.metadata and item_id in self.metadata[index_name]:
-            return self.metadata[index_name][item_id]["key"]
-
-        # Generate new key
-        existing_keys = set()
-        if index_name in self.metadata:
-            for meta in self.metadata[index_name].values():
-                if "key" in meta:
-                    existing_keys.add(meta["key"])
-
-        # Use hash or incremental
-        key = hash(item_id) & 0x7FFFFFFFFFFFFFFF  # Positive 64-bit
-        while key in existing_keys:
-            key = (key + 1) & 0x7FFFFFFFFFFFFFFF
-
-        return key
-
-    def _build_key_to_id_map(self, index_name: str) -> dict[int, str]:
-        """Build reverse mapping from numeric key to string ID."""
-        result = {}
-        if index_name in self.metadata:
-            for item_id, meta in self.metadata[index_name].items():
-                if "key" in meta:
-                    result[meta["key"]] = item_id
-        return result
+    def _build_filter_index(self, store: MetadataStore) -> MetadataIndex:
+        """Build a metadata inverted index from a store's typed columns."""
+        filter_index = MetadataIndex()
+        for field in MetadataStore.TYPED_FIELDS:
+            keys, codes = store.column(field)
+            filter_index.load_column(field, keys, codes, store.values[field])
+
+        # Blob fields are not indexed on load; filters on them post-filter
+        filter_index.mark_unindexed(store.blob_fields)
+        return filter_index
+
+    def _migrate_legacy_metadata(
+        self,
+        name: str,
+        index: ShardedIndex,
+        metadata_file: Path,
+        keys_file: Path,
+    ) -> tuple[KeyRegistry, MetadataStore]:
+        """
+        Convert an index saved with {name}_metadata.json to the columnar store.
+
+        The oldest format also stored a hash-derived key inside each metadata
+        entry; those keys are reallocated monotonically and renamed in place
+        in the uSearch index, so no vectors need to be re-added.
+        """
+        with open(metadata_file, "r") as f:
+            legacy = json.load(f)
+
+        registry = KeyRegistry.load(keys_file)
+        store = MetadataStore(self.index_path / f"{name}.meta")
+        old_keys, new_keys = [], []
+
+        for item_id, meta in legacy.items():
+            old_key = meta.pop("key", None)
+            new_key = registry.get_or_create(item_id)
+            if old_key is not None and old_key != new_key:
+                old_keys.append(old_key)
+                new_keys.append(new_key)
+            store.put(new_key, meta)
+
+        if old_keys:
+            index.rename(
+                np.array(old_keys, dtype=np.uint64),
+                np.array(new_keys, dtype=np.uint64),
+            )
+            logger.info(f"Migrated {len(old_keys)} legacy keys for index '{name}'")
+
+        logger.info(f"Converted metadata of index '{name}' to columnar storage")
+        return registry, store
 
     def _matches_filters(self, metadata: dict, filters: dict) -> bool:
         """Check if metadata matches all filters."""
@@ -473,3 +2135,69 @@ class SearchEngine:
             elif metadata[key] != value:
                 return False
         return True
+
+
+def _fsync_file(path: Path):
+    """fsync a file or directory by path."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def exact_distances(vectors: np.ndarray, query: np.ndarray, metric: str = "cos") -> np.ndarray:
+    """
+    Compute uSearch-compatible distances between a query and many vectors.
+
+    Args:
+        vectors: Matrix of shape (n, dimensions)
+        query: Query vector of shape (dimensions,), or (n, dimensions) to
+            pair each vector with its own query
+        metric: Distance metric (cos, l2, ip)
+
+    Returns:
+        Distances of shape (n,), lower is closer
+    """
+    if metric == "l2":
+        diff = vectors - query
+        return np.einsum("ij,ij->i", diff, diff)
+
+    dots = np.einsum("ij,ij->i", vectors, query) if query.ndim == 2 else vectors @ query
+    if metric == "ip":
+        return 1.0 - dots
+
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = np.where(norms > 0, dots / norms, 0.0)
+    return 1.0 - similarity
+
+
+def _matrix_distances(
+    matrix: np.ndarray,
+    norms: np.ndarray,
+    queries: np.ndarray,
+    metric: str = "cos",
+) -> np.ndarray:
+    """
+    Distances between query rows and a prepared exact-search matrix.
+
+    Args:
+        matrix: Rows as built by SearchEngine._exact_matrix (unit length for cos)
+        norms: Squared norms of the raw rows
+        queries: Query matrix of shape (m, dimensions)
+        metric: Distance metric (cos, l2, ip)
+
+    Returns:
+        Distances of shape (m, rows), lower is closer
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    if metric == "cos":
+        lengths = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(lengths > 0, lengths, 1)
+
+    dots = queries @ matrix.T
+    if metric == "l2":
+        squared = np.einsum("ij,ij->i", queries, queries)
+        return np.maximum(norms[None, :] - 2 * dots + squared[:, None], 0)
+    return 1.0 - dots
@@ -0,0 +1,278 @@
+"""
+Intra-index sharding.
+Spreads one logical index over several uSearch graphs chosen by key hash.
+"""
+
+import os
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+from usearch.index import Index
+
+# Fibonacci hashing multiplier: spreads the registry's sequential keys evenly
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+class ShardMatches(NamedTuple):
+    """Merged neighbors of one query, nearest first."""
+    keys: np.ndarray
+    distances: np.ndarray
+
+
+class ShardBatchMatches(NamedTuple):
+    """Merged neighbors of several queries; slots past ``counts`` are padding."""
+    keys: np.ndarray
+    distances: np.ndarray
+    counts: np.ndarray
+
+
+class ShardedIndex:
+    """
+    N uSearch indexes behind the subset of the Index API the engine uses.
+
+    Each key lives in exactly one shard, picked by a multiplicative hash of
+    the key. Inserts are split by shard and run concurrently, so ingest is
+    not bound by one graph's locks. Searches are scattered to every shard
+    on a thread pool and the per-shard top-k lists are merged by distance.
+
+    Shards are persisted, mapped and rebuilt one by one. Writes mark their
+    shards dirty; a snapshot only rewrites dirty shards, and a
+    compaction only rebuilds the shards that need it, so the cost of both
+    is bounded by the shard size rather than the index size.
+
+    A single-shard index delegates every call to its one uSearch index.
+    """
+
+    def __init__(self, shards: list[Index], executor: Optional[Executor] = None):
+        """
+        Initialize the sharded index.
+
+        Args:
+            shards: One uSearch index per shard, all with the same parameters
+            executor: Thread pool for per-shard work (required for more than
+                one shard); must not be the pool the caller runs on
+        """
+        if not shards:
+            raise ValueError("A sharded index needs at least one shard")
+        if len(shards) > 1 and executor is None:
+            raise ValueError("A thread pool is required for more than one shard")
+        self.shards = shards
+        self.executor = executor
+        self.dirty: set[int] = set()  # shards changed since the last snapshot
+
+    @property
+    def shard_count(self) -> int:
+        """Number of shards."""
+        return len(self.shards)
+
+    def shard_of(self, keys: np.ndarray) -> np.ndarray:
+        """Shard number of each key."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        if self.shard_count == 1:
+            return np.zeros(len(keys), dtype=np.intp)
+        with np.errstate(over="ignore"):
+            mixed = (keys * _GOLDEN) >> np.uint64(32)
+        return (mixed % np.uint64(self.shard_count)).astype(np.intp)
+
+    def _split(self, keys: np.ndarray) -> list[tuple[int, np.ndarray]]:
+        """Row positions of ``keys`` per non-empty shard."""
+        owners = self.shard_of(keys)
+        return [
+            (shard, rows)
+            for shard in range(self.shard_count)
+            if len(rows := np.flatnonzero(owners == shard))
+        ]
+
+    def _map(self, func, *args_per_shard) -> list:
+        """Run ``func`` for each argument tuple in parallel, in order."""
+        if len(args_per_shard) == 1:
+            return [func(*args_per_shard[0])]
+        futures = [self.executor.submit(func, *args) for args in args_per_shard]
+        return [future.result() for future in futures]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def __contains__(self, key: int) -> bool:
+        shard = int(self.shard_of(np.array([key], dtype=np.uint64))[0])
+        return key in self.shards[shard]
+
+    @property
+    def ndim(self) -> int:
+        return self.shards[0].ndim
+
+    @property
+    def connectivity(self) -> int:
+        return self.shards[0].connectivity
+
+    @property
+    def expansion_add(self) -> int:
+        return self.shards[0].expansion_add
+
+    @property
+    def memory_usage(self) -> int:
+        return sum(shard.memory_usage for shard in self.shards)
+
+    @property
+    def nodes(self) -> int:
+        """Graph nodes, including removed entries not yet compacted."""
+        return sum(shard.stats.nodes for shard in self.shards)
+
+    def dead_entries(self, shard: int) -> int:
+        """Removed entries still occupying graph nodes of one shard."""
+        index = self.shards[shard]
+        return max(0, index.stats.nodes - len(index))
+
+    @property
+    def keys(self) -> np.ndarray:
+        if self.shard_count == 1:
+            return np.asarray(self.shards[0].keys, dtype=np.uint64)
+        return np.concatenate([self.shard_keys(shard) for shard in range(self.shard_count)])
+
+    def shard_keys(self, shard: int) -> np.ndarray:
+        """Keys stored in one shard."""
+        return np.asarray(self.shards[shard].keys, dtype=np.uint64)
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        keys = np.asarray(keys, dtype=np.uint64)
+        found = np.zeros(len(keys), dtype=bool)
+        for shard, rows in self._split(keys):
+            found[rows] = np.asarray(self.shards[shard].contains(keys[rows]), dtype=bool)
+        return found
+
+    def get(self, keys: np.ndarray, dtype=np.float32) -> np.ndarray:
+        keys = np.asarray(keys, dtype=np.uint64)
+        if self.shard_count == 1:
+            return self.shards[0].get(keys, dtype=dtype)
+        rows = np.empty((len(keys), self.ndim), dtype=dtype)
+        for shard, positions in self._split(keys):
+            rows[positions] = self.shards[shard].get(keys[positions], dtype=dtype)
+        return rows
+
+    def add(self, keys: np.ndarray, vectors: np.ndarray, threads: int = 0):
+        keys = np.asarray(keys, dtype=np.uint64)
+        groups = self._split(keys)
+        self.dirty.update(shard for shard, _ in groups)
+        if not groups:
+            return
+        if len(groups) == 1:
+            self.shards[groups[0][0]].add(keys, vectors, threads=threads)
+            return
+
+        # Shards insert concurrently; split the cores between them
+        if not threads:
+            threads = max(1, (os.cpu_count() or 1) // len(groups))
+        self._map(
+            lambda shard, rows: self.shards[shard].add(keys[rows], vectors[rows], threads=threads),
+            *groups,
+        )
+
+    def remove(self, keys):
+        if np.isscalar(keys):
+            keys = np.array([keys], dtype=np.uint64)
+        keys = np.asarray(keys, dtype=np.uint64)
+        for shard, rows in self._split(keys):
+            self.shards[shard].remove(keys[rows])
+            self.dirty.add(shard)
+
+    def rename(self, old_keys: np.ndarray, new_keys: np.ndarray):
+        old_keys = np.asarray(old_keys, dtype=np.uint64)
+        new_keys = np.asarray(new_keys, dtype=np.uint64)
+        if self.shard_count == 1:
+            self.shards[0].rename(old_keys, new_keys)
+            self.dirty.add(0)
+            return
+
+        # A new key may belong to another shard: move the vectors
+        if not len(old_keys):
+            return
+        vectors = self.get(old_keys)
+        self.remove(old_keys)
+        self.add(new_keys, vectors)
+
+    def search(self, queries: np.ndarray, count: int, threads: int = 0):
+        """
+        Search every shard and merge the per-shard neighbors.
+
+        Args:
+            queries: One query vector, or a matrix of queries
+            count: Neighbors per query
+            threads: Threads per shard for batch searches (0 = uSearch default)
+
+        Returns:
+            Matches-like (keys, distances) for a single query or a one-row
+            batch, like uSearch; otherwise (keys, distances, counts) arrays
+        """
+        if self.shard_count == 1:
+            return self.shards[0].search(queries, count, threads=threads)
+
+        batch = queries.ndim == 2 and len(queries) > 1
+        if not batch:
+            query = queries.reshape(-1)
+            parts = self._map(
+                lambda shard: shard.search(query, count), *[(shard,) for shard in self.shards]
+            )
+            keys = np.concatenate([np.asarray(part.keys, dtype=np.uint64) for part in parts])
+            distances = np.concatenate([np.asarray(part.distances, dtype=np.float32) for part in parts])
+            order = np.argsort(distances, kind="stable")[:count]
+            return ShardMatches(keys[order], distances[order])
+
+        parts = self._map(
+            lambda shard: shard.search(queries, count, threads=threads),
+            *[(shard,) for shard in self.shards],
+        )
+        keys = np.concatenate([part.keys for part in parts], axis=1).astype(np.uint64)
+        distances = np.concatenate([part.distances for part in parts], axis=1).astype(np.float32)
+        # Padding slots past each shard's count must not win the merge
+        valid = np.concatenate(
+            [np.arange(part.keys.shape[1]) < part.counts[:, None] for part in parts], axis=1
+        )
+        distances[~valid] = np.inf
+        order = np.argsort(distances, axis=1, kind="stable")[:, :count]
+        counts = np.minimum(valid.sum(axis=1), count)
+        return ShardBatchMatches(
+            np.take_along_axis(keys, order, axis=1),
+            np.take_along_axis(distances, order, axis=1),
+            counts,
+        )
+
+    def copy(self) -> "ShardedIndex":
+        """Private in-memory copy (of mapped shards, too)."""
+        copied = ShardedIndex([shard.copy() for shard in self.shards], self.executor)
+        copied.dirty = set(self.dirty)
+        return copied
+
+    def save_dirty(self, files: list[Path]) -> list[int]:
+        """
+        Serialize the shards changed since the last call, for a snapshot.
+
+        Shards are written straight to ``files[shard]`` in parallel, without
+        an in-memory copy, so the caller must hold writers off meanwhile.
+        The shards are marked clean; if the snapshot fails, hand them back
+        with ``mark_dirty``.
+
+        Returns:
+            The shards written
+        """
+        dirty = sorted(self.dirty)
+        self.dirty.clear()
+        try:
+            self._map(
+                lambda shard: self.shards[shard].save(str(files[shard])),
+                *[(shard,) for shard in dirty],
+            )
+        except Exception:
+            self.dirty.update(dirty)
+            raise
+        return dirty
+
+    def mark_dirty(self, shards):
+        """Flag shards as changed since the last snapshot."""
+        self.dirty.update(shards)
+
+    def replace(self, shard: int, index: Index):
+        """Swap in a rebuilt shard."""
+        self.shards[shard] = index
+        self.dirty.add(shard)
@@ -0,0 +1,88 @@
+"""
+Full-precision vector store.
+Keeps float32 copies of indexed vectors in a memory-mapped file.
+"""
+
+import logging
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStore:
+    """
+    Memory-mapped float32 matrix addressed by uSearch key.
+
+    Quantized indexes (i8, b1) cannot return the vectors they were built
+    from, so this store keeps the original float32 rows on disk for exact
+    rescoring. Rows are indexed by key like the MetadataStore; the file grows
+    by doubling and unused rows stay zero (sparse on most filesystems).
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, path: Path, dimensions: int):
+        """
+        Open or create a vector store.
+
+        Args:
+            path: File holding the raw float32 rows
+            dimensions: Vector dimensions
+        """
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self.row_bytes = dimensions * np.dtype(np.float32).itemsize
+
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.truncate(self.INITIAL_CAPACITY * self.row_bytes)
+        self._map()
+
+    def _map(self):
+        """Map the whole file as a (capacity, dimensions) matrix."""
+        capacity = self.path.stat().st_size // self.row_bytes
+        self._data = np.memmap(
+            self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dimensions)
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows the file can currently hold."""
+        return self._data.shape[0]
+
+    def _reserve(self, rows: int):
+        """Grow the file to hold at least ``rows`` rows."""
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, self.capacity * 2)
+        self._data.flush()
+        with open(self.path, "r+b") as f:
+            f.truncate(capacity * self.row_bytes)
+        self._map()
+
+    def put(self, keys: np.ndarray, vectors: np.ndarray):
+        """Write the rows of the given keys."""
+        if not len(keys):
+            return
+        self._reserve(int(keys.max()) + 1)
+        self._data[keys.astype(np.intp)] = vectors
+
+    def get(self, keys: np.ndarray) -> np.ndarray:
+        """Read the rows of the given keys as a new contiguous matrix."""
+        rows = keys.astype(np.intp)
+        if len(rows) and int(rows.max()) >= self.capacity:
+            raise KeyError(f"Key {int(rows.max())} is out of range")
+        return self._data[rows]
+
+    def flush(self):
+        """Flush written rows to disk."""
+        self._data.flush()
+
+    def destroy(self):
+        """Delete the store from disk."""
+        del self._data
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,209 @@
+"""
+Write-ahead log for index mutations.
+Append-only record of adds and deletes since the last snapshot.
+"""
+
+import os
+import json
+import zlib
+import struct
+import asyncio
+import logging
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Record frame: payload length, crc32 of the payload
+_FRAME = struct.Struct("<II")
+# Payload prefix: length of the JSON header that precedes the vector bytes
+_HEADER = struct.Struct("<I")
+
+
+class WriteAheadLog:
+    """
+    Append-only log of add/delete operations for one index.
+
+    Each record is framed with its length and crc32; a torn or corrupt tail
+    left by a crash is cut off when the log is opened. ``append`` writes a
+    record to the OS, ``commit`` makes it durable. Concurrent commits share
+    one fsync (group commit), so the cost per batch is a small sequential
+    write.
+
+    When a snapshot starts, ``rotate`` moves the active file aside as a
+    numbered segment (``{name}.wal.{seq}``) and new records go to a fresh
+    active file; once the snapshot is committed, ``release`` deletes the
+    segments it covers. Replay reads the segments in order, then the active
+    file.
+    """
+
+    def __init__(self, path: Path, sync: bool = True):
+        """
+        Open or create a log.
+
+        Args:
+            path: Log file
+            sync: fsync on commit (False leaves flushing to the OS)
+        """
+        self.path = Path(path)
+        self.sync = sync
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Drop a torn tail so new records follow the last valid one
+        end = 0
+        if self.path.exists():
+            for end, _ in self._scan(self.path.read_bytes()):
+                pass
+            if end != self.path.stat().st_size:
+                logger.warning(f"Truncating torn write-ahead log tail in '{self.path}'")
+                os.truncate(self.path, end)
+
+        self._fd = self._open()
+        self.size = end
+        self._retired: list[tuple[int, int]] = []  # (segment seq, fd) awaiting release
+        self._written = 0
+        self._synced = 0
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def _open(self) -> int:
+        """Open the active file for appending."""
+        return os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def segments(self) -> list[tuple[int, Path]]:
+        """Rotated segments not yet released, oldest first."""
+        segments = []
+        for path in self.path.parent.glob(f"{self.path.name}.*"):
+            suffix = path.name[len(self.path.name) + 1:]
+            if suffix.isdigit():
+                segments.append((int(suffix), path))
+        return sorted(segments)
+
+    @staticmethod
+    def _scan(data: bytes) -> Iterator[tuple[int, bytes]]:
+        """Yield (end offset, payload) of every valid record."""
+        offset = 0
+        while offset + _FRAME.size <= len(data):
+            length, crc = _FRAME.unpack_from(data, offset)
+            start = offset + _FRAME.size
+            payload = data[start:start + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                return
+            offset = start + length
+            yield offset, payload
+
+    def append(
+        self,
+        op: str,
+        item_ids: list[str],
+        vectors: Optional[np.ndarray] = None,
+        metadatas: Optional[list[Optional[dict]]] = None,
+        contents: Optional[list[Optional[str]]] = None,
+    ):
+        """
+        Write one operation to the log (not yet durable, see ``commit``).
+
+        Args:
+            op: "add" or "delete"
+            item_ids: Affected item IDs
+            vectors: float32 matrix aligned with item_ids (add only)
+            metadatas: Metadata aligned with item_ids (add only)
+            contents: Texts aligned with item_ids (add only)
+        """
+        header = {"op": op, "ids": item_ids, "metadatas": metadatas}
+        if contents is not None and any(contents):
+            header["contents"] = contents
+        body = b""
+        if vectors is not None:
+            header["dims"] = int(vectors.shape[1])
+            body = np.ascontiguousarray(vectors, dtype=np.float32).tobytes()
+
+        encoded = json.dumps(header, default=str).encode("utf-8")
+        payload = _HEADER.pack(len(encoded)) + encoded + body
+        record = _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+        os.write(self._fd, record)
+        self.size += len(record)
+        self._written += 1
+
+    async def commit(self):
+        """Wait until every appended record is on disk."""
+        if not self.sync:
+            return
+        target = self._written
+        while self._synced < target:
+            if self._sync_task is None or self._sync_task.done():
+                self._sync_task = asyncio.get_running_loop().create_task(self._fsync())
+            await asyncio.shield(self._sync_task)
+
+    async def _fsync(self):
+        """One fsync covering all records written so far."""
+        upto = self._written
+        fds = [self._fd, *(fd for _, fd in self._retired)]
+
+        def sync():
+            for fd in fds:
+                os.fsync(fd)
+
+        await asyncio.to_thread(sync)
+        self._synced = max(self._synced, upto)
+
+    def rotate(self) -> int:
+        """
+        Move the active file aside as a new segment.
+
+        Returns:
+            Sequence number of the segment, to be passed to ``release``
+        """
+        segments = self.segments()
+        seq = segments[-1][0] + 1 if segments else 1
+        os.rename(self.path, self.path.with_name(f"{self.path.name}.{seq}"))
+        self._retired.append((seq, self._fd))
+        self._fd = self._open()
+        self.size = 0
+        return seq
+
+    async def release(self, seq: int):
+        """Delete the segments up to ``seq`` once a snapshot covers them."""
+        # An fsync in flight may still use the retired descriptors
+        if self._sync_task is not None and not self._sync_task.done():
+            await asyncio.shield(self._sync_task)
+
+        for segment, fd in [entry for entry in self._retired if entry[0] <= seq]:
+            os.close(fd)
+            self._retired.remove((segment, fd))
+        for segment, path in self.segments():
+            if segment <= seq:
+                path.unlink()
+
+    def records(
+        self,
+    ) -> Iterator[tuple[str, list[str], Optional[np.ndarray], Optional[list], Optional[list]]]:
+        """Yield (op, item_ids, vectors, metadatas, contents) for every logged operation."""
+        files = [path for _, path in self.segments()] + [self.path]
+        for payload in (payload for path in files for _, payload in self._scan(path.read_bytes())):
+            (length,) = _HEADER.unpack_from(payload)
+            header = json.loads(payload[_HEADER.size:_HEADER.size + length])
+            vectors = None
+            if "dims" in header:
+                # Copy: the JSON header leaves the floats unaligned, which uSearch rejects
+                vectors = np.frombuffer(
+                    payload, dtype=np.float32, offset=_HEADER.size + length
+                ).reshape(-1, header["dims"]).copy()
+            yield header["op"], header["ids"], vectors, header["metadatas"], header.get("contents")
+
+    def close(self):
+        """Close the log files."""
+        os.close(self._fd)
+        for _, fd in self._retired:
+            os.close(fd)
+        self._retired = []
+
+    def destroy(self):
+        """Close and delete the log and its segments."""
+        self.close()
+        for _, path in self.segments():
+            path.unlink()
+        if self.path.exists():
+            self.path.unlink()
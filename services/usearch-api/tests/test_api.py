@@ -2,6 +2,11 @@
 Tests for uSearch API endpoints.
 """
 
+import io
+import json
+import time
+
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, patch
@@ -18,6 +23,7 @@ def client():
         "EMBEDDING_PROVIDER": "openai",
         "OPENAI_API_KEY": "test-openai-key",
         "INDEX_PATH": "/tmp/test_indexes",
+        "JOBS_PATH": "/tmp/test_jobs",
     }):
         from app.main import app
         with TestClient(app) as client:
@@ -48,6 +54,15 @@ class TestHealthEndpoints:
         )
         assert response.status_code == 200
 
+    def test_metrics(self, client):
+        """Metrics endpoint should expose Prometheus text without auth."""
+        client.get("/health")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'usearch_http_requests_total{endpoint="/health",method="GET",status="200"}' in response.text
+        assert "# TYPE usearch_event_loop_lag_seconds histogram" in response.text
+
 
 class TestSearchEndpoints:
     """Test search-related endpoints."""
@@ -69,6 +84,44 @@ class TestSearchEndpoints:
         )
         assert response.status_code == 422
 
+    def test_hybrid_search_validation(self, client):
+        """Hybrid text weight should be bounded."""
+        response = client.post(
+            "/search",
+            headers={"X-API-Key": "test-key"},
+            json={"query": "1.A.3.b", "index": "factors", "hybrid": True, "text_weight": 1.5}
+        )
+        assert response.status_code == 422
+
+    def test_batch_search_validation(self, client):
+        """Batch search should take either queries or vectors, not both."""
+        response = client.post(
+            "/search/batch",
+            headers={"X-API-Key": "test-key"},
+            json={"index": "factors", "queries": ["diesel"], "vectors": [[0.1, 0.2]]}
+        )
+        assert response.status_code == 422
+
+    def test_vector_search_ef_bounds(self, client):
+        """ef on /search/vector should be validated like the JSON endpoints."""
+        for ef in (0, 5000):
+            response = client.post(
+                "/search/vector",
+                headers={"X-API-Key": "test-key"},
+                params={"index": "test", "ef": ef},
+                json=[0.1, 0.2, 0.3, 0.4],
+            )
+            assert response.status_code == 422
+
+    def test_batch_search_per_query_lengths(self, client):
+        """Per-query parameters must match the number of queries."""
+        response = client.post(
+            "/search/batch",
+            headers={"X-API-Key": "test-key"},
+            json={"index": "factors", "queries": ["diesel", "petrol"], "top_k": [5]}
+        )
+        assert response.status_code == 422
+
 
 class TestIndexEndpoints:
     """Test indexing endpoints."""
@@ -83,6 +136,16 @@ class TestIndexEndpoints:
         # May fail if services not fully mocked, but should not be 401
         assert response.status_code != 401
 
+    def test_create_index_bounds(self, client):
+        """Out-of-range HNSW and shard parameters should be rejected with 422."""
+        for params in ({"shards": 1000}, {"connectivity": 1000}, {"expansion_add": 0}):
+            response = client.post(
+                "/indexes/bounds_test",
+                headers={"X-API-Key": "test-key"},
+                params={"dimensions": 4, **params},
+            )
+            assert response.status_code == 422
+
     def test_list_indexes(self, client):
         """Should list available indexes."""
         response = client.get(
@@ -91,6 +154,128 @@ class TestIndexEndpoints:
         )
         assert response.status_code == 200
 
+    def test_binary_vector_round_trip(self, client):
+        """Raw float32 and .npy bodies should index and search like JSON arrays."""
+        headers = {"X-API-Key": "test-key"}
+        client.delete("/indexes/binary_test", headers=headers)
+        client.post("/indexes/binary_test", headers=headers, params={"dimensions": 4})
+
+        vector = np.array([0.1, 0.2, 0.3, 0.4], dtype="<f4")
+        response = client.post(
+            "/index/vector",
+            headers={**headers, "Content-Type": "application/octet-stream", "X-Metadata": '{"kind": "raw"}'},
+            params={"index": "binary_test", "id": "raw"},
+            content=vector.tobytes(),
+        )
+        assert response.status_code == 200
+        response = client.post(
+            "/index/vector",
+            headers=headers,
+            params={"index": "binary_test", "id": "json"},
+            json={"vector": [0.4, 0.3, 0.2, 0.1], "metadata": {"kind": "json"}},
+        )
+        assert response.status_code == 200
+
+        stream = io.BytesIO()
+        np.save(stream, vector)
+        response = client.post(
+            "/search/vector",
+            headers={**headers, "Content-Type": "application/x-npy"},
+            params={"index": "binary_test", "top_k": 1},
+            content=stream.getvalue(),
+        )
+        assert response.status_code == 200
+        hit = response.json()["results"][0]
+        assert hit["id"] == "raw" and hit["metadata"] == {"kind": "raw"}
+
+        response = client.post(
+            "/search/vector",
+            headers={**headers, "Content-Type": "application/octet-stream"},
+            params={"index": "binary_test"},
+            content=b"\x00" * 6,
+        )
+        assert response.status_code == 422
+        client.delete("/indexes/binary_test", headers=headers)
+
+    def test_batch_index(self, client):
+        """Batches should embed the items' content and index it for hybrid search."""
+        import app.main as main
+
+        headers = {"X-API-Key": "test-key"}
+        client.delete("/indexes/batch_test", headers=headers)
+        items = [{"id": f"b{i}", "content": f"Diesel truck {i}", "metadata": {"i": i}} for i in range(150)]
+
+        async def embed(texts):
+            return np.random.default_rng(len(texts)).random((len(texts), 8), dtype=np.float32)
+
+        with patch.object(main.embedding_service, "generate_embeddings_array", side_effect=embed) as mock:
+            response = client.post(
+                "/index/batch", headers=headers, json={"index": "batch_test", "items": items}
+            )
+        assert response.status_code == 200
+        assert response.json()["indexed"] == 150
+        assert [len(call.args[0]) for call in mock.call_args_list] == [100, 50]
+        assert len(main.search_engine.lexical["batch_test"]) == 150
+        client.delete("/indexes/batch_test", headers=headers)
+
+    def test_stream_index(self, client):
+        """NDJSON uploads should stream progress and end with a summary."""
+        headers = {"X-API-Key": "test-key", "Content-Type": "application/x-ndjson"}
+        client.delete("/indexes/stream_test", headers={"X-API-Key": "test-key"})
+        lines = [
+            json.dumps({"id": f"v{i}", "vector": [float(i), 1.0, 0.5, 0.25], "metadata": {"i": i}})
+            for i in range(25)
+        ]
+        response = client.post(
+            "/index/stream",
+            headers=headers,
+            params={"index": "stream_test", "batch_size": 10},
+            content="\n".join(lines + ['{"id": "bad"}']),
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert events[-1]["event"] == "done"
+        assert events[-1]["indexed"] == 25
+        assert events[-1]["failed"] == 1
+        assert events[-1]["errors"][0]["line"] == 26
+        client.delete("/indexes/stream_test", headers={"X-API-Key": "test-key"})
+
+
+class TestJobEndpoints:
+    """Test background indexing job endpoints."""
+
+    def test_submit_and_poll_job(self, client):
+        """A submitted job should be pollable until it completes."""
+        headers = {"X-API-Key": "test-key"}
+        response = client.post(
+            "/jobs/index",
+            headers=headers,
+            json={"index": "job_test", "items": [{"id": "a", "vector": [0.1, 0.2, 0.3, 0.4]}]},
+        )
+        assert response.status_code == 202
+        job = response.json()
+        assert job["state"] == "queued" and job["total"] == 1
+
+        for _ in range(100):
+            status = client.get(f"/jobs/{job['id']}", headers=headers).json()
+            if status["state"] == "completed":
+                break
+            time.sleep(0.01)
+        assert status["state"] == "completed" and status["indexed"] == 1
+        assert client.get("/jobs/unknown", headers=headers).status_code == 404
+        client.delete("/indexes/job_test", headers=headers)
+
+    def test_job_requires_payload(self, client):
+        """Job items need content or a vector."""
+        response = client.post(
+            "/jobs/index",
+            headers={"X-API-Key": "test-key"},
+            json={"index": "job_test", "items": [{"id": "a"}]},
+        )
+        assert response.status_code == 422
+
 
 class TestEmbeddingEndpoints:
     """Test embedding generation endpoints."""
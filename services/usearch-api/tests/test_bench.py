@@ -0,0 +1,33 @@
+"""
+Tests for the benchmark suite.
+"""
+
+import json
+
+from app.bench import synthetic_dataset
+from app.bench.__main__ import main
+
+
+def test_synthetic_dataset_shapes():
+    """Synthetic data should have the requested shapes and dtype."""
+    vectors, queries = synthetic_dataset(100, 10, dimensions=384, seed=1)
+    assert vectors.shape == (100, 384) and queries.shape == (10, 384)
+    assert vectors.dtype == queries.dtype == "float32"
+
+
+def test_report(tmp_path):
+    """A small run should produce a complete JSON report."""
+    output = tmp_path / "report.json"
+    main([
+        "--dimensions", "32", "--count", "300", "--queries", "20",
+        "--batch-size", "100", "--search-batch", "8",
+        "--selectivities", "0.5,0.01", "--output", str(output), "--quiet",
+    ])
+
+    report = json.loads(output.read_text())
+    results = report["results"]
+    assert report["config"]["vectors"] == 300
+    assert set(results) == {"ingest", "search", "batch_search", "filtered_search", "memory", "persistence"}
+    assert 0.0 <= results["search"]["recall_at_10"] <= 1.0
+    assert [run["selectivity"] for run in results["filtered_search"]] == [0.5, 0.01]
+    assert results["persistence"]["loaded_vectors"] == 300
@@ -0,0 +1,51 @@
+"""
+Tests for binary vector encoding.
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+from app.codec import NPY, RAW_FLOAT32, binary_accept, decode_vectors, encode_vectors
+
+
+class TestCodec:
+    """Test raw float32 and .npy payloads."""
+
+    def test_raw_round_trip_without_copy(self):
+        """Raw payloads should be viewed in place."""
+        vector = np.arange(8, dtype="<f4")
+        body = bytes(encode_vectors(vector, RAW_FLOAT32))
+        decoded = decode_vectors(body, RAW_FLOAT32)
+        assert decoded.dtype == np.float32
+        np.testing.assert_array_equal(decoded, vector)
+        assert not decoded.flags.owndata
+
+    def test_npy_keeps_shape(self):
+        """.npy payloads should keep their shape and convert other dtypes."""
+        matrix = np.arange(12, dtype=np.float64).reshape(3, 4)
+        stream = io.BytesIO()
+        np.save(stream, matrix)
+        decoded = decode_vectors(stream.getvalue(), NPY)
+        assert decoded.dtype == np.float32
+        np.testing.assert_array_equal(decoded, matrix)
+
+        encoded = np.load(io.BytesIO(bytes(encode_vectors(matrix, NPY))))
+        assert encoded.dtype == np.float32 and encoded.shape == (3, 4)
+
+    def test_invalid_payloads(self):
+        """Truncated or misaligned payloads should be rejected."""
+        with pytest.raises(ValueError):
+            decode_vectors(b"\x00" * 6, RAW_FLOAT32)
+        stream = io.BytesIO()
+        np.save(stream, np.ones((4, 4), dtype=np.float32))
+        with pytest.raises(ValueError):
+            decode_vectors(stream.getvalue()[:-8], NPY)
+
+    def test_binary_accept(self):
+        """Accept negotiation should pick a binary type when listed."""
+        assert binary_accept("application/x-npy, application/json;q=0.5") == NPY
+        assert binary_accept("application/octet-stream") == RAW_FLOAT32
+        assert binary_accept("application/json") is None
+        assert binary_accept(None) is None
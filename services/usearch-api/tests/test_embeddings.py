@@ -0,0 +1,329 @@
+"""
+Tests for the embedding service and its cache.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import numpy as np
+import pytest
+
+from app.cache import EmbeddingCache
+from app.embeddings import EmbeddingService
+from app.local import LocalEncoder
+from app.pipeline import BatchPipeline, parse_duration
+
+
+def run(coro):
+    """Run a coroutine to completion."""
+    return asyncio.run(coro)
+
+
+class FakeProvider:
+    """OpenAI-compatible embeddings endpoint served through httpx.MockTransport."""
+
+    def __init__(self, dimensions: int = 8):
+        self.dimensions = dimensions
+        self.requests: list[list[str]] = []
+
+    def embed(self, text: str) -> list[float]:
+        return [float(len(text) + i) for i in range(self.dimensions)]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        inputs = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+        self.requests.append(inputs)
+        return httpx.Response(200, json={
+            "data": [
+                {"index": i, "embedding": self.embed(text)} for i, text in enumerate(inputs)
+            ],
+        })
+
+
+@pytest.fixture
+def provider():
+    return FakeProvider()
+
+
+def make_service(provider: FakeProvider, cache=None) -> EmbeddingService:
+    """Create an OpenAI embedding service talking to the fake provider."""
+    service = EmbeddingService(provider="openai", api_key="test", cache=cache)
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(provider.handler))
+    return service
+
+
+class TestEmbeddingCache:
+    """Test the two-tier embedding cache."""
+
+    def test_repeated_query_skips_provider(self, provider, tmp_path):
+        """A cached text should not trigger a second provider call."""
+        service = make_service(provider, EmbeddingCache(str(tmp_path)))
+
+        first = run(service.generate_embedding("diesel fuel"))
+        second = run(service.generate_embedding("diesel fuel"))
+
+        assert first == second == provider.embed("diesel fuel")
+        assert len(provider.requests) == 1
+        assert service.cache.stats()["memory_hits"] == 1
+
+    def test_batch_only_embeds_misses(self, provider, tmp_path):
+        """Batches should send only uncached, distinct texts to the provider."""
+        service = make_service(provider, EmbeddingCache(str(tmp_path)))
+        run(service.generate_embedding("a"))
+
+        embeddings = run(service.generate_embeddings_batch(["a", "bb", "bb", "ccc"]))
+
+        assert embeddings == [provider.embed(t) for t in ["a", "bb", "bb", "ccc"]]
+        assert provider.requests[-1] == ["bb", "ccc"]
+
+    def test_disk_tier_survives_restart(self, provider, tmp_path):
+        """A new cache on the same directory should serve earlier embeddings."""
+        run(make_service(provider, EmbeddingCache(str(tmp_path))).generate_embeddings_batch(["x", "yy"]))
+
+        restarted = make_service(provider, EmbeddingCache(str(tmp_path)))
+        assert run(restarted.generate_embedding("yy")) == provider.embed("yy")
+        assert len(provider.requests) == 1
+        assert restarted.cache.stats()["disk_hits"] == 1
+
+    def test_models_do_not_share_entries(self, tmp_path):
+        """Entries are keyed by provider and model as well as text."""
+        cache = EmbeddingCache(str(tmp_path), max_entries=1)
+        cache.put("openai", "small", "text", [1.0, 2.0])
+
+        assert cache.get("openai", "large", "text") is None
+        assert cache.get("openai", "small", "text").tolist() == [1.0, 2.0]
+
+    def test_workers_share_disk_tier(self, tmp_path):
+        """Caches of two workers on one directory should not mix up rows."""
+        first = EmbeddingCache(str(tmp_path), max_entries=1)
+        second = EmbeddingCache(str(tmp_path), max_entries=1)
+        first.put("openai", "small", "a", [1.0, 1.0])
+        second.put("openai", "small", "b", [2.0, 2.0])
+        first.put_many("openai", "small", ["c", "b"], np.array([[3.0, 3.0], [2.0, 2.0]]))
+
+        for cache in (first, second, EmbeddingCache(str(tmp_path), max_entries=1)):
+            assert cache.get("openai", "small", "a").tolist() == [1.0, 1.0]
+            assert cache.get("openai", "small", "b").tolist() == [2.0, 2.0]
+            assert cache.get("openai", "small", "c").tolist() == [3.0, 3.0]
+        assert (tmp_path / "openai-small.cache").stat().st_size == 3 * (32 + 2 * 4)
+
+
+class TestMicroBatching:
+    """Test coalescing of concurrent single-text requests."""
+
+    def test_concurrent_requests_share_one_call(self, provider):
+        """Concurrent requests should be sent as one de-duplicated batch."""
+        service = make_service(provider)
+
+        async def burst():
+            texts = ["gas", "coal", "gas", "electricity"]
+            return await asyncio.gather(*(service.generate_embedding(t) for t in texts))
+
+        results = run(burst())
+
+        assert results == [provider.embed(t) for t in ["gas", "coal", "gas", "electricity"]]
+        assert provider.requests == [["gas", "coal", "electricity"]]
+        assert service.batcher.stats()["deduplicated"] == 1
+
+    def test_batches_respect_max_size(self, provider):
+        """More concurrent texts than the batch size should split into batches."""
+        service = EmbeddingService(provider="openai", api_key="test", batch_max_size=2)
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(provider.handler))
+
+        async def burst():
+            return await asyncio.gather(*(service.generate_embedding(str(i)) for i in range(5)))
+
+        run(burst())
+        assert sorted(len(batch) for batch in provider.requests) == [1, 2, 2]
+
+    def test_provider_errors_reach_every_waiter(self):
+        """A failed batch should raise in each coalesced caller."""
+        service = EmbeddingService(provider="openai", api_key="test", max_retries=0)
+        service.client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(500))
+        )
+
+        async def burst():
+            return await asyncio.gather(
+                service.generate_embedding("a"),
+                service.generate_embedding("b"),
+                return_exceptions=True,
+            )
+
+        assert all(isinstance(r, httpx.HTTPStatusError) for r in run(burst()))
+
+
+class TestBatchPipeline:
+    """Test the concurrent, rate-limit-aware batch pipeline."""
+
+    def test_chunks_respect_item_and_token_limits(self):
+        """Sub-batches should stay within both the item and token budget."""
+        pipeline = BatchPipeline(send=None, parse=None, max_items=3, max_tokens=10)
+        texts = ["a", "b", "c", "d", "x" * 30, "e"]
+
+        chunks = pipeline.chunk(texts)
+
+        assert [batch for _, batch in chunks] == [["a", "b", "c"], ["d"], ["x" * 30], ["e"]]
+        assert [offset for offset, _ in chunks] == [0, 3, 4, 5]
+
+    def test_parse_duration(self):
+        """Reset headers should parse in seconds and Go duration formats."""
+        assert parse_duration("2") == 2.0
+        assert parse_duration("250ms") == 0.25
+        assert parse_duration("6m0s") == 360.0
+        assert parse_duration("soon") is None
+
+    def test_concurrency_is_bounded(self, provider):
+        """No more than max_concurrency sub-batches should be in flight."""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return provider.handler(request)
+
+        service = EmbeddingService(provider="openai", api_key="test", max_concurrency=3)
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        service._pipeline("openai").max_items = 2
+
+        texts = [f"text {i}" for i in range(20)]
+        embeddings = run(service.generate_embeddings_batch(texts))
+
+        assert embeddings == [provider.embed(t) for t in texts]
+        assert len(provider.requests) == 10
+        assert 1 < peak <= 3
+
+    def test_rate_limited_sub_batch_is_retried_alone(self, provider):
+        """A 429 should only resend the affected sub-batch, after Retry-After."""
+        rejected = set()
+
+        def handler(request):
+            inputs = json.loads(request.content)["input"]
+            if "b" in inputs and "b" not in rejected:
+                rejected.add("b")
+                return httpx.Response(429, headers={"retry-after-ms": "10"})
+            return provider.handler(request)
+
+        service = EmbeddingService(provider="openai", api_key="test")
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        pipeline = service._pipeline("openai")
+        pipeline.max_items = 1
+
+        embeddings = run(service.generate_embeddings_batch(["a", "b", "c"]))
+
+        assert embeddings == [provider.embed(t) for t in ["a", "b", "c"]]
+        assert sorted(map(tuple, provider.requests)) == [("a",), ("b",), ("c",)]
+        assert pipeline.stats()["retries"] == 1
+
+    def test_oversized_batch_is_split(self, provider):
+        """A sub-batch rejected as too large should be split and retried."""
+        def handler(request):
+            if len(json.loads(request.content)["input"]) > 2:
+                return httpx.Response(400, json={"error": "too many tokens"})
+            return provider.handler(request)
+
+        service = EmbeddingService(provider="openai", api_key="test")
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        texts = ["a", "b", "c", "d", "e"]
+        embeddings = run(service.generate_embeddings_batch(texts))
+
+        assert embeddings == [provider.embed(t) for t in texts]
+        assert all(len(batch) <= 2 for batch in provider.requests)
+
+    def test_invalid_input_is_not_split(self):
+        """A 400 that is not about size should fail without splitting."""
+        requests = []
+
+        def handler(request):
+            requests.append(json.loads(request.content)["input"])
+            return httpx.Response(400, json={"error": {"message": "'$.input' is invalid"}})
+
+        service = EmbeddingService(provider="openai", api_key="test")
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            run(service.generate_embeddings_batch(["a", "b", "c", "d"]))
+        assert len(requests) == 1
+
+    def test_failure_cancels_other_sub_batches(self, provider):
+        """The first failed sub-batch should cancel the ones still in flight."""
+        finished = []
+
+        async def handler(request):
+            inputs = json.loads(request.content)["input"]
+            if inputs == ["bad"]:
+                return httpx.Response(401, json={"error": "invalid api key"})
+            await asyncio.sleep(0.2)
+            finished.append(inputs)
+            return provider.handler(request)
+
+        service = EmbeddingService(provider="openai", api_key="test")
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        service._pipeline("openai").max_items = 1
+
+        async def scenario():
+            with pytest.raises(httpx.HTTPStatusError):
+                await service.generate_embeddings_batch(["a", "bad", "c"])
+            await asyncio.sleep(0.3)
+
+        run(scenario())
+        assert finished == []
+
+
+class FakeModel:
+    """Stand-in for a SentenceTransformer with a slow, blocking encode."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batches: list[list[str]] = []
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 4
+
+    def encode(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return np.array([[len(t), 0, 0, 1] for t in texts], dtype=np.float32)
+
+
+class TestLocalEncoder:
+    """Test the non-blocking local embedding backend."""
+
+    def test_results_keep_input_order(self):
+        """Length-grouped batches should be scattered back in input order."""
+        encoder = LocalEncoder(FakeModel(), workers=2, batch_size=2)
+        texts = ["aaaa", "a", "aaa", "aa", "aaaaa"]
+
+        embeddings = run(encoder.encode(texts))
+
+        assert embeddings.dtype == np.float32
+        assert embeddings[:, 0].tolist() == [4, 1, 3, 2, 5]
+        assert sorted(map(sorted, encoder.model.batches)) == [["a", "aa"], ["aaa", "aaaa"], ["aaaaa"]]
+
+    def test_inference_does_not_block_event_loop(self):
+        """Other coroutines should keep running while a batch is encoded."""
+        encoder = LocalEncoder(FakeModel(delay=0.2), workers=1)
+        finished = []
+
+        async def encode():
+            await encoder.encode(["slow"])
+            finished.append("encode")
+
+        async def ticker():
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+            finished.append("ticker")
+
+        async def main():
+            await asyncio.gather(encode(), ticker())
+
+        run(main())
+        assert finished == ["ticker", "encode"]
+        encoder.close()
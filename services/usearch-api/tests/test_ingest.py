@@ -0,0 +1,139 @@
+"""
+Tests for streaming NDJSON ingestion.
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.ingest import StreamIngest
+from app.search import SearchEngine
+
+
+def run(coro):
+    """Run a coroutine to completion."""
+    return asyncio.run(coro)
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings; optionally blocked until released."""
+
+    def __init__(self, dims: int = 8, gate: asyncio.Event = None):
+        self.dims = dims
+        self.gate = gate
+        self.calls = 0
+
+    async def generate_embeddings_array(self, texts: list[str]) -> np.ndarray:
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        return np.stack([
+            np.random.default_rng(sum(map(ord, text))).random(self.dims, dtype=np.float32)
+            for text in texts
+        ])
+
+
+async def body(lines: list, chunk_size: int = 7):
+    """NDJSON body split into small, line-unaligned chunks."""
+    data = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines).encode()
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Create a search engine backed by a temporary directory."""
+    return SearchEngine(index_path=str(tmp_path), dimensions=8)
+
+
+class TestStreamIngest:
+    """Test the parse -> embed -> add pipeline."""
+
+    def test_mixed_items_and_errors(self, engine):
+        """Text and vector lines should be indexed; bad lines reported by number."""
+        vector = np.linspace(0, 1, 8, dtype=np.float32)
+        lines = [{"id": f"t{i}", "content": f"text {i}", "metadata": {"n": i}} for i in range(7)]
+        lines += [
+            {"id": "v0", "vector": vector.tolist()},
+            "{not json",
+            {"id": "neither", "metadata": {"n": 0}},
+            "",
+        ]
+        ingest = StreamIngest(engine, FakeEmbeddings(), "stream", batch_size=3)
+
+        async def scenario():
+            updates = [update async for update in ingest.run(body(lines))]
+            hits = await engine.search("stream", vector.tolist(), top_k=1)
+            return updates, hits
+
+        updates, hits = run(scenario())
+        summary = ingest.summary()
+        assert summary["indexed"] == 8
+        assert summary["failed"] == 2
+        assert summary["lines"] == 10
+        assert [error["line"] for error in summary["errors"]] == [9, 10]
+        assert updates and updates[-1]["indexed"] <= 8
+        assert hits[0].id == "v0"
+        assert engine.metadata["stream"].get(engine.keys["stream"].get("t3")) == {"n": 3}
+
+    def test_wrong_dimension_fails_only_its_line(self, engine):
+        """A vector of the wrong size should be rejected without its batch."""
+        lines = [
+            {"id": "a", "vector": [1.0] * 8},
+            "",
+            {"id": "short", "vector": [1.0] * 4},
+            {"id": "b", "vector": [0.5] * 8},
+        ]
+        ingest = StreamIngest(engine, FakeEmbeddings(), "stream", batch_size=10)
+
+        async def scenario():
+            return [update async for update in ingest.run(body(lines))]
+
+        run(scenario())
+        summary = ingest.summary()
+        assert summary["indexed"] == 2
+        assert summary["lines"] == 4
+        assert summary["errors"] == [
+            {"line": 3, "id": "short", "error": "vector: expected 8 dimensions, got 4"}
+        ]
+
+    def test_backpressure_bounds_reading(self, engine):
+        """A stalled embedding stage should stop the body from being read."""
+        consumed = 0
+
+        async def chunks():
+            nonlocal consumed
+            for i in range(1000):
+                consumed += 1
+                yield (json.dumps({"id": f"i{i}", "content": f"text {i}"}) + "\n").encode()
+
+        async def scenario():
+            gate = asyncio.Event()
+            ingest = StreamIngest(engine, FakeEmbeddings(gate=gate), "stream", batch_size=10, queue_depth=1)
+
+            async def consume():
+                return [update async for update in ingest.run(chunks())]
+
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.05)
+            stalled = consumed
+            gate.set()
+            await task
+            return stalled, ingest.indexed
+
+        stalled, indexed = run(scenario())
+        # One batch embedding, one queued, one being filled
+        assert stalled <= 40
+        assert indexed == 1000
+
+    def test_oversized_line_fails(self, engine):
+        """A line longer than max_line_bytes should abort the ingest."""
+        ingest = StreamIngest(engine, FakeEmbeddings(), "stream", max_line_bytes=16)
+
+        async def scenario():
+            return [update async for update in ingest.run(body([{"id": "x", "content": "y" * 64}]))]
+
+        with pytest.raises(ValueError, match="exceeds"):
+            run(scenario())
@@ -0,0 +1,138 @@
+"""
+Tests for background indexing jobs.
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.jobs import JobQueue
+from app.models import StreamIndexItem
+from app.search import SearchEngine
+
+
+def run(coro):
+    """Run a coroutine to completion."""
+    return asyncio.run(coro)
+
+
+def vector_items(count: int, dims: int = 8) -> list[StreamIndexItem]:
+    """Items with reproducible random vectors."""
+    vectors = np.random.default_rng(0).random((count, dims), dtype=np.float32)
+    return [StreamIndexItem(id=f"item-{i}", vector=vectors[i].tolist(), metadata={"i": i}) for i in range(count)]
+
+
+class BlockedEmbeddings:
+    """Embedding service that never returns."""
+
+    async def generate_embeddings_array(self, texts):
+        await asyncio.Event().wait()
+
+
+async def wait_for(queue: JobQueue, job_id: str, states=("completed", "failed", "cancelled")) -> dict:
+    """Poll a job until it reaches one of ``states``."""
+    for _ in range(500):
+        status = queue.status(job_id)
+        if status["state"] in states:
+            return status
+        await asyncio.sleep(0.01)
+    raise TimeoutError(f"Job {job_id} stuck in {status['state']}")
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Create a search engine backed by a temporary directory."""
+    return SearchEngine(index_path=str(tmp_path / "indexes"), dimensions=8)
+
+
+class TestJobQueue:
+    """Test submission, progress, resume and cancellation."""
+
+    def test_job_completes(self, engine, tmp_path):
+        """A submitted job should index everything and report throughput."""
+        async def scenario():
+            queue = JobQueue(engine, None, str(tmp_path / "jobs"), batch_size=16)
+            await queue.start()
+            submitted = await queue.submit_items("jobs", vector_items(50))
+            status = await wait_for(queue, submitted["id"])
+            await queue.close()
+            return submitted, status
+
+        submitted, status = run(scenario())
+        assert submitted["state"] == "queued" and submitted["total"] == 50
+        assert status["state"] == "completed"
+        assert status["processed"] == 50 and status["indexed"] == 50
+        assert status["eta_seconds"] == 0.0
+        assert len(engine.indexes["jobs"]) == 50
+        assert not (tmp_path / "jobs" / f"{status['id']}.ndjson").exists()
+
+    def test_job_resumes_from_checkpoint(self, engine, tmp_path):
+        """Jobs left unfinished should resume after their checkpoint on start."""
+        path = tmp_path / "jobs"
+
+        async def submit():
+            # Queue without workers, as if the service stopped before processing
+            queue = JobQueue(engine, None, str(path))
+            return await queue.submit_items("jobs", vector_items(30))
+
+        job = run(submit())
+        state_file = path / f"{job['id']}.json"
+        state = json.loads(state_file.read_text())
+        state.update(state="running", processed=20, indexed=20)
+        state_file.write_text(json.dumps(state))
+
+        async def resume():
+            queue = JobQueue(engine, None, str(path), batch_size=4)
+            await queue.start()
+            status = await wait_for(queue, job["id"])
+            await queue.close()
+            return status
+
+        status = run(resume())
+        assert status["state"] == "completed"
+        assert status["indexed"] == 30
+        # Only the lines after the checkpoint were processed
+        registry = engine.keys["jobs"]
+        assert all(registry.get(f"item-{i}") is None for i in range(20))
+        assert all(registry.get(f"item-{i}") is not None for i in range(20, 30))
+
+    def test_cancel_running_job(self, engine, tmp_path):
+        """Cancelling should stop a running job and drop its payload."""
+        async def scenario():
+            queue = JobQueue(engine, BlockedEmbeddings(), str(tmp_path / "jobs"))
+            await queue.start()
+            job = await queue.submit_items("jobs", [StreamIndexItem(id="a", content="text")])
+            await wait_for(queue, job["id"], states=("running",))
+            cancelled = await queue.cancel(job["id"])
+            again = await queue.cancel(job["id"])
+            await queue.close()
+            return job, cancelled, again, queue.status(job["id"])
+
+        job, cancelled, again, status = run(scenario())
+        assert cancelled and not again
+        assert status["state"] == "cancelled"
+        assert not (tmp_path / "jobs" / f"{job['id']}.ndjson").exists()
+
+    def test_stream_submission_keeps_line_numbers(self, engine, tmp_path):
+        """Spooled uploads should report invalid lines by their upload line."""
+        lines = [json.dumps({"id": f"s{i}", "vector": [float(i)] * 8}) for i in range(5)]
+
+        async def chunks():
+            data = ("\n\n".join(lines) + "\n{broken\n").encode()
+            for start in range(0, len(data), 11):
+                yield data[start:start + 11]
+
+        async def scenario():
+            queue = JobQueue(engine, None, str(tmp_path / "jobs"))
+            await queue.start()
+            job = await queue.submit_stream("jobs", chunks())
+            status = await wait_for(queue, job["id"])
+            await queue.close()
+            return job, status
+
+        job, status = run(scenario())
+        assert job["total"] == 10
+        assert status["indexed"] == 5 and status["failed"] == 1
+        assert status["errors"][0]["line"] == 10
@@ -0,0 +1,77 @@
+"""
+Tests for the BM25 lexical index.
+"""
+
+import numpy as np
+
+from app.lexical import LexicalIndex, tokenize
+
+DOCS = {
+    0: "Diesel road transport 1.A.3.b",
+    1: "Électricité réseau France",
+    2: "Natural gas boiler heating",
+    3: "Road freight, diesel truck, diesel trailer",
+}
+
+
+def build() -> LexicalIndex:
+    """Index the sample documents."""
+    index = LexicalIndex()
+    for key, text in DOCS.items():
+        index.add(key, text)
+    return index
+
+
+class TestTokenize:
+    """Test term extraction."""
+
+    def test_folds_case_and_accents(self):
+        """Terms should be lowercase without diacritics."""
+        assert tokenize("Électricité RÉSEAU") == ["electricite", "reseau"]
+
+    def test_keeps_codes_whole_and_split(self):
+        """Dotted and dashed codes should match exactly and by their parts."""
+        assert tokenize("1.A.3.b CO2-eq") == ["1.a.3.b", "1", "a", "3", "b", "co2-eq", "co2", "eq"]
+
+
+class TestLexicalIndex:
+    """Test BM25 ranking, updates and snapshots."""
+
+    def test_ranks_by_bm25(self):
+        """Documents with more (and rarer) query terms should rank first."""
+        keys, scores = build().search("diesel truck", top_k=10)
+        assert keys.tolist() == [3, 0]
+        assert scores[0] > scores[1] > 0
+
+    def test_exact_code_and_filter(self):
+        """A code should find its document; allowed keys should restrict results."""
+        index = build()
+        assert index.search("1.A.3.b", top_k=5)[0].tolist() == [0]
+        keys, _ = index.search("diesel", top_k=5, allowed=np.array([0], dtype=np.uint64))
+        assert keys.tolist() == [0]
+
+    def test_updates_and_removals(self):
+        """Replaced and removed content should stop matching."""
+        index = build()
+        index.add(0, "coal power plant")
+        index.remove(3)
+        assert index.search("diesel", top_k=5)[0].tolist() == []
+        assert index.search("coal", top_k=5)[0].tolist() == [0]
+        assert len(index) == 3
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """A written base should load back and keep writes made meanwhile."""
+        index = build()
+        frozen = index.freeze()
+        index.add(2, "heat pump")  # after the freeze: stays pending
+        merged = LexicalIndex.write_snapshot(tmp_path / "docs.lexical", frozen)
+        index.rebase(frozen, merged)
+
+        assert index.search("boiler", top_k=5)[0].tolist() == []
+        assert index.search("pump", top_k=5)[0].tolist() == [2]
+        assert index.search("diesel", top_k=5)[0].tolist() == [3, 0]
+
+        loaded = LexicalIndex.load(tmp_path / "docs.lexical")
+        assert loaded.search("diesel", top_k=5)[0].tolist() == [3, 0]
+        assert loaded.search("boiler", top_k=5)[0].tolist() == [2]
+        assert len(loaded) == 4
@@ -0,0 +1,125 @@
+"""
+Tests for the columnar metadata store.
+"""
+
+import os
+
+import pytest
+
+from app.metastore import MetadataStore
+
+
+class TestMetadataStore:
+    """Test persistence and hydration of metadata rows."""
+
+    def test_roundtrip_typed_and_blob_fields(self, tmp_path):
+        """Typed columns and blob fields should both survive a reopen."""
+        store = MetadataStore(tmp_path / "factors.meta")
+        store.put(0, {"scope": 1, "country": "FR", "name": "Electricity", "tags": ["grid"]})
+        store.put(2, {"unit": "kWh"})
+        store.save()
+
+        reopened = MetadataStore.open(tmp_path / "factors.meta")
+        assert reopened.get(0) == {"scope": 1, "country": "FR", "name": "Electricity", "tags": ["grid"]}
+        assert reopened.get(1) is None
+        assert reopened.get(2) == {"unit": "kWh"}
+        assert reopened.blob_fields == {"name", "tags"}
+        assert len(reopened) == 2
+
+    def test_append_and_in_place_update(self, tmp_path):
+        """Later saves should append new rows and rewrite changed ones."""
+        store = MetadataStore(tmp_path / "factors.meta")
+        store.put(0, {"country": "FR"})
+        store.put(1, {"country": "DE"})
+        store.save()
+
+        store.put(0, {"country": "LU", "note": "moved"})
+        store.delete(1)
+        store.put(2, {"country": "FR"})
+        store.save()
+
+        reopened = MetadataStore.open(tmp_path / "factors.meta")
+        assert reopened.rows == 3
+        assert reopened.get(0) == {"country": "LU", "note": "moved"}
+        assert reopened.get(1) is None
+        assert reopened.get(2) == {"country": "FR"}
+
+    def test_uncommitted_rows_are_ignored_on_open(self, tmp_path):
+        """Column data past the header's row count should be discarded."""
+        store = MetadataStore(tmp_path / "factors.meta")
+        store.put(0, {"scope": 3})
+        store.save()
+
+        with open(tmp_path / "factors.meta" / "present.u1", "ab") as f:
+            f.write(b"\x01\x01")
+
+        reopened = MetadataStore.open(tmp_path / "factors.meta")
+        assert reopened.rows == 1
+        reopened.put(1, {"scope": 2})
+        reopened.save()
+        assert MetadataStore.open(tmp_path / "factors.meta").get(1) == {"scope": 2}
+
+    def test_snapshot_writes_only_captured_rows(self, tmp_path):
+        """A snapshot should append to the live files instead of copying them."""
+        store = MetadataStore(tmp_path / "factors.meta")
+        for key in range(100):
+            store.put(key, {"country": "FR", "name": f"factor {key}"})
+        store.save()
+        blob = tmp_path / "factors.meta" / "blob.bin"
+        inode, size = blob.stat().st_ino, blob.stat().st_size
+
+        store.put(5, {"country": "DE", "name": "updated"})
+        frozen = store.freeze()
+        store.write_snapshot(frozen)
+        assert store.get(5) == {"country": "DE", "name": "updated"}  # still pending here
+        assert blob.stat().st_ino == inode
+        assert blob.stat().st_size == size + len(b'{"name":"updated"}')
+
+        store = store.reopen(frozen)
+        assert not store.dirty
+        assert store.get(5) == {"country": "DE", "name": "updated"}
+        assert store.get(6) == {"country": "FR", "name": "factor 6"}
+
+    def test_staged_snapshot_leaves_committed_rows(self, tmp_path):
+        """A staged snapshot should only show once its files are renamed."""
+        store = MetadataStore(tmp_path / "factors.meta")
+        store.put(0, {"country": "FR"})
+        store.save()
+
+        store.put(0, {"country": "LU"})
+        store.put(1, {"country": "DE"})
+        renames = store.write_snapshot(store.freeze(), in_place=False)
+        committed = MetadataStore.open(tmp_path / "factors.meta")
+        assert committed.rows == 1
+        assert committed.get(0) == {"country": "FR"}
+
+        for staged, live in renames:
+            os.replace(staged, live)
+        snapshot = MetadataStore.open(tmp_path / "factors.meta")
+        assert snapshot.get(0) == {"country": "LU"}
+        assert snapshot.get(1) == {"country": "DE"}
+
+    def test_interrupted_save_keeps_rows_decodable(self, tmp_path, monkeypatch):
+        """Rows rewritten in place before the row count is committed should stay valid."""
+        store = MetadataStore(tmp_path / "factors.meta")
+        store.put(0, {"country": "FR"})
+        store.save()
+
+        headers = []
+
+        def write_header():
+            if headers:
+                raise OSError("killed")
+            headers.append(1)
+            original()
+
+        original = store._write_header
+        monkeypatch.setattr(store, "_write_header", write_header)
+        store.put(0, {"country": "LU", "note": "moved"})
+        store.put(1, {"country": "DE"})
+        with pytest.raises(OSError):
+            store.save()
+
+        reopened = MetadataStore.open(tmp_path / "factors.meta")
+        assert reopened.rows == 1
+        assert reopened.get(0) == {"country": "LU", "note": "moved"}
@@ -0,0 +1,116 @@
+"""
+Tests for Prometheus metrics.
+"""
+
+import asyncio
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.metrics import (
+    MetricsMiddleware,
+    REGISTRY,
+    collect_engine,
+    label_index,
+    phase,
+)
+from app.search import SearchEngine
+
+
+def observations(metric: str, **labels) -> float:
+    """Number of observations of a histogram series."""
+    return REGISTRY.get_sample_value(f"{metric}_count", labels) or 0
+
+
+class TestExposition:
+    """Test the text format and scrape-time collectors."""
+
+    def test_failing_collector_is_skipped(self):
+        """A broken collector should not break the scrape."""
+
+        def broken():
+            raise RuntimeError("boom")
+
+        metrics.set_collector("broken", broken)
+        try:
+            text = metrics.render().decode()
+        finally:
+            metrics.set_collector("broken", lambda: [])
+        assert "# TYPE usearch_http_request_duration_seconds histogram" in text
+
+
+class TestRequestPhases:
+    """Test per-request phase timing."""
+
+    def test_middleware_records_phases(self):
+        """Endpoint phases and the remainder should land in the latency histogram."""
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, indexes=lambda: {"phased"})
+
+        @app.get("/items/{name}")
+        async def read(name: str):
+            label_index(name)
+            with phase("search"):
+                await asyncio.sleep(0)
+            return {"name": name}
+
+        series = {"endpoint": "/items/{name}", "index": "phased"}
+        before = observations("usearch_http_request_duration_seconds", **series, phase="search")
+        with TestClient(app) as client:
+            assert client.get("/items/phased").status_code == 200
+
+        assert observations("usearch_http_request_duration_seconds", **series, phase="search") == before + 1
+        assert observations("usearch_http_request_duration_seconds", **series, phase="serialize") >= 1
+        assert observations("usearch_http_request_duration_seconds", **series, phase="total") >= 1
+
+    def test_unknown_indexes_share_a_label(self):
+        """Index names that are not loaded should not create new series."""
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, indexes=lambda: {"phased"})
+
+        @app.get("/items/{name}")
+        async def read(name: str):
+            label_index(name)
+            return {"name": name}
+
+        with TestClient(app) as client:
+            client.get("/items/made-up-1")
+            client.get("/items/made-up-2")
+
+        series = {"endpoint": "/items/{name}", "phase": "total"}
+        assert observations("usearch_http_request_duration_seconds", **series, index="unknown") >= 2
+        assert not observations("usearch_http_request_duration_seconds", **series, index="made-up-1")
+
+    def test_phase_outside_request(self):
+        """Phases outside an instrumented request are ignored."""
+        with phase("embed"):
+            pass
+
+
+class TestEngineMetrics:
+    """Test engine instrumentation."""
+
+    def test_search_phases_and_collector(self, tmp_path):
+        """Searches should record engine phases; the collector reports index state."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=8, exact_threshold=0)
+        vectors = np.random.default_rng(0).standard_normal((50, 8)).astype(np.float32)
+
+        async def scenario():
+            await engine.create_index("metrics", dimensions=8)
+            await engine.index_items("metrics", [f"i{i}" for i in range(50)], vectors)
+            before = observations("usearch_search_phase_duration_seconds", index="metrics", phase="ann")
+            await engine.search("metrics", vectors[0].tolist(), top_k=5)
+            return before
+
+        before = asyncio.run(scenario())
+        for name, least in (("ann", before + 1), ("hydrate", 1), ("lock_wait", 1)):
+            assert observations("usearch_search_phase_duration_seconds", index="metrics", phase=name) >= least
+
+        collected = {metric.name: metric for metric in collect_engine(engine)}
+        assert [(s.labels, s.value) for s in collected["usearch_index_vectors"].samples] == [
+            ({"index": "metrics"}, 50)
+        ]
+        assert collected["usearch_index_memory_bytes"].samples[0].value > 0
+        engine.close()
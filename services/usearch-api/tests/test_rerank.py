@@ -0,0 +1,90 @@
+"""
+Tests for cross-encoder reranking.
+"""
+
+import asyncio
+import threading
+
+from app.models import SearchResult
+from app.rerank import Reranker
+
+
+def run(coro):
+    """Run a coroutine to completion."""
+    return asyncio.run(coro)
+
+
+class FakeCrossEncoder:
+    """Scores pairs by word overlap; optionally blocked until released."""
+
+    def __init__(self, gate: threading.Event = None):
+        self.gate = gate
+        self.pairs = 0
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.pairs += len(pairs)
+        return [
+            len(set(query.lower().split()) & set(text.lower().split())) / 10
+            for query, text in pairs
+        ]
+
+
+def candidates(count: int) -> list[SearchResult]:
+    """Results in retrieval order."""
+    return [SearchResult(id=f"r{i}", score=1 - i / 100) for i in range(count)]
+
+
+class TestReranker:
+    """Test ordering, caching and the time budget."""
+
+    def test_reorders_by_cross_encoder(self):
+        """The best pair should come first; items without content go last."""
+        reranker = Reranker(FakeCrossEncoder(), workers=2, batch_size=2)
+        contents = ["natural gas", None, "diesel road transport", "diesel"]
+
+        results, reranked = run(reranker.rerank("diesel road", candidates(4), contents, 3, timeout=5))
+        assert reranked
+        assert [r.id for r in results] == ["r2", "r3", "r0"]
+        assert results[0].rerank_score == 0.2
+        assert results[0].score == 0.98  # retrieval score is kept
+
+    def test_scores_are_cached(self):
+        """Repeated (query, content) pairs should not reach the model again."""
+        model = FakeCrossEncoder()
+        reranker = Reranker(model, workers=1)
+        contents = ["diesel", "petrol"]
+
+        run(reranker.rerank("diesel", candidates(2), contents, 2, timeout=5))
+        run(reranker.rerank("diesel", candidates(2), contents, 2, timeout=5))
+        assert model.pairs == 2
+
+    def test_budget_falls_back_to_retrieval_order(self):
+        """A slow model should return retrieval order, then fill the cache."""
+        gate = threading.Event()
+        model = FakeCrossEncoder(gate)
+        reranker = Reranker(model, workers=1)
+        contents = ["petrol", "diesel"]
+
+        async def scenario():
+            first = await reranker.rerank("diesel", candidates(2), contents, 2, timeout=0.05)
+            gate.set()
+            await asyncio.sleep(0.2)  # the running batch completes in the background
+            second = await reranker.rerank("diesel", candidates(2), contents, 2, timeout=0.05)
+            return first, second
+
+        (first, first_reranked), (second, second_reranked) = run(scenario())
+        assert not first_reranked and [r.id for r in first] == ["r0", "r1"]
+        assert second_reranked and [r.id for r in second] == ["r1", "r0"]
+        assert model.pairs == 2
+
+    def test_model_errors_fall_back(self):
+        """A failing model should not fail the search."""
+
+        class Broken:
+            def predict(self, pairs, **kwargs):
+                raise RuntimeError("out of memory")
+
+        results, reranked = run(Reranker(Broken()).rerank("q", candidates(2), ["a", "b"], 2, timeout=5))
+        assert not reranked and [r.id for r in results] == ["r0", "r1"]
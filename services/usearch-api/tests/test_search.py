@@ -0,0 +1,944 @@
+"""
+Tests for the SearchEngine vector index wrapper.
+"""
+
+import asyncio
+import json
+import threading
+
+import numpy as np
+import pytest
+from usearch.index import Index
+
+from app.locks import ReadWriteLock
+from app.search import SearchEngine, exact_distances
+
+
+def run(coro):
+    """Run a coroutine to completion."""
+    return asyncio.run(coro)
+
+
+def random_vectors(count: int, dims: int = 32, seed: int = 0) -> np.ndarray:
+    """Generate reproducible random float32 vectors."""
+    return np.random.default_rng(seed).random((count, dims), dtype=np.float32)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Create a search engine backed by a temporary directory."""
+    return SearchEngine(index_path=str(tmp_path), dimensions=32)
+
+
+class TestKeyRegistry:
+    """Test ID <-> key mapping."""
+
+    def test_keys_are_monotonic_and_stable(self, engine, tmp_path):
+        """Keys should be allocated in order and survive a restart."""
+        vectors = random_vectors(3)
+        for i, vec in enumerate(vectors):
+            run(engine.index_item("factors", f"item-{i}", vec.tolist()))
+
+        registry = engine.keys["factors"]
+        assert [registry.get(f"item-{i}") for i in range(3)] == [0, 1, 2]
+
+        run(engine.save_indexes())
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+
+        assert reloaded.keys["factors"].get("item-2") == 2
+        results = run(reloaded.search("factors", vectors[1].tolist(), top_k=1))
+        assert results[0].id == "item-1"
+
+    def test_deleted_keys_are_not_reused(self, engine):
+        """A deleted item's key should never be handed to a new item."""
+        vectors = random_vectors(2)
+        run(engine.index_item("factors", "a", vectors[0].tolist()))
+        run(engine.delete_item("factors", "a"))
+        run(engine.index_item("factors", "b", vectors[1].tolist()))
+
+        assert engine.keys["factors"].get("b") == 1
+        results = run(engine.search("factors", vectors[0].tolist(), top_k=2))
+        assert [r.id for r in results] == ["b"]
+
+    def test_legacy_hash_keys_are_migrated(self, engine, tmp_path):
+        """Indexes saved with keys inside metadata should load transparently."""
+        vectors = random_vectors(2)
+        run(engine.create_index("legacy", dimensions=32))
+        index = engine.indexes["legacy"]
+        index.add(np.array([987654321, 123456789], dtype=np.uint64), vectors)
+        run(engine.save_indexes())
+
+        (tmp_path / "legacy_keys.json").unlink()
+        (tmp_path / "legacy_metadata.json").write_text(json.dumps({
+            "x": {"key": 987654321, "unit": "kg"},
+            "y": {"key": 123456789},
+        }))
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+
+        results = run(reloaded.search("legacy", vectors[0].tolist(), top_k=1))
+        assert results[0].id == "x"
+        assert results[0].metadata == {"unit": "kg"}
+
+
+class TestBulkIndexing:
+    """Test the vectorized insert path."""
+
+    def test_index_items_inserts_all_rows(self, engine):
+        """A single bulk call should index every row with its metadata."""
+        vectors = random_vectors(500)
+        ids = [f"factor-{i}" for i in range(500)]
+        metadatas = [{"scope": i % 3} for i in range(500)]
+
+        indexed = run(engine.index_items("factors", ids, vectors, metadatas))
+
+        assert indexed == 500
+        assert len(engine.indexes["factors"]) == 500
+        results = run(engine.search("factors", vectors[42].tolist(), top_k=1))
+        assert results[0].id == "factor-42"
+        assert results[0].metadata == {"scope": 0}
+
+    def test_index_items_updates_existing_ids(self, engine):
+        """Re-indexing an ID should replace its vector instead of failing."""
+        vectors = random_vectors(3)
+        run(engine.index_items("factors", ["a", "b"], vectors[:2]))
+        run(engine.index_items("factors", ["a"], vectors[2:3], [{"v": 2}]))
+
+        assert len(engine.indexes["factors"]) == 2
+        results = run(engine.search("factors", vectors[2].tolist(), top_k=1))
+        assert results[0].id == "a"
+        assert results[0].metadata == {"v": 2}
+
+    def test_index_items_rejects_misaligned_input(self, engine):
+        """The vector matrix must have one row per ID."""
+        with pytest.raises(ValueError):
+            run(engine.index_items("factors", ["a", "b"], random_vectors(3)))
+
+
+class TestFilteredSearch:
+    """Test pre-filtered search through the metadata inverted index."""
+
+    @pytest.fixture
+    def populated(self, engine):
+        """Index 2000 factors with a rare and a common country."""
+        vectors = random_vectors(2000)
+        metadatas = [
+            {"country": "LU" if i % 400 == 0 else "FR", "scope": i % 3 + 1, "unit": "kWh"}
+            for i in range(2000)
+        ]
+        ids = [f"factor-{i}" for i in range(2000)]
+        run(engine.index_items("factors", ids, vectors, metadatas))
+        return engine, vectors, metadatas
+
+    def test_selective_filter_returns_all_matches(self, populated):
+        """A filter matching few items should still return all of them."""
+        engine, vectors, _ = populated
+        results = run(engine.search(
+            "factors", vectors[1].tolist(), top_k=10, filters={"country": "LU"}
+        ))
+        assert sorted(r.id for r in results) == sorted(f"factor-{i}" for i in range(0, 2000, 400))
+
+    def test_broad_filter_fills_top_k(self, populated):
+        """The ANN path should widen its search until top_k matches are found."""
+        engine, vectors, metadatas = populated
+        engine.EXACT_FILTER_THRESHOLD = 10
+
+        filters = {"country": "FR", "scope": [1, 2]}
+        results = run(engine.search("factors", vectors[7].tolist(), top_k=20, filters=filters))
+
+        assert len(results) == 20
+        for result in results:
+            metadata = metadatas[int(result.id.split("-")[1])]
+            assert metadata["country"] == "FR" and metadata["scope"] in (1, 2)
+
+    def test_unknown_value_returns_nothing(self, populated):
+        """Filtering on a value that was never indexed should be empty."""
+        engine, vectors, _ = populated
+        results = run(engine.search(
+            "factors", vectors[0].tolist(), filters={"country": "DE"}
+        ))
+        assert results == []
+
+    def test_deleted_items_leave_the_filter_index(self, populated):
+        """Deleted items must not be returned by filtered searches."""
+        engine, vectors, _ = populated
+        run(engine.delete_item("factors", "factor-400"))
+        results = run(engine.search(
+            "factors", vectors[400].tolist(), top_k=10, filters={"country": "LU"}
+        ))
+        assert "factor-400" not in {r.id for r in results}
+        assert len(results) == 4
+
+    def test_filters_survive_reload_and_updates(self, populated, tmp_path):
+        """Postings loaded from disk should reflect later updates and deletes."""
+        engine, vectors, _ = populated
+        run(engine.save_indexes())
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+        run(reloaded.index_items("factors", ["factor-1"], vectors[1:2], [{"country": "LU"}]))
+        run(reloaded.delete_item("factors", "factor-0"))
+
+        results = run(reloaded.search(
+            "factors", vectors[1].tolist(), top_k=10, filters={"country": "LU"}
+        ))
+        ids = {r.id for r in results}
+        assert "factor-1" in ids and "factor-0" not in ids
+        assert len(ids) == 5
+
+    def test_snapshot_drops_stale_filter_keys(self, populated, tmp_path):
+        """Snapshots should fold updates into the postings and clear stale keys."""
+        engine, vectors, _ = populated
+        run(engine.save_indexes())
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+        run(reloaded.index_items("factors", ["factor-1"], vectors[1:2], [{"country": "LU"}]))
+        run(reloaded.delete_item("factors", "factor-0"))
+        filter_index = reloaded.filters["factors"]
+        assert len(filter_index._stale) == 2
+        deleted_during_snapshot = reloaded.keys["factors"].get("factor-400")
+
+        async def snapshot_while_writing():
+            task = asyncio.create_task(reloaded.snapshot_index("factors"))
+            await asyncio.sleep(0)  # postings frozen, snapshot being written
+            await reloaded.delete_item("factors", "factor-400")
+            assert await task
+
+        run(snapshot_while_writing())
+        assert filter_index._stale == {deleted_during_snapshot}
+        assert not filter_index._postings.get("country")
+
+        results = run(reloaded.search(
+            "factors", vectors[1].tolist(), top_k=10, filters={"country": "LU"}
+        ))
+        assert sorted(r.id for r in results) == [
+            "factor-1", "factor-1200", "factor-1600", "factor-800"
+        ]
+
+
+class TestServingModes:
+    """Test memory-mapped read-only serving."""
+
+    def test_view_mode_maps_and_copies_on_write(self, tmp_path):
+        """View indexes should be searchable, and writable after a copy."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, serving_mode="view")
+        vectors = random_vectors(50)
+        run(engine.index_items("factors", [f"f-{i}" for i in range(50)], vectors))
+        run(engine.save_indexes())
+        assert "factors" in engine.views
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32, serving_mode="memory")
+        run(reloaded.load_indexes())
+        assert "factors" in reloaded.views  # mode recorded per index in registry.json
+        assert run(reloaded.search("factors", vectors[3].tolist(), top_k=1))[0].id == "f-3"
+
+        run(reloaded.index_item("factors", "new", vectors[0].tolist()))
+        assert "factors" not in reloaded.views
+        assert len(reloaded.indexes["factors"]) == 51
+
+    def test_unknown_serving_mode_is_rejected(self, engine):
+        """Only memory and view modes are supported."""
+        with pytest.raises(ValueError):
+            run(engine.create_index("factors", serving_mode="disk"))
+
+
+class TestQuantization:
+    """Test quantized storage types with full-precision rescoring."""
+
+    @pytest.mark.parametrize("dtype", ["f16", "i8", "b1"])
+    def test_quantized_index_finds_exact_match(self, engine, dtype):
+        """Rescored quantized search should rank the query item first."""
+        vectors = random_vectors(300, dims=64) - 0.5
+        run(engine.create_index("factors", dimensions=64, dtype=dtype))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(300)], vectors))
+
+        for i in (0, 17, 299):
+            results = run(engine.search("factors", vectors[i].tolist(), top_k=3))
+            assert results[0].id == f"f-{i}"
+            assert results[0].score == pytest.approx(1.0, abs=1e-3)
+
+    def test_dtype_is_persisted(self, engine, tmp_path):
+        """The storage type should be recorded in registry.json and reapplied."""
+        vectors = random_vectors(20, dims=64) - 0.5
+        run(engine.create_index("factors", dimensions=64, dtype="b1"))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(20)], vectors))
+        run(engine.save_indexes())
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=64)
+        run(reloaded.load_indexes())
+
+        assert reloaded.index_info["factors"]["dtype"] == "b1"
+        assert "factors" in reloaded.vectors
+        assert run(reloaded.search("factors", vectors[5].tolist(), top_k=1))[0].id == "f-5"
+
+    def test_binary_requires_rescoring(self, engine):
+        """b1 scores are only meaningful after a full-precision rerank."""
+        with pytest.raises(ValueError):
+            run(engine.create_index("factors", dtype="b1", rescore=False))
+
+
+class TestBatchSearch:
+    """Test multi-query search."""
+
+    @pytest.mark.parametrize("dtype", ["f32", "i8"])
+    @pytest.mark.parametrize("mode", ["ann", "exact"])
+    def test_matches_single_queries(self, engine, dtype, mode):
+        """Batch results should equal running each query on its own."""
+        vectors = random_vectors(500)
+        run(engine.create_index("factors", dimensions=32, dtype=dtype))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(500)], vectors))
+
+        queries = vectors[[3, 42, 499]]
+        batch = run(engine.search_many("factors", queries, top_k=5, mode=mode))
+
+        for query, results in zip(queries, batch):
+            single = run(engine.search("factors", query.tolist(), top_k=5, mode=mode))
+            assert [r.id for r in results] == [r.id for r in single]
+        assert [results[0].id for results in batch] == ["f-3", "f-42", "f-499"]
+
+    def test_per_query_parameters(self, engine):
+        """top_k, filters and min_score should apply per query."""
+        vectors = random_vectors(100)
+        metadatas = [{"country": "LU" if i % 10 == 0 else "FR"} for i in range(100)]
+        run(engine.index_items("factors", [f"f-{i}" for i in range(100)], vectors, metadatas))
+
+        batch = run(engine.search_many(
+            "factors",
+            vectors[[1, 2, 3]],
+            top_k=[1, 5, 5],
+            filters=[None, {"country": "LU"}, None],
+            min_score=[0.0, 0.0, 0.999],
+        ))
+
+        assert [r.id for r in batch[0]] == ["f-1"]
+        assert len(batch[1]) == 5
+        assert all(r.metadata["country"] == "LU" for r in batch[1])
+        assert [r.id for r in batch[2]] == ["f-3"]
+
+    def test_single_row_batch(self, engine):
+        """A one-query batch should work like any other."""
+        vectors = random_vectors(10)
+        run(engine.index_items("factors", [f"f-{i}" for i in range(10)], vectors))
+
+        batch = run(engine.search_many("factors", vectors[7:8], top_k=2))
+        assert batch[0][0].id == "f-7"
+        assert len(batch[0]) == 2
+
+    def test_rejects_wrong_dimensions(self, engine):
+        """Query matrices must match the index dimensions."""
+        run(engine.index_items("factors", ["a"], random_vectors(1)))
+        with pytest.raises(ValueError):
+            run(engine.search_many("factors", random_vectors(2, dims=16)))
+
+
+class TestHnswParameters:
+    """Test per-index HNSW parameters and per-query search effort."""
+
+    @pytest.mark.parametrize("serving_mode", ["memory", "view"])
+    def test_parameters_survive_reload(self, tmp_path, serving_mode):
+        """Registry parameters should be reapplied to reloaded indexes."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, serving_mode=serving_mode)
+        run(engine.create_index(
+            "factors", dimensions=32, connectivity=8, expansion_add=40, expansion_search=20
+        ))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(50)], random_vectors(50)))
+        run(engine.save_indexes())
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32, serving_mode=serving_mode)
+        run(reloaded.load_indexes())
+        index = reloaded.indexes["factors"]
+        assert (index.connectivity, index.expansion_add) == (8, 40)
+        assert reloaded.index_info["factors"]["expansion_search"] == 20
+        assert reloaded._fetch_count("factors", 5, None) == 20
+
+    def test_ef_trades_recall(self, engine):
+        """A larger ef should find more of the true neighbors."""
+        vectors = random_vectors(2000, dims=64)
+        run(engine.create_index("factors", dimensions=64, connectivity=4, expansion_add=16))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(2000)], vectors))
+
+        queries = random_vectors(50, dims=64, seed=3)
+        truth = run(engine.search_many("factors", queries, top_k=10, mode="exact"))
+
+        def recall(ef: int) -> float:
+            hits = run(engine.search_many("factors", queries, top_k=10, mode="ann", ef=ef))
+            return sum(len({r.id for r in a} & {r.id for r in b}) for a, b in zip(hits, truth)) / 500
+
+        assert recall(1) < recall(500)
+
+    def test_rejects_invalid_parameters(self, engine):
+        """Out-of-range HNSW parameters should be rejected."""
+        with pytest.raises(ValueError):
+            run(engine.create_index("factors", dimensions=32, connectivity=1))
+        with pytest.raises(ValueError):
+            run(engine.create_index("factors", dimensions=32, connectivity=1000))
+        with pytest.raises(ValueError):
+            run(engine.create_index("factors", dimensions=32, shards=1000))
+        run(engine.index_items("factors", ["a"], random_vectors(1)))
+        with pytest.raises(ValueError):
+            run(engine.search("factors", random_vectors(1)[0].tolist(), ef=0))
+
+
+class TestExactSearch:
+    """Test brute-force search."""
+
+    @pytest.mark.parametrize("metric", ["cos", "l2", "ip"])
+    def test_matches_numpy_ground_truth(self, engine, metric):
+        """Exact search should return the true nearest neighbors in order."""
+        vectors = random_vectors(300)
+        run(engine.create_index("factors", dimensions=32, metric=metric, search_mode="exact"))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(300)], vectors))
+
+        query = random_vectors(1, seed=1)[0]
+        results = run(engine.search("factors", query.tolist(), top_k=10))
+
+        expected = np.argsort(exact_distances(vectors, query, metric), kind="stable")[:10]
+        assert [r.id for r in results] == [f"f-{i}" for i in expected]
+
+    def test_auto_mode_uses_threshold(self, tmp_path):
+        """Indexes up to exact_threshold vectors should be searched exactly."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, exact_threshold=50)
+        run(engine.index_items("factors", [f"f-{i}" for i in range(50)], random_vectors(50)))
+        assert engine._use_exact("factors", None)
+        assert not engine._use_exact("factors", "ann")
+
+        run(engine.index_items("factors", ["extra"], random_vectors(1, seed=1)))
+        assert not engine._use_exact("factors", None)
+        assert engine._use_exact("factors", "exact")
+
+    def test_writes_refresh_matrix(self, engine):
+        """Added and deleted items should be visible to the next exact search."""
+        vectors = random_vectors(20)
+        run(engine.index_items("factors", [f"f-{i}" for i in range(10)], vectors[:10]))
+        run(engine.search("factors", vectors[0].tolist(), mode="exact"))
+
+        run(engine.index_items("factors", ["new"], vectors[15:16]))
+        run(engine.delete_item("factors", "f-0"))
+
+        assert run(engine.search("factors", vectors[15].tolist(), top_k=1, mode="exact"))[0].id == "new"
+        results = run(engine.search("factors", vectors[0].tolist(), top_k=20, mode="exact"))
+        assert "f-0" not in {r.id for r in results}
+        assert len(results) == 10
+
+    def test_filtered_exact_search(self, engine):
+        """Filters should apply in exact mode, also on fields the index cannot answer."""
+        vectors = random_vectors(100)
+        metadatas = [{"country": "LU" if i % 10 == 0 else "FR", "tags": [str(i)]} for i in range(100)]
+        run(engine.index_items("factors", [f"f-{i}" for i in range(100)], vectors, metadatas))
+
+        results = run(engine.search(
+            "factors", vectors[5].tolist(), top_k=20, filters={"country": "LU"}, mode="exact"
+        ))
+        assert len(results) == 10
+        assert all(r.metadata["country"] == "LU" for r in results)
+
+    def test_measure_recall(self, engine):
+        """HNSW recall should be measured against exact results."""
+        vectors = random_vectors(500)
+        run(engine.index_items("factors", [f"f-{i}" for i in range(500)], vectors))
+        recall = run(engine.measure_recall("factors", random_vectors(20, seed=2), top_k=10))
+        assert 0.9 <= recall <= 1.0
+
+    def test_rejects_unknown_mode(self, engine):
+        """Unknown search modes should be rejected."""
+        run(engine.index_items("factors", ["a"], random_vectors(1)))
+        with pytest.raises(ValueError):
+            run(engine.search("factors", random_vectors(1)[0].tolist(), mode="fuzzy"))
+
+
+class TestDeletion:
+    """Test real deletes and compaction."""
+
+    def test_deleted_vectors_leave_results(self, engine):
+        """Deleted items should be removed from uSearch and counted as dead."""
+        vectors = random_vectors(50)
+        run(engine.index_items("factors", [f"f-{i}" for i in range(50)], vectors))
+        run(engine.delete_item("factors", "f-7"))
+
+        results = run(engine.search("factors", vectors[7].tolist(), top_k=50))
+        assert "f-7" not in [r.id for r in results]
+        assert len(results) == 49
+        assert engine._dead_entries("factors") == 1
+
+        stats = run(engine.get_stats()).indexes[0]
+        assert stats.dead_entries == 1
+        assert stats.dead_ratio == pytest.approx(1 / 50)
+
+    def test_compaction_drops_dead_entries(self, tmp_path):
+        """Compaction should rebuild the graph from live entries only."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, compaction_threshold=0)
+        vectors = random_vectors(200)
+        run(engine.index_items("factors", [f"f-{i}" for i in range(200)], vectors))
+        for i in range(0, 200, 2):
+            run(engine.delete_item("factors", f"f-{i}"))
+
+        assert run(engine.compact_index("factors")) == 100
+        assert engine._dead_entries("factors") == 0
+        assert run(engine.search("factors", vectors[5].tolist(), top_k=1))[0].id == "f-5"
+
+        run(engine.save_indexes())
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+        assert len(reloaded.indexes["factors"]) == 100
+        assert reloaded._dead_entries("factors") == 0
+
+    def test_writes_during_compaction_are_kept(self, engine):
+        """Adds and deletes made while compacting should survive the swap."""
+        vectors = random_vectors(102)
+        run(engine.index_items("factors", [f"f-{i}" for i in range(100)], vectors[:100]))
+        run(engine.delete_item("factors", "f-0"))
+
+        async def compact_while_writing():
+            task = asyncio.create_task(engine.compact_index("factors"))
+            await asyncio.sleep(0)  # snapshot taken, graph build running
+            await engine.index_items("factors", ["new-a", "new-b"], vectors[100:])
+            await engine.delete_item("factors", "f-1")
+            await task
+
+        run(compact_while_writing())
+
+        index = engine.indexes["factors"]
+        assert len(index) == 100
+        assert run(engine.search("factors", vectors[101].tolist(), top_k=1))[0].id == "new-b"
+        assert engine.keys["factors"].get("f-1") is None
+        assert 1 not in index
+
+    def test_dead_ratio_triggers_background_compaction(self, tmp_path):
+        """Crossing the dead-entry threshold should compact automatically."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, compaction_threshold=0.3)
+        vectors = random_vectors(400)
+        run(engine.index_items("factors", [f"f-{i}" for i in range(400)], vectors))
+
+        async def delete_many():
+            for i in range(130):
+                await engine.delete_item("factors", f"f-{i}")
+            await engine._compactions["factors"]
+
+        run(delete_many())
+        # Deletes issued while compacting are tombstoned in the new index
+        assert engine._dead_entries("factors") <= 10
+        assert len(engine.indexes["factors"]) == 270
+
+
+class TestWriteAheadLog:
+    """Test crash recovery through the write-ahead log."""
+
+    def test_unsaved_writes_survive_restart(self, engine, tmp_path):
+        """Adds and deletes since the last snapshot should be replayed."""
+        vectors = random_vectors(20)
+        run(engine.index_items(
+            "factors", [f"f-{i}" for i in range(20)], vectors, [{"scope": i % 3} for i in range(20)]
+        ))
+        run(engine.delete_item("factors", "f-3"))
+
+        # No save_indexes: simulate a crash
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+
+        assert len(reloaded.indexes["factors"]) == 19
+        assert reloaded.keys["factors"].get("f-3") is None
+        results = run(reloaded.search("factors", vectors[4].tolist(), top_k=1, filters={"scope": 1}))
+        assert results[0].id == "f-4"
+
+    def test_snapshot_truncates_log(self, engine, tmp_path):
+        """Saving an index should empty its log."""
+        run(engine.index_items("factors", ["a", "b"], random_vectors(2)))
+        wal_file = tmp_path / "factors.wal"
+        assert wal_file.stat().st_size > 0
+
+        run(engine.save_indexes())
+        assert wal_file.stat().st_size == 0
+
+    def test_torn_tail_is_ignored(self, engine, tmp_path):
+        """A half-written last record should be dropped on recovery."""
+        run(engine.index_items("factors", ["a", "b"], random_vectors(2)))
+        with open(tmp_path / "factors.wal", "ab") as f:
+            f.write(b"\x40\x00\x00\x00garbage")
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+        assert len(reloaded.indexes["factors"]) == 2
+
+    def test_large_log_triggers_snapshot(self, tmp_path):
+        """Exceeding wal_max_bytes should fold the log into a snapshot."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, wal_max_bytes=1024)
+
+        async def write():
+            await engine.index_items("factors", [f"f-{i}" for i in range(20)], random_vectors(20))
+            await engine._snapshots["factors"]
+
+        run(write())
+        assert (tmp_path / "factors.wal").stat().st_size == 0
+        assert (tmp_path / "factors.usearch").exists()
+
+
+class TestSnapshots:
+    """Test background, atomic snapshots."""
+
+    def test_writes_during_snapshot_are_kept(self, engine, tmp_path):
+        """Writes made while a snapshot is written should stay pending and logged."""
+        vectors = random_vectors(3)
+        run(engine.index_items("factors", ["a", "b"], vectors[:2], [{"unit": "kg"}, None]))
+
+        async def snapshot_while_writing():
+            task = asyncio.create_task(engine.snapshot_index("factors"))
+            await asyncio.sleep(0)  # state frozen, files being written
+            await engine.index_items("factors", ["c"], vectors[2:], [{"unit": "kWh"}])
+            assert await task
+
+        run(snapshot_while_writing())
+
+        store = engine.metadata["factors"]
+        assert store.get(engine.keys["factors"].get("c")) == {"unit": "kWh"}
+        assert store.dirty
+        assert (tmp_path / "factors.wal").stat().st_size > 0
+        assert not list(tmp_path.glob("factors.wal.*"))
+
+    def test_interrupted_commit_is_rolled_forward(self, tmp_path, monkeypatch):
+        """A crash after the commit marker should complete the snapshot on load."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, wal=False)
+        vectors = random_vectors(4)
+        run(engine.index_items("factors", ["a", "b"], vectors[:2]))
+        run(engine.save_indexes())
+        run(engine.index_items("factors", ["c", "d"], vectors[2:], [{"unit": "kg"}] * 2))
+
+        def crash(renames):
+            raise OSError("killed")
+
+        monkeypatch.setattr(SearchEngine, "_apply_renames", staticmethod(crash))
+        assert not run(engine.snapshot_index("factors"))
+        assert (tmp_path / "factors.commit").exists()
+        monkeypatch.undo()
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32, wal=False)
+        run(reloaded.load_indexes())
+
+        assert not (tmp_path / "factors.commit").exists()
+        assert len(reloaded.indexes["factors"]) == 4
+        key = reloaded.keys["factors"].get("d")
+        assert reloaded.metadata["factors"].get(key) == {"unit": "kg"}
+
+    def test_metadata_follows_commit_without_wal(self, tmp_path, monkeypatch):
+        """Without a log, metadata should only change when the snapshot commits."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, wal=False)
+        vectors = random_vectors(2)
+        run(engine.index_items("factors", ["a", "b"], vectors, [{"unit": "kg"}, {"unit": "t"}]))
+        run(engine.save_indexes())
+        run(engine.index_items("factors", ["a"], vectors[:1], [{"unit": "kWh"}]))
+        run(engine.delete_item("factors", "b"))
+
+        def crash(name, renames):
+            raise OSError("killed")
+
+        monkeypatch.setattr(engine, "_commit_snapshot", crash)
+        assert not run(engine.snapshot_index("factors"))
+        monkeypatch.undo()
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32, wal=False)
+        run(reloaded.load_indexes())
+        assert not list(tmp_path.glob("factors.meta/*.snapshot"))
+        keys = reloaded.keys["factors"]
+        assert reloaded.metadata["factors"].get(keys.get("a")) == {"unit": "kg"}
+        assert reloaded.metadata["factors"].get(keys.get("b")) == {"unit": "t"}
+
+    def test_uncommitted_snapshot_is_discarded(self, engine, tmp_path):
+        """Temporary files without a commit marker should be removed on load."""
+        run(engine.index_items("factors", ["a"], random_vectors(1)))
+        run(engine.save_indexes())
+        (tmp_path / "factors.usearch.tmp").write_bytes(b"partial")
+        (tmp_path / "factors.meta.tmp").mkdir()
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+
+        assert not (tmp_path / "factors.usearch.tmp").exists()
+        assert not (tmp_path / "factors.meta.tmp").exists()
+        assert len(reloaded.indexes["factors"]) == 1
+
+    def test_registry_keeps_indexes_changed_during_snapshot(self, engine, tmp_path, monkeypatch):
+        """An index created or deleted while another one is snapshotted should stay so."""
+        vectors = random_vectors(3)
+        run(engine.index_items("a", ["x"], vectors[:1]))
+        run(engine.index_items("b", ["x"], vectors[1:2]))
+        started, release = threading.Event(), threading.Event()
+        write_snapshot = engine._write_snapshot
+
+        def slow_write_snapshot(name, *args):
+            if name == "a":
+                started.set()
+                release.wait(5)
+            return write_snapshot(name, *args)
+
+        monkeypatch.setattr(engine, "_write_snapshot", slow_write_snapshot)
+
+        async def change_indexes_during_snapshot():
+            task = asyncio.create_task(engine.snapshot_index("a"))
+            await asyncio.to_thread(started.wait, 5)
+            await engine.index_items("c", ["x"], vectors[2:])
+            await engine.delete_index("b")
+            release.set()
+            assert await task
+
+        run(change_indexes_during_snapshot())
+        assert sorted(json.loads((tmp_path / "registry.json").read_text())) == ["a", "c"]
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+        assert sorted(reloaded.indexes) == ["a", "c"]
+        assert reloaded.keys["c"].get("x") is not None
+
+    def test_mutation_count_triggers_snapshot(self, tmp_path):
+        """Reaching snapshot_mutations should snapshot in the background."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, snapshot_mutations=10)
+
+        async def write():
+            await engine.index_items("factors", [f"f-{i}" for i in range(10)], random_vectors(10))
+            await engine._snapshots["factors"]
+
+        run(write())
+        assert not engine.metadata["factors"].dirty
+        assert engine._snapshot_mutations["factors"] == 10
+
+
+class TestConcurrency:
+    """Test thread-pool execution and per-index reader/writer locking."""
+
+    def test_readers_share_and_writers_exclude(self):
+        """Readers should overlap; a writer should wait for them and block later readers."""
+        lock = ReadWriteLock()
+        events = []
+
+        async def reader(name: str, delay: float):
+            async with lock.read():
+                events.append(f"{name}+")
+                await asyncio.sleep(delay)
+                events.append(f"{name}-")
+
+        async def writer():
+            async with lock.write():
+                events.append("w+")
+                assert lock.readers == 0
+                await asyncio.sleep(0.01)
+                events.append("w-")
+
+        async def scenario():
+            first = asyncio.create_task(reader("r1", 0.02))
+            second = asyncio.create_task(reader("r2", 0.02))
+            await asyncio.sleep(0)
+            write = asyncio.create_task(writer())
+            await asyncio.sleep(0)
+            late = asyncio.create_task(reader("r3", 0))
+            await asyncio.gather(first, second, write, late)
+
+        run(scenario())
+        assert events[:2] == ["r1+", "r2+"]
+        assert events.index("w+") > events.index("r2-")
+        assert events.index("r3+") > events.index("w-")
+
+    def test_cancelled_waiter_does_not_block_queue(self):
+        """A writer cancelled while queued should let the readers behind it in."""
+        lock = ReadWriteLock()
+
+        async def scenario():
+            async with lock.read():
+                blocked = asyncio.create_task(lock.write().__aenter__())
+                await asyncio.sleep(0)
+                blocked.cancel()
+                await asyncio.sleep(0)
+                async with lock.read():
+                    assert lock.readers == 2
+            assert lock.waiting == 0 and not lock.writing
+
+        run(scenario())
+
+    def test_concurrent_searches_and_writes(self, tmp_path):
+        """Searches racing with inserts should always see complete items."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, search_threads=4)
+        vectors = random_vectors(400)
+
+        async def scenario():
+            await engine.index_items("factors", [f"f-{i}" for i in range(200)], vectors[:200])
+            writes = [
+                engine.index_items("factors", [f"f-{i}"], vectors[i:i + 1], [{"n": i}])
+                for i in range(200, 400)
+            ]
+            searches = [engine.search("factors", vectors[i].tolist(), top_k=1) for i in range(200)]
+            return await asyncio.gather(*writes, *searches)
+
+        results = run(scenario())
+        assert [hits[0].id for hits in results[200:]] == [f"f-{i}" for i in range(200)]
+        assert len(engine.indexes["factors"]) == 400
+        engine.close()
+
+    def test_delete_index_waits_for_searches(self, engine):
+        """Deleting an index should not pull it from under an in-flight search."""
+        run(engine.index_items("factors", ["a", "b"], random_vectors(2)))
+
+        async def scenario():
+            search = asyncio.create_task(engine.search("factors", random_vectors(1)[0].tolist()))
+            await asyncio.sleep(0)
+            await engine.delete_index("factors")
+            return await search
+
+        assert {r.id for r in run(scenario())} == {"a", "b"}
+        assert "factors" not in engine.indexes
+
+
+class TestHybridSearch:
+    """Test BM25 + vector retrieval with rank fusion."""
+
+    @pytest.fixture
+    def populated(self, engine):
+        """Index items whose content differs only in a factor code."""
+        vectors = random_vectors(20)
+        contents = [f"Road transport factor {i}.A.3" for i in range(20)]
+        metadatas = [{"scope": i % 2} for i in range(20)]
+        run(engine.index_items("factors", [f"f-{i}" for i in range(20)], vectors, metadatas, contents))
+        return engine, vectors
+
+    @pytest.mark.parametrize("fusion", ["rrf", "weighted"])
+    def test_exact_code_is_fused_in(self, populated, fusion):
+        """A lexical match should reach the top even when its vector is far."""
+        engine, vectors = populated
+        results = run(engine.hybrid_search(
+            "factors", vectors[0].tolist(), "7.A.3", top_k=2, fusion=fusion, text_weight=0.5
+        ))
+        assert {r.id for r in results} == {"f-0", "f-7"}
+        assert all(0 < r.score <= 1 for r in results)
+
+    def test_filters_apply_to_lexical_hits(self, populated):
+        """Lexical matches outside the filter should be dropped."""
+        engine, vectors = populated
+        results = run(engine.hybrid_search(
+            "factors", vectors[0].tolist(), "7.A.3", top_k=5, filters={"scope": 0}
+        ))
+        assert "f-7" not in {r.id for r in results}
+
+    def test_content_survives_restart(self, populated, tmp_path):
+        """Logged and snapshotted content should be searchable after a reload."""
+        engine, vectors = populated
+        run(engine.save_indexes())
+        run(engine.index_item("factors", "f-3", vectors[3].tolist(), content="Electricity grid"))
+
+        # No save after the update: it comes back from the log
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+        lexical = reloaded.lexical["factors"]
+        key = reloaded.keys["factors"].get("f-3")
+        assert lexical.search("grid", top_k=5)[0].tolist() == [key]
+        assert key not in lexical.search("3.A.3", top_k=5)[0].tolist()
+        assert len(lexical) == 20
+
+    def test_rejects_unknown_fusion(self, populated):
+        """Unknown fusion methods should be rejected."""
+        engine, vectors = populated
+        with pytest.raises(ValueError):
+            run(engine.hybrid_search("factors", vectors[0].tolist(), "road", fusion="max"))
+
+    def test_contents_are_stored_for_reranking(self, populated, tmp_path):
+        """Item content should be readable back, also after a snapshot and reload."""
+        engine, vectors = populated
+        run(engine.save_indexes())
+        run(engine.index_item("factors", "f-1", vectors[1].tolist()))  # content dropped
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+        contents = run(reloaded.get_contents("factors", ["f-0", "f-1", "missing"]))
+        assert contents == ["Road transport factor 0.A.3", None, None]
+
+
+class TestSharding:
+    """Test indexes split into several HNSW graphs."""
+
+    def test_scatter_gather_search(self, engine):
+        """Keys should spread over the shards and merged results find every item."""
+        vectors = random_vectors(400)
+        run(engine.create_index("factors", dimensions=32, shards=4))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(400)], vectors))
+
+        index = engine.indexes["factors"]
+        assert len(index) == 400
+        assert all(len(shard) > 50 for shard in index.shards)
+
+        results = run(engine.search("factors", vectors[17].tolist(), top_k=5, mode="ann"))
+        exact = run(engine.search("factors", vectors[17].tolist(), top_k=5, mode="exact"))
+        assert [r.id for r in results] == [r.id for r in exact]
+
+        batch = run(engine.search_many("factors", vectors[[3, 42, 399]], top_k=3, mode="ann"))
+        assert [results[0].id for results in batch] == ["f-3", "f-42", "f-399"]
+        assert all(len(results) == 3 for results in batch)
+
+    @pytest.mark.parametrize("serving_mode", ["memory", "view"])
+    def test_snapshots_rewrite_changed_shards_only(self, tmp_path, serving_mode):
+        """A snapshot should only rewrite the shards written since the last one."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, serving_mode=serving_mode)
+        vectors = random_vectors(100)
+        run(engine.create_index("factors", dimensions=32, shards=3))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(100)], vectors))
+        run(engine.save_indexes())
+
+        files = [tmp_path / f"factors.shard{i}.usearch" for i in range(3)]
+        before = [path.stat().st_mtime_ns for path in files]
+        run(engine.index_item("factors", "f-5", vectors[6].tolist()))
+        changed = sorted(engine.indexes["factors"].dirty)
+        assert len(changed) == 1
+        run(engine.save_indexes())
+
+        after = [path.stat().st_mtime_ns for path in files]
+        assert [i for i in range(3) if after[i] != before[i]] == changed
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+        assert reloaded.indexes["factors"].shard_count == 3
+        assert len(reloaded.indexes["factors"]) == 100
+        results = run(reloaded.search("factors", vectors[6].tolist(), top_k=2, mode="ann"))
+        assert {r.id for r in results} == {"f-5", "f-6"}
+
+    def test_snapshot_does_not_copy_shards(self, tmp_path, monkeypatch):
+        """Changed shards should be saved straight to disk, not copied in memory."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        vectors = random_vectors(100)
+        run(engine.create_index("factors", dimensions=32, shards=2))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(100)], vectors))
+
+        def no_copy(self):
+            raise AssertionError("shard copied during snapshot")
+
+        monkeypatch.setattr(Index, "copy", no_copy)
+        assert run(engine._save_index("factors"))
+        assert not engine.indexes["factors"].dirty
+
+        reloaded = SearchEngine(index_path=str(tmp_path), dimensions=32)
+        run(reloaded.load_indexes())
+        assert len(reloaded.indexes["factors"]) == 100
+
+    def test_compaction_rebuilds_shards_independently(self, tmp_path):
+        """Only shards holding dead entries should be rebuilt."""
+        engine = SearchEngine(index_path=str(tmp_path), dimensions=32, compaction_threshold=0)
+        vectors = random_vectors(200)
+        run(engine.create_index("factors", dimensions=32, shards=2))
+        run(engine.index_items("factors", [f"f-{i}" for i in range(200)], vectors))
+
+        index = engine.indexes["factors"]
+        registry = engine.keys["factors"]
+        owners = index.shard_of(np.array([registry.get(f"f-{i}") for i in range(200)], dtype=np.uint64))
+        doomed = [f"f-{i}" for i in range(200) if owners[i] == 0][:40]
+        for item_id in doomed:
+            run(engine.delete_item("factors", item_id))
+        untouched = index.shards[1]
+
+        assert run(engine._compact("factors", [0])) == 40
+        assert engine._dead_entries("factors") == 0
+        assert engine.indexes["factors"].shards[1] is untouched
+        assert len(engine.indexes["factors"]) == 160
+
+    def test_delete_index_removes_shard_files(self, engine, tmp_path):
+        """Deleting a sharded index should remove every shard file."""
+        run(engine.create_index("factors", dimensions=32, shards=2))
+        run(engine.index_items("factors", ["a", "b"], random_vectors(2)))
+        assert len(list(tmp_path.glob("factors.shard*.usearch"))) == 2
+
+        run(engine.delete_index("factors"))
+        assert not list(tmp_path.glob("factors.shard*.usearch"))